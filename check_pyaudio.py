@@ -1,6 +1,15 @@
 # -*- coding: utf-8 -*-
 """检查PyAudio安装状态"""
+import json
+import platform
 import sys
+import time
+from pathlib import Path
+
+# 设备探测结果缓存（同一主机/系统/PyAudio版本 24 小时内复用），传入 --no-cache 强制重新探测
+CACHE_PATH = Path.home() / ".cache" / "pyaudio_probe.json"
+CACHE_TTL = 24 * 3600
+USE_CACHE = "--no-cache" not in sys.argv[1:]
 
 print("=" * 60)
 print("PyAudio 安装检查")
@@ -32,6 +41,24 @@ if not PYAUDIO_OK:
 
 print()
 
+cache_key = [platform.node(), platform.system(), platform.release(), pyaudio.__version__]
+if USE_CACHE:
+    try:
+        cached = json.loads(CACHE_PATH.read_text(encoding="utf-8"))
+        if cached.get("key") == cache_key and time.time() - cached.get("checked_at", 0) < CACHE_TTL:
+            print("[缓存] 24 小时内已探测过音频设备（--no-cache 可重新探测）")
+            for line in cached.get("lines", []):
+                print(line)
+            print()
+            print("=" * 60)
+            print("[成功] PyAudio 工作正常！")
+            print("=" * 60)
+            sys.exit(0)
+    except (OSError, ValueError, AttributeError):
+        pass
+
+probe_lines = []
+
 # 检查2: 尝试创建PyAudio实例
 print("[检查2] 尝试创建 PyAudio 实例...")
 try:
@@ -42,21 +69,24 @@ try:
     print()
     print("[检查3] 音频设备信息...")
     device_count = pa.get_device_count()
-    print(f"  检测到 {device_count} 个音频设备")
+    probe_lines.append(f"  检测到 {device_count} 个音频设备")
+    print(probe_lines[-1])
 
     # 默认输入设备
     try:
         default_input = pa.get_default_input_device_info()
-        print(f"  默认输入设备: {default_input['name']}")
+        probe_lines.append(f"  默认输入设备: {default_input['name']}")
     except Exception as e:
-        print(f"  [警告] 无默认输入设备: {e}")
+        probe_lines.append(f"  [警告] 无默认输入设备: {e}")
+    print(probe_lines[-1])
 
     # 默认输出设备
     try:
         default_output = pa.get_default_output_device_info()
-        print(f"  默认输出设备: {default_output['name']}")
+        probe_lines.append(f"  默认输出设备: {default_output['name']}")
     except Exception as e:
-        print(f"  [警告] 无默认输出设备: {e}")
+        probe_lines.append(f"  [警告] 无默认输出设备: {e}")
+    print(probe_lines[-1])
 
     pa.terminate()
 
@@ -65,6 +95,15 @@ except Exception as e:
     print(f"       错误类型: {type(e).__name__}")
     sys.exit(1)
 
+try:
+    CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    CACHE_PATH.write_text(
+        json.dumps({"key": cache_key, "checked_at": time.time(), "lines": probe_lines}, ensure_ascii=False),
+        encoding="utf-8",
+    )
+except OSError:
+    pass
+
 print()
 print("=" * 60)
 print("[成功] PyAudio 工作正常！")
@@ -3,47 +3,26 @@
 数据库清空工具
 清空服务器和客户端的所有数据库数据
 """
-import os
 import sqlite3
 from pathlib import Path
 
+from db_admin import CLIENT_DB, SERVER_DB, clear_db
+
 
 def clear_database(db_path: str) -> None:
     """清空指定数据库的所有数据"""
-    if not os.path.exists(db_path):
+    path = Path(db_path)
+    if not path.exists():
         print(f"❌ 数据库文件不存在: {db_path}")
         return
 
     try:
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-
-        # 获取所有表名
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table';")
-        tables = cursor.fetchall()
-
+        tables = clear_db(path)
         if not tables:
             print(f"✅ {db_path} 中没有表")
-            conn.close()
             return
-
-        # 删除所有表中的数据
-        deleted_count = 0
-        for table_name in tables:
-            table = table_name[0]
-            if table == 'sqlite_sequence':
-                continue
-            cursor.execute(f"DELETE FROM {table}")
-            count = cursor.rowcount
-            deleted_count += count
-            print(f"   - 清空表 {table}: 删除 {count} 条记录")
-
-        # 重置自增ID
-        cursor.execute("DELETE FROM sqlite_sequence")
-
-        conn.commit()
-        conn.close()
-        print(f"✅ 成功清空 {db_path}，共删除 {deleted_count} 条记录\n")
+        print(f"   - 清空表: {', '.join(tables)}")
+        print(f"✅ 成功清空 {db_path}，共清空 {len(tables)} 个表\n")
 
     except Exception as e:
         print(f"❌ 清空数据库失败: {e}\n")
@@ -51,7 +30,7 @@ def clear_database(db_path: str) -> None:
 
 def delete_private_conversations(db_path: str) -> None:
     """删除双人通信相关的消息记录（包含'|'的conversation_id）"""
-    if not os.path.exists(db_path):
+    if not Path(db_path).exists():
         print(f"[错误] 数据库文件不存在: {db_path}")
         return
 
@@ -86,7 +65,7 @@ def main():
         print("=" * 60)
         print()
 
-        client_db = "client_data.db"
+        client_db = str(CLIENT_DB)
         print(f"处理客户端数据库: {client_db}")
         delete_private_conversations(client_db)
 
@@ -102,12 +81,12 @@ def main():
     print()
 
     # 服务器数据库
-    server_db = "data/server.db"
+    server_db = str(SERVER_DB)
     print(f"📂 清空服务器数据库: {server_db}")
     clear_database(server_db)
 
     # 客户端数据库
-    client_db = "client_data.db"
+    client_db = str(CLIENT_DB)
     print(f"📂 清空客户端数据库: {client_db}")
     clear_database(client_db)
 
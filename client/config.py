@@ -1,8 +1,10 @@
 from __future__ import annotations
 
+import hashlib
+import json
 import logging
 import os
-from typing import Any, Dict
+from typing import Any, Callable, Dict, List, Optional
 
 from dotenv import load_dotenv
 
@@ -20,7 +22,7 @@ DEFAULT_CONFIG: Dict[str, Any] = {
     "log_level": "INFO",
     "debug_mode": False,
     "encryption_key": "",
-    "file_chunk_size": 65536,
+    "file_chunk_size": 1 << 20,
     "local_db_path": "client_data.db",
     "token_expiry": 3600,
 }
@@ -36,27 +38,80 @@ class ConfigError(Exception):
 
 def load_config(env_path: str = ".env") -> Dict[str, Any]:
     """Load client configuration from env file/environment variables."""
+    cache_key = _cache_key(env_path)
+    if cache_key is not None:
+        cached = _read_cache(env_path, cache_key)
+        if cached is not None:
+            CLIENT_CONFIG.update(cached)
+            logging.getLogger().setLevel(CLIENT_CONFIG["log_level"])
+            return CLIENT_CONFIG
     if os.path.exists(env_path):
         load_dotenv(env_path)
 
+    env = os.environ.get
     for key, default_value in DEFAULT_CONFIG.items():
-        env_key = f"CLIENT_{key.upper()}"
-        value = os.getenv(env_key, default_value)
-        CLIENT_CONFIG[key] = _coerce_type(value, type(default_value))
+        raw = env(f"CLIENT_{key.upper()}")
+        if raw is None:
+            # Defaults are already correctly typed.
+            CLIENT_CONFIG[key] = default_value
+            continue
+        CLIENT_CONFIG[key] = _coerce_type(raw, type(default_value))
 
     _validate_config()
+    if cache_key is not None:
+        _write_cache(env_path, cache_key)
     logging.getLogger().setLevel(CLIENT_CONFIG["log_level"])
     return CLIENT_CONFIG
 
 
-def _coerce_type(value: Any, target_type: type) -> Any:
-    if isinstance(value, target_type):
-        return value
+def _cache_key(env_path: str) -> Optional[List[Any]]:
+    """Key the parsed config on the env file and the defaults; None when it cannot be cached."""
+    # Process-level CLIENT_* overrides are not part of the key, so only cache
+    # when every value can only have come from the env file itself.
+    if any(name.startswith("CLIENT_") for name in os.environ):
+        return None
     try:
-        if target_type is bool:
-            return str(value).lower() in ("1", "true", "yes", "on")
-        return target_type(value)
-    except (TypeError, ValueError) as exc:
+        stat = os.stat(env_path)
+    except OSError:
+        return None
+    # Changed or added defaults must invalidate caches written by older builds.
+    defaults = hashlib.sha256(json.dumps(DEFAULT_CONFIG, sort_keys=True).encode("utf-8")).hexdigest()
+    return [stat.st_mtime_ns, stat.st_size, defaults]
+
+
+def _read_cache(env_path: str, cache_key: List[Any]) -> Optional[Dict[str, Any]]:
+    try:
+        with open(f"{env_path}.cache", encoding="utf-8") as fp:
+            cached = json.load(fp)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(cached, dict) or cached.get("_key") != cache_key:
+        return None
+    return cached.get("cfg")
+
+
+def _write_cache(env_path: str, cache_key: List[Any]) -> None:
+    try:
+        with open(f"{env_path}.cache", "w", encoding="utf-8") as fp:
+            json.dump({"_key": cache_key, "cfg": CLIENT_CONFIG}, fp)
+    except OSError:
+        logging.getLogger(__name__).debug("Failed to write config cache", exc_info=True)
+
+
+_TRUTHY = frozenset(("1", "true", "yes", "on"))
+
+
+def _to_bool(value: str) -> bool:
+    return value.lower() in _TRUTHY
+
+
+_COERCERS: Dict[type, Callable[[str], Any]] = {bool: _to_bool, int: int, float: float, str: str}
+
+
+def _coerce_type(value: str, target_type: type) -> Any:
+    try:
+        return _COERCERS[target_type](value)
+    except (KeyError, TypeError, ValueError) as exc:
         raise ConfigError(f"Cannot convert {value} to {target_type}") from exc
 
 
@@ -67,6 +122,9 @@ def _validate_config() -> None:
         raise ConfigError("heartbeat_interval must be positive")
     if CLIENT_CONFIG["token_expiry"] <= 0:
         raise ConfigError("token_expiry must be positive")
+    # 文件分块长度字段为 4 字节
+    if not (0 < CLIENT_CONFIG["file_chunk_size"] < 1 << 32):
+        raise ConfigError("file_chunk_size must be between 1 and 2**32 - 1")
 
 
 def get(key: str, default: Any = None) -> Any:
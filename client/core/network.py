@@ -1,14 +1,19 @@
 from __future__ import annotations
 
 import asyncio
+import contextlib
+import itertools
 import logging
+import secrets
+import socket
+import sys
 import time
-import uuid
 from collections.abc import Awaitable, Callable
-from typing import Any, Dict, Optional, Union
+from typing import Any, Dict, Mapping, Optional, Tuple, Union
 
 from client.config import CLIENT_CONFIG
 from shared.protocol import DEFAULT_VERSION, framing, validator
+from shared.protocol.constants import FRAME_DELIMITER, MAX_PAYLOAD_SIZE
 from shared.protocol.commands import MsgType, normalize_command
 from shared.protocol.errors import ProtocolError, StatusCode
 from shared.protocol.messages import HeartbeatMsg
@@ -17,6 +22,13 @@ logger = logging.getLogger(__name__)
 
 MessageHandler = Callable[[Dict[str, Any]], Awaitable[None]]
 
+OUTBOUND_QUEUE_SIZE = 1024
+MAX_COALESCED_FRAMES = 32
+# StreamReader buffer limit; must exceed the largest control frame (asyncio defaults to 64 KiB).
+STREAM_LIMIT = 1 << 20
+# Keepalive probing: first probe after 30s idle, every 10s, drop after 3 misses.
+KEEPALIVE_OPTIONS = (("TCP_KEEPIDLE", 30), ("TCP_KEEPINTVL", 10), ("TCP_KEEPCNT", 3))
+
 
 class NetworkError(ProtocolError):
     """Network level error surfaced to higher layers."""
@@ -42,7 +54,24 @@ class NetworkClient:
         self.connected: bool = False
         self._heartbeat_task: Optional[asyncio.Task] = None
         self._receive_task: Optional[asyncio.Task] = None
+        self._writer_task: Optional[asyncio.Task] = None
+        self._out_q: asyncio.Queue[Tuple[Tuple[bytes, bytes], asyncio.Future]] = asyncio.Queue(maxsize=OUTBOUND_QUEUE_SIZE)
         self._handlers: Dict[str, MessageHandler] = {}
+        self._last_send: float = 0.0  # monotonic time of the last successful send
+        self._id_prefix = secrets.token_hex(4)
+        self._id_counter = itertools.count(1)
+        # Heartbeats are self-generated: build the envelope once and only refresh
+        # the per-tick fields instead of round-tripping through pydantic each time.
+        self._hb_template: Dict[str, Any] = HeartbeatMsg(
+            type="event",
+            command=MsgType.PRESENCE_HEARTBEAT,
+            payload={"seq": "", "ts": 0},
+            headers={"version": DEFAULT_VERSION},
+        ).model_dump()
+
+    def next_id(self) -> str:
+        """Cheap per-connection id: random prefix + hex counter (no os.urandom per call)."""
+        return f"{self._id_prefix}{next(self._id_counter):x}"
 
     async def connect(self) -> None:
         if self.connected:
@@ -52,9 +81,13 @@ class NetworkClient:
         delay = self.backoff
         while retries <= self.max_retries:
             try:
-                self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+                self.reader, self.writer = await asyncio.open_connection(self.host, self.port, limit=STREAM_LIMIT)
+                self._configure_socket(self.writer)
                 self.connected = True
                 logger.info("Connected to %s:%s", self.host, self.port)
+                if self._writer_task and not self._writer_task.done():
+                    self._writer_task.cancel()
+                self._writer_task = asyncio.create_task(self._writer_loop(), name="client-writer")
                 self._receive_task = asyncio.create_task(self._receive_loop(), name="client-recv-loop")
                 self._heartbeat_task = asyncio.create_task(self._heartbeat_loop(), name="client-heartbeat")
                 return
@@ -65,27 +98,76 @@ class NetworkClient:
                 delay = min(delay * 2, self.max_backoff)
         raise NetworkError(StatusCode.INTERNAL_ERROR, message="Exceeded max reconnect attempts")
 
+    @staticmethod
+    def _configure_socket(writer: asyncio.StreamWriter) -> None:
+        """Disable Nagle for small frames and enable keepalive to detect dead peers early."""
+        sock = writer.get_extra_info("socket")
+        if sock is None:
+            return
+        try:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+            for name, value in KEEPALIVE_OPTIONS:
+                option = getattr(socket, name, None)
+                if option is not None:
+                    sock.setsockopt(socket.IPPROTO_TCP, option, value)
+        except OSError as exc:
+            logger.debug("Failed to tune socket options: %s", exc)
+
     async def close(self) -> None:
         self.connected = False
-        if self._heartbeat_task:
-            self._heartbeat_task.cancel()
-        if self._receive_task:
-            self._receive_task.cancel()
+        # Wait for the background loops to unwind before closing the writer they use.
+        current = asyncio.current_task()
+        tasks = [
+            task
+            for task in (self._heartbeat_task, self._receive_task, self._writer_task)
+            if task and task is not current
+        ]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._heartbeat_task = self._receive_task = self._writer_task = None
+        self._fail_pending(NetworkError(StatusCode.INTERNAL_ERROR, message="Network client closed"))
         if self.writer:
             self.writer.close()
-            await self.writer.wait_closed()
+            with contextlib.suppress(Exception):
+                await self.writer.wait_closed()
         logger.info("Network client closed")
 
-    async def send(self, message: Dict[str, Any], schema: Optional[dict] = None) -> None:
+    async def send(self, message: Dict[str, Any], schema: Optional[dict] = None, trusted: bool = False) -> None:
+        """Frame and send a message; `trusted` skips validation for internally built frames."""
         if not self.connected:
             await self.connect()
-        try:
-            validator.validate_msg(message, schema)
-            payload = framing.encode_msg(message)
-            assert self.writer is not None
-            self.writer.write(payload)
-            await self.writer.drain()
+        with self._send_errors():
+            if not trusted:
+                validator.validate_msg(message, schema)
+            parts = framing.encode_msg_parts(message)
+            await self._enqueue(parts)
             logger.debug("Sent message %s (%s)", message.get("id"), message.get("command"))
+
+    async def send_raw(self, body: bytes) -> None:
+        """Send an already-serialized JSON frame body (no delimiter); no validation is done.
+
+        For hot paths that render a fixed envelope once and splice per-frame fields as bytes.
+        """
+        if not self.connected:
+            await self.connect()
+        if len(body) > MAX_PAYLOAD_SIZE:
+            raise ProtocolError(StatusCode.BAD_REQUEST, message="Payload too large for control channel")
+        with self._send_errors():
+            await self._enqueue((body, FRAME_DELIMITER))
+
+    async def _enqueue(self, parts: Tuple[bytes, bytes]) -> None:
+        done: asyncio.Future = asyncio.get_running_loop().create_future()
+        await self._out_q.put((parts, done))
+        await done
+        self._last_send = time.monotonic()
+
+    @contextlib.contextmanager
+    def _send_errors(self):
+        """Map transport failures during a send to NetworkError; protocol errors pass through."""
+        try:
+            yield
         except ProtocolError:
             raise
         except (ConnectionResetError, BrokenPipeError, ConnectionAbortedError) as exc:
@@ -98,21 +180,73 @@ class NetworkClient:
             logger.warning(f"Send failed: {exc}")
             raise NetworkError(StatusCode.INTERNAL_ERROR, message=f"Send failed: {exc}") from exc
 
+    async def _writer_loop(self) -> None:
+        """Drain queued frames, coalescing bursts into one write()/drain() pair."""
+        out_q = self._out_q
+        while True:
+            batch = [await out_q.get()]
+            while len(batch) < MAX_COALESCED_FRAMES and not out_q.empty():
+                batch.append(out_q.get_nowait())
+            try:
+                assert self.writer is not None
+                # Hand the (body, delimiter) pairs to the transport as one gather-write.
+                self.writer.writelines([part for parts, _ in batch for part in parts])
+                await self.writer.drain()
+            except asyncio.CancelledError:
+                self._resolve(batch, NetworkError(StatusCode.INTERNAL_ERROR, message="Writer cancelled"))
+                raise
+            except Exception as exc:
+                self._resolve(batch, exc)
+            else:
+                self._resolve(batch, None)
+
+    @staticmethod
+    def _resolve(batch: list, exc: Optional[BaseException]) -> None:
+        for _, done in batch:
+            if done.done():
+                continue
+            if exc is None:
+                done.set_result(None)
+            else:
+                done.set_exception(exc)
+
+    def _fail_pending(self, exc: BaseException) -> None:
+        pending = []
+        while not self._out_q.empty():
+            pending.append(self._out_q.get_nowait())
+        self._resolve(pending, exc)
+
     def register_handler(self, command: Union[str, MsgType], handler: MessageHandler) -> None:
-        command_text = normalize_command(command)
+        command_text = sys.intern(normalize_command(command))
         self._handlers[command_text] = handler
 
+    def register_handlers(self, handlers: Mapping[Union[str, MsgType], MessageHandler]) -> None:
+        """Register a manager's handler table in one go (keys normalized/interned once)."""
+        self._handlers.update(
+            (sys.intern(normalize_command(command)), handler) for command, handler in handlers.items()
+        )
+
     async def _receive_loop(self) -> None:
         assert self.reader is not None
+        # Bind per-frame names once; this loop runs for every inbound message.
+        reader = self.reader
+        decode = framing.async_decode_msg
+        validate = validator.validate_msg
+        dispatch = self._dispatch
+        intern = sys.intern
+        cancelled_error = asyncio.CancelledError
         while True:
             try:
-                raw = await framing.async_decode_msg(self.reader)
+                raw = await decode(reader)
                 if not raw:
                     raise EOFError("server closed connection")
-                schema = validator.load_schema(raw.get("command", ""))
-                validator.validate_msg(raw, schema)
-                await self._dispatch(raw)
-            except asyncio.CancelledError:
+                command = raw.get("command")
+                if isinstance(command, str):
+                    # Interned keys let the handler lookup hit the identity fast path.
+                    command = raw["command"] = intern(command)
+                validate(raw)
+                await dispatch(raw)
+            except cancelled_error:
                 break
             except ProtocolError as exc:
                 logger.warning("Protocol error: %s", exc)
@@ -123,33 +257,47 @@ class NetworkClient:
 
     async def _dispatch(self, msg: Dict[str, Any]) -> None:
         command = msg.get("command")
-        if command in self._handlers:
-            try:
-                await self._handlers[command](msg)
-            except Exception as exc:
-                logger.exception("Handler error for %s: %s", command, exc)
-        else:
+        handler = self._handlers.get(command)
+        if handler is None:
             logger.debug("No handler registered for %s", command)
+            return
+        try:
+            await handler(msg)
+        except Exception as exc:
+            logger.exception("Handler error for %s: %s", command, exc)
 
     async def _heartbeat_loop(self) -> None:
-        while True:
-            if not self.connected:
-                break
+        """Send heartbeats only when the connection has been idle for a full interval."""
+        heartbeat = self._hb_template
+        hb_payload = heartbeat["payload"]
+        sleep = asyncio.sleep
+        monotonic = time.monotonic
+        send = self.send
+        interval = self.heartbeat_interval
+        failures = 0
+        while self.connected:
             try:
-                heartbeat = HeartbeatMsg(
-                    type="event",
-                    command=MsgType.PRESENCE_HEARTBEAT,
-                    payload={"seq": uuid.uuid4().hex, "ts": int(time.time())},
-                    headers={"version": DEFAULT_VERSION},
-                ).model_dump()
-                await self.send(heartbeat, schema=validator.load_schema(heartbeat["command"]))
+                # Any outbound frame refreshes presence on the server, so piggyback on it.
+                idle = monotonic() - self._last_send
+                if idle < interval:
+                    await sleep(interval - idle)
+                    continue
+                now = int(time.time())
+                heartbeat["id"] = hb_payload["seq"] = self.next_id()
+                heartbeat["timestamp"] = now
+                hb_payload["ts"] = now
+                await send(heartbeat, trusted=True)
+                failures = 0
             except asyncio.CancelledError:
                 break
             except Exception as exc:
-                logger.debug("Heartbeat failed: %s", exc)
-                await asyncio.sleep(self.heartbeat_interval)
-                continue
-            await asyncio.sleep(self.heartbeat_interval)
+                failures += 1
+                delay = min(interval * 2 ** (failures - 1), max(self.max_backoff, interval))
+                logger.debug("Heartbeat failed (%s in a row), retrying in %ss: %s", failures, delay, exc)
+                try:
+                    await sleep(delay)
+                except asyncio.CancelledError:
+                    break
 
     async def open_file_channel(self, host: Optional[str] = None, port: Optional[int] = None):
         """Open separate TCP channel for binary/file transfer."""
@@ -157,3 +305,11 @@ class NetworkClient:
             return await asyncio.open_connection(host or self.host, port or self.config["file_port"])
         except Exception as exc:
             raise NetworkError(StatusCode.INTERNAL_ERROR, message=f"File channel failed: {exc}") from exc
+
+    async def open_file_transport(self, protocol_factory: Callable[[], asyncio.BaseProtocol], host: Optional[str] = None, port: Optional[int] = None):
+        """Open the file channel with a custom protocol (e.g. a BufferedProtocol) instead of streams."""
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.create_connection(protocol_factory, host or self.host, port or self.config["file_port"])
+        except Exception as exc:
+            raise NetworkError(StatusCode.INTERNAL_ERROR, message=f"File channel failed: {exc}") from exc
@@ -1,9 +1,10 @@
 from __future__ import annotations
 
 import asyncio
+import itertools
 import logging
+import secrets
 import time
-import uuid
 from typing import Any, Dict, Optional
 
 from client.config import CLIENT_CONFIG
@@ -28,26 +29,39 @@ class ClientSession:
         self.user_id: Optional[str] = None
         self.token: Optional[str] = None
         self.expires_at: float = 0.0
+        self._expires_mono: float = 0.0  # monotonic deadline used for validity checks
         self.online: bool = False
         self.registration_success: bool = False  # 标记注册是否成功
         self.client_info: Dict[str, str] = {"device": "windows", "version": "cli-0.1.0"}
         self.token_ttl: int = int(self.config.get("token_expiry", 3600))
         self._refresh_lock = asyncio.Lock()
+        # Header dicts are shared between outbound messages; treat them as read-only.
+        self._base_headers: Dict[str, Any] = {"version": DEFAULT_VERSION, "client": self.client_info["version"]}
+        self._cached_auth_headers: Optional[Dict[str, Any]] = None
+        # Message ids only need to be unique per session: random prefix + counter.
+        self._id_prefix = secrets.token_hex(4)
+        self._id_counter = itertools.count(1)
+
+    def next_id(self) -> str:
+        return f"{self._id_prefix}{next(self._id_counter):x}"
 
     def build_headers(self, require_auth: bool = True, extra: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
-        headers = {"version": DEFAULT_VERSION, "client": self.client_info["version"]}
         if require_auth:
             if not self.is_token_valid():
                 raise SessionError(StatusCode.UNAUTHORIZED, message="Session expired or not authenticated")
-            headers["Authorization"] = f"Bearer {self.token}"
+            headers = self._cached_auth_headers
+            if headers is None:
+                headers = self._cached_auth_headers = {**self._base_headers, "Authorization": f"Bearer {self.token}"}
+        else:
+            headers = self._base_headers
         if extra:
-            headers.update(extra)
+            return {**headers, **extra}
         return headers
 
     def attach_headers(self, message: Dict[str, Any], require_auth: bool = True) -> Dict[str, Any]:
-        msg = {**message}
-        msg["headers"] = self.build_headers(require_auth=require_auth, extra=message.get("headers"))
-        return msg
+        """Set headers on `message` in place (callers own the dict) and return it."""
+        message["headers"] = self.build_headers(require_auth=require_auth, extra=message.get("headers"))
+        return message
 
     async def set_authenticated(self, ack_message: Dict[str, Any]) -> None:
         ack = AuthAckMsg.from_dict(ack_message)
@@ -66,13 +80,15 @@ class ClientSession:
 
         self.user_id = payload.user_id
         self.token = payload.token
+        self._cached_auth_headers = None
         self.expires_at = time.time() + payload.expires_in
+        self._expires_mono = time.monotonic() + payload.expires_in
         self.online = True
         self.registration_success = False  # 清除注册标记
         logger.info("Session authenticated for %s", self.user_id)
 
     def is_token_valid(self) -> bool:
-        return bool(self.token) and time.time() < self.expires_at
+        return bool(self.token) and time.monotonic() < self._expires_mono
 
     def is_online(self) -> bool:
         """Reflect current login state (token + flag)."""
@@ -82,7 +98,7 @@ class ClientSession:
         if not self.online:
             return
         logout_msg = {
-            "id": str(uuid.uuid4()),
+            "id": self.next_id(),
             "type": "request",
             "timestamp": int(time.time()),
             "command": MsgType.AUTH_LOGOUT.value,
@@ -97,7 +113,9 @@ class ClientSession:
     def clear(self) -> None:
         self.user_id = None
         self.token = None
+        self._cached_auth_headers = None
         self.expires_at = 0
+        self._expires_mono = 0.0
         self.online = False
 
     async def refresh_token(self) -> bool:
@@ -107,7 +125,7 @@ class ClientSession:
             if self.is_token_valid():
                 return True
             refresh_msg = {
-                "id": str(uuid.uuid4()),
+                "id": self.next_id(),
                 "type": "request",
                 "timestamp": int(time.time()),
                 "command": MsgType.AUTH_REFRESH.value,
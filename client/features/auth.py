@@ -2,14 +2,13 @@ from __future__ import annotations
 
 import asyncio
 import logging
+import time
 from typing import Dict
 
 from client.core.network import NetworkClient
 from client.core.session import ClientSession, SessionError
-from shared.protocol import validator
-from shared.protocol.commands import MsgType
+from shared.protocol.commands import COMMAND_TEXT, MsgType
 from shared.protocol.errors import ProtocolError, StatusCode
-from shared.protocol.messages import LoginMsg, RegisterMsg
 
 logger = logging.getLogger(__name__)
 
@@ -17,26 +16,26 @@ logger = logging.getLogger(__name__)
 class AuthManager:
     """Handle login/logout/refresh flows, wiring handlers with NetworkClient."""
 
+    # command -> handler method name, normalized once at class creation
+    _HANDLER_MAP: Dict[str, str] = {
+        MsgType.AUTH_LOGIN_ACK.value: "_handle_login_ack",
+        MsgType.AUTH_REGISTER_ACK.value: "_handle_login_ack",
+        MsgType.AUTH_REFRESH_ACK.value: "_handle_refresh_ack",
+    }
+
     def __init__(self, network: NetworkClient, session: ClientSession) -> None:
         self.network = network
         self.session = session
         self._login_event = asyncio.Event()
         self._refresh_event = asyncio.Event()
-        self.network.register_handler(MsgType.AUTH_LOGIN_ACK, self._handle_login_ack)
-        self.network.register_handler(MsgType.AUTH_REGISTER_ACK, self._handle_login_ack)
-        self.network.register_handler(MsgType.AUTH_REFRESH_ACK, self._handle_refresh_ack)
+        self.network.register_handlers(
+            {command: getattr(self, handler_name) for command, handler_name in self._HANDLER_MAP.items()}
+        )
 
     async def login(self, username: str, password_hash: str) -> bool:
         self._login_event.clear()
-        login_msg = LoginMsg(
-            type="request",
-            command=MsgType.AUTH_LOGIN,
-            payload={"username": username, "password": password_hash, "client_info": self.session.client_info},
-            headers=self.session.build_headers(require_auth=False),
-        ).model_dump()
-        # schema = validator.load_schema(login_msg["command"])
-        schema = validator.load_schema(MsgType.AUTH_LOGIN.value)
-        await self.network.send(login_msg, schema)
+        login_msg = self._build_auth_message(MsgType.AUTH_LOGIN, username, password_hash)
+        await self.network.send(login_msg)
         try:
             await asyncio.wait_for(self._login_event.wait(), timeout=10)
         except asyncio.TimeoutError:
@@ -46,14 +45,8 @@ class AuthManager:
     async def register(self, username: str, password_hash: str) -> bool:
         self._login_event.clear()
         self.session.registration_success = False  # 重置注册标记
-        register_msg = RegisterMsg(
-            type="request",
-            command=MsgType.AUTH_REGISTER,
-            payload={"username": username, "password": password_hash, "client_info": self.session.client_info},
-            headers=self.session.build_headers(require_auth=False),
-        ).model_dump()
-        schema = validator.load_schema(MsgType.AUTH_REGISTER.value)
-        await self.network.send(register_msg, schema)
+        register_msg = self._build_auth_message(MsgType.AUTH_REGISTER, username, password_hash)
+        await self.network.send(register_msg)
         try:
             await asyncio.wait_for(self._login_event.wait(), timeout=10)
         except asyncio.TimeoutError:
@@ -61,6 +54,18 @@ class AuthManager:
         # 注册成功返回 registration_success 标记
         return self.session.registration_success
 
+    def _build_auth_message(self, command: MsgType, username: str, password_hash: str) -> Dict:
+        # Plain dict instead of LoginMsg/RegisterMsg(...).model_dump(): the schema check in
+        # NetworkClient.send already validates the frame.
+        return {
+            "id": self.session.next_id(),
+            "type": "request",
+            "timestamp": int(time.time()),
+            "command": COMMAND_TEXT[command],
+            "headers": self.session.build_headers(require_auth=False),
+            "payload": {"username": username, "password": password_hash, "client_info": self.session.client_info},
+        }
+
     async def logout(self) -> None:
         await self.session.logout()
 
@@ -76,9 +81,8 @@ class AuthManager:
         return self.session.is_token_valid()
 
     async def _handle_login_ack(self, message: Dict) -> None:
+        # Schema validation already ran in NetworkClient._receive_loop.
         try:
-            schema = validator.load_schema(message.get("command", MsgType.AUTH_LOGIN_ACK.value))
-            validator.validate_msg(message, schema)
             await self.session.set_authenticated(message)
         except ProtocolError as exc:
             logger.error("Login ACK validation failed: %s", exc)
@@ -1,23 +1,144 @@
 from __future__ import annotations
 
 import asyncio
+import contextlib
 import hashlib
 import json
 import logging
+import os
 import time
+from dataclasses import dataclass
+from enum import Enum
 from pathlib import Path
-from typing import Any, Dict, Optional
-from uuid import uuid4
+from typing import Any, Callable, Dict, Optional
 
 from client.core.network import NetworkClient
 from client.core.session import ClientSession
-from shared.protocol.commands import MsgType
+from shared.protocol.commands import COMMAND_TEXT, MsgType
 from shared.protocol.errors import ProtocolError, StatusCode
-from shared.protocol.framing import encode_chunk
-from shared.protocol import validator
+from shared.protocol.framing import CHUNK_HEADER, encode_chunk, encode_chunk_header
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_CHUNK_SIZE = 1 << 20
+# 发送端写缓冲高水位（按块数计）：缓冲低于该值时 drain() 不挂起，多块连续写出
+SEND_BUFFER_CHUNKS = 4
+# 接收缓冲下限，保证能装下结束块（摘要 / 错误信息）
+MIN_RECEIVE_BUFFER = 4096
+# loop.sendfile(fallback=False) 不可用时各实现抛出的异常：asyncio 为 SendfileNotAvailableError，
+# uvloop/winloop 为 NotImplementedError，不支持的 transport（如 SSL）为 RuntimeError
+SENDFILE_UNAVAILABLE = (asyncio.SendfileNotAvailableError, NotImplementedError, RuntimeError)
+
+
+class TransferState(Enum):
+    PENDING = "pending"  # 收到请求，等待接受/拒绝
+    SENDING = "sending"
+    RECEIVING = "receiving"
+
+
+@dataclass(slots=True)
+class TransferSession:
+    """State of one file session; `path` is the source file when sending, the save path when receiving."""
+
+    session_id: str
+    state: TransferState
+    file_name: str
+    file_size: int
+    peer_id: str
+    checksum: Optional[str] = None
+    path: Optional[Path] = None
+    bytes_transferred: int = 0
+
+
+class ChunkReceiver(asyncio.BufferedProtocol):
+    """Receives the TLV chunk stream of a file channel into one preallocated buffer.
+
+    StreamReader.readexactly() allocates a new bytes object per chunk; here the transport
+    reads straight into the buffer and chunk data is hashed and written from a memoryview.
+    Each receive fills as much of the buffer as the socket has, and every header/data/trailer
+    in it is parsed in place, so small chunks do not cost one read per field.
+    """
+
+    def __init__(self, fp, sha: Any, on_data: Callable[[int], None], buffer_size: int) -> None:
+        self._fp = fp
+        self._sha = sha
+        self._on_data = on_data
+        self._buf = memoryview(bytearray(max(buffer_size, MIN_RECEIVE_BUFFER)))
+        self._filled = 0
+        self._chunk_type: Optional[int] = None  # None 表示正在读块头
+        self._chunk_len = 0
+        self._remaining = 0
+        self.finished: asyncio.Future = asyncio.get_running_loop().create_future()
+
+    def get_buffer(self, sizehint: int) -> memoryview:
+        return self._buf[self._filled :]
+
+    def buffer_updated(self, nbytes: int) -> None:
+        if self.finished.done():
+            return
+        self._filled += nbytes
+        try:
+            pos = self._consume()
+        except Exception as exc:
+            self.finished.set_exception(exc)
+            return
+        # 剩下的只可能是不完整的块头或结束块，挪到缓冲区开头
+        rest = self._filled - pos
+        if rest and pos:
+            self._buf[:rest] = self._buf[pos : self._filled]
+        self._filled = rest
+
+    def connection_lost(self, exc: Optional[Exception]) -> None:
+        if not self.finished.done():
+            self.finished.set_exception(exc or ConnectionError("File channel closed before transfer completed"))
+
+    def _consume(self) -> int:
+        buf = self._buf
+        filled = self._filled
+        pos = 0
+        while not self.finished.done():
+            available = filled - pos
+            chunk_type = self._chunk_type
+            if chunk_type is None:
+                if available < CHUNK_HEADER.size:
+                    break
+                chunk_type, length = CHUNK_HEADER.unpack_from(buf, pos)
+                pos += CHUNK_HEADER.size
+                if chunk_type != 0x01 and length > len(buf):
+                    raise RuntimeError("Chunk trailer too large")
+                self._chunk_type = chunk_type
+                self._chunk_len = self._remaining = length
+                if not length:
+                    self._end_chunk(b"")
+            elif chunk_type == 0x01:
+                if not available:
+                    break
+                size = min(available, self._remaining)
+                view = buf[pos : pos + size]
+                self._sha.update(view)
+                self._fp.write(view)
+                pos += size
+                self._remaining -= size
+                if not self._remaining:
+                    self._end_chunk(b"")
+            else:
+                if available < self._remaining:
+                    break
+                self._end_chunk(bytes(buf[pos : pos + self._remaining]))
+                pos += self._remaining
+        return pos
+
+    def _end_chunk(self, payload: bytes) -> None:
+        chunk_type = self._chunk_type
+        self._chunk_type = None
+        if chunk_type == 0x01:
+            if self._chunk_len:
+                self._on_data(self._chunk_len)
+        elif chunk_type == 0x02:
+            self.finished.set_result(payload)
+        elif chunk_type == 0x03:
+            raise RuntimeError("Sender reported failure")
+
 
 class FileTransferManager:
     """Handles file transfer negotiations and data channel operations."""
@@ -28,38 +149,40 @@ class FileTransferManager:
         session: ClientSession,
         ui_queue,
         storage_dir: Path,
-        chunk_size: int = 65536,
+        chunk_size: Optional[int] = None,
     ) -> None:
         self.network = network
         self.session = session
         self.ui_queue = ui_queue
-        self.chunk_size = chunk_size
+        # 默认 1 MiB（CLIENT_FILE_CHUNK_SIZE 可调）：每块一次 write/drain，块越大调度开销越少
+        self.chunk_size = int(chunk_size or network.config.get("file_chunk_size", DEFAULT_CHUNK_SIZE))
         self.storage_dir = storage_dir
         self.storage_dir.mkdir(parents=True, exist_ok=True)
         self._pending_acks: Dict[str, asyncio.Future] = {}
-        self._pending_requests: Dict[str, Dict[str, Any]] = {}
-        self._sending_sessions: Dict[str, Dict[str, Any]] = {}
-        self._receiving_sessions: Dict[str, Dict[str, Any]] = {}
-        self.network.register_handler(MsgType.FILE_REQUEST_ACK, self._handle_ack)
-        self.network.register_handler(MsgType.FILE_ACCEPT_ACK, self._handle_ack)
-        self.network.register_handler(MsgType.FILE_REJECT_ACK, self._handle_ack)
-        self.network.register_handler(MsgType.FILE_REQUEST, self._handle_request_event)
-        self.network.register_handler(MsgType.FILE_ACCEPT, self._handle_accept_event)
-        self.network.register_handler(MsgType.FILE_REJECT, self._handle_reject_event)
-        self.network.register_handler(MsgType.FILE_COMPLETE, self._handle_complete_event)
-        self.network.register_handler(MsgType.FILE_ERROR, self._handle_error_event)
+        self._sessions: Dict[str, TransferSession] = {}
+        self.network.register_handlers(
+            {
+                MsgType.FILE_REQUEST_ACK: self._handle_ack,
+                MsgType.FILE_ACCEPT_ACK: self._handle_ack,
+                MsgType.FILE_REJECT_ACK: self._handle_ack,
+                MsgType.FILE_REQUEST: self._handle_request_event,
+                MsgType.FILE_ACCEPT: self._handle_accept_event,
+                MsgType.FILE_REJECT: self._handle_reject_event,
+                MsgType.FILE_COMPLETE: self._handle_complete_event,
+                MsgType.FILE_ERROR: self._handle_error_event,
+            }
+        )
 
     async def request_send_file(self, target_id: str, file_path: Path, target_type: str = "user") -> Dict[str, Any]:
         file_path = Path(file_path)
         if not file_path.exists():
             raise FileNotFoundError(file_path)
         file_size = file_path.stat().st_size
-        checksum = self._sha256_file(file_path)
+        # 不再预先整文件哈希：SHA-256 在发送时边读边算，摘要随 0x02 结束块发给接收方校验
         payload = {
             "target": {"type": target_type, "id": target_id},
             "file_name": file_path.name,
             "file_size": file_size,
-            "checksum": checksum,
         }
         response = await self._send_with_ack(MsgType.FILE_REQUEST, payload)
         status = int(response.get("status", StatusCode.SUCCESS))
@@ -76,17 +199,14 @@ class FileTransferManager:
         for session in sessions:
             session_id = session["session_id"]
             target = session.get("target_id", target_id)
-            context = {
-                "session_id": session_id,
-                "file_path": file_path,
-                "file_name": file_path.name,
-                "file_size": file_size,
-                "checksum": checksum,
-                "target_id": target,
-                "direction": "send",
-                "bytes_transferred": 0,
-            }
-            self._sending_sessions[session_id] = context
+            self._sessions[session_id] = TransferSession(
+                session_id=session_id,
+                state=TransferState.SENDING,
+                file_name=file_path.name,
+                file_size=file_size,
+                peer_id=target,
+                path=file_path,
+            )
             self._emit_event(
                 {
                     "type": "request_sent",
@@ -99,28 +219,25 @@ class FileTransferManager:
         return summary
 
     async def accept_request(self, session_id: str, destination: Path) -> None:
-        request = self._pending_requests.pop(session_id, None)
-        if not request:
+        ctx = self._sessions.get(session_id)
+        if ctx is None or ctx.state is not TransferState.PENDING:
             raise ProtocolError(StatusCode.NOT_FOUND, message="Request not found")
         destination.parent.mkdir(parents=True, exist_ok=True)
-        self._receiving_sessions[session_id] = {
-            "session_id": session_id,
-            "file_name": request["file_name"],
-            "file_size": request["file_size"],
-            "from_user": request["from_user"],
-            "save_path": destination,
-            "direction": "receive",
-            "bytes_transferred": 0,
-        }
+        ctx.state = TransferState.RECEIVING
+        ctx.path = destination
         await self._send_with_ack(MsgType.FILE_ACCEPT, {"session_id": session_id})
 
     async def reject_request(self, session_id: str) -> None:
-        if session_id in self._pending_requests:
+        ctx = self._sessions.get(session_id)
+        if ctx is not None and ctx.state is TransferState.PENDING:
             await self._send_with_ack(MsgType.FILE_REJECT, {"session_id": session_id})
-            self._pending_requests.pop(session_id, None)
+            self._sessions.pop(session_id, None)
 
-    async def notify_complete(self, session_id: str) -> None:
-        await self._send_message(MsgType.FILE_COMPLETE, {"session_id": session_id})
+    async def notify_complete(self, session_id: str, checksum: Optional[str] = None) -> None:
+        payload = {"session_id": session_id}
+        if checksum:
+            payload["checksum"] = checksum
+        await self._send_message(MsgType.FILE_COMPLETE, payload)
 
     async def notify_error(self, session_id: str, error_message: str) -> None:
         await self._send_message(MsgType.FILE_ERROR, {"session_id": session_id, "error_message": error_message})
@@ -135,7 +252,14 @@ class FileTransferManager:
         session_id = payload.get("session_id")
         if not session_id:
             return
-        self._pending_requests[session_id] = payload
+        self._sessions[session_id] = TransferSession(
+            session_id=session_id,
+            state=TransferState.PENDING,
+            file_name=payload.get("file_name"),
+            file_size=payload.get("file_size"),
+            peer_id=payload.get("from_user"),
+            checksum=payload.get("checksum"),
+        )
         self._emit_event(
             {
                 "type": "incoming_request",
@@ -148,25 +272,24 @@ class FileTransferManager:
 
     async def _handle_accept_event(self, message: Dict[str, Any]) -> None:
         payload = message.get("payload", {}) or {}
-        session_id = payload.get("session_id")
-        if not session_id:
+        ctx = self._sessions.get(payload.get("session_id"))
+        if ctx is None:
             return
         host = payload.get("channel_host") or self.network.host
         if host in (None, "", "0.0.0.0", "::"):
             host = self.network.host
         port = payload.get("channel_port") or self.network.config.get("file_port")
-        if session_id in self._sending_sessions:
-            asyncio.create_task(self._start_sender_channel(session_id, host, int(port)))
-        elif session_id in self._receiving_sessions:
-            asyncio.create_task(self._start_receiver_channel(session_id, host, int(port)))
+        if ctx.state is TransferState.SENDING:
+            asyncio.create_task(self._start_sender_channel(ctx, host, int(port)))
+        elif ctx.state is TransferState.RECEIVING:
+            asyncio.create_task(self._start_receiver_channel(ctx, host, int(port)))
 
     async def _handle_reject_event(self, message: Dict[str, Any]) -> None:
         payload = message.get("payload", {}) or {}
         session_id = payload.get("session_id")
         if not session_id:
             return
-        self._sending_sessions.pop(session_id, None)
-        self._pending_requests.pop(session_id, None)
+        self._sessions.pop(session_id, None)
         self._emit_event(
             {"type": "rejected", "session_id": session_id, "from_user": payload.get("from_user")}
         )
@@ -177,8 +300,7 @@ class FileTransferManager:
         if not session_id:
             return
         self._emit_event({"type": "completed", "session_id": session_id})
-        self._sending_sessions.pop(session_id, None)
-        self._receiving_sessions.pop(session_id, None)
+        self._sessions.pop(session_id, None)
 
     async def _handle_error_event(self, message: Dict[str, Any]) -> None:
         payload = message.get("payload", {}) or {}
@@ -187,38 +309,24 @@ class FileTransferManager:
             return
         error_message = payload.get("error_message", "transfer failed")
         self._emit_event({"type": "failed", "session_id": session_id, "error": error_message})
-        self._sending_sessions.pop(session_id, None)
-        self._receiving_sessions.pop(session_id, None)
+        self._sessions.pop(session_id, None)
 
-    async def _start_sender_channel(self, session_id: str, host: str, port: int) -> None:
-        context = self._sending_sessions.get(session_id)
-        if not context:
-            return
-        file_path = context["file_path"]
+    async def _start_sender_channel(self, ctx: TransferSession, host: str, port: int) -> None:
+        session_id = ctx.session_id
+        file_path = ctx.path
         writer = None
         try:
             reader, writer = await self.network.open_file_channel(host, port)
+            # asyncio 默认 64 KiB 高水位小于一个分块，会让每块 write 之后的 drain 都挂起
+            writer.transport.set_write_buffer_limits(high=SEND_BUFFER_CHUNKS * self.chunk_size)
             await self._send_handshake(writer, session_id, "sender")
             with file_path.open("rb") as fp:
-                while True:
-                    chunk = fp.read(self.chunk_size)
-                    if not chunk:
-                        break
-                    writer.write(encode_chunk(0x01, chunk))
-                    await writer.drain()
-                    context["bytes_transferred"] += len(chunk)
-                    self._emit_event(
-                        {
-                            "type": "progress",
-                            "session_id": session_id,
-                            "direction": "send",
-                            "bytes": context["bytes_transferred"],
-                            "total": context["file_size"],
-                        }
-                    )
-            writer.write(encode_chunk(0x02, b""))
+                digest = await self._send_chunks(writer, fp, file_path, ctx)
+            # 结束块携带原始 32 字节摘要
+            writer.write(encode_chunk(0x02, digest))
             await writer.drain()
-            await self.notify_complete(session_id)
+            # 摘要发送时才算出来，随 FILE_COMPLETE 交给服务端记录
+            await self.notify_complete(session_id, digest.hex())
         except asyncio.CancelledError:
             raise
         except Exception as exc:
@@ -232,37 +340,121 @@ class FileTransferManager:
                 except Exception:
                     pass
 
-    async def _start_receiver_channel(self, session_id: str, host: str, port: int) -> None:
-        context = self._receiving_sessions.get(session_id)
-        if not context:
-            return
-        save_path = context["save_path"]
-        writer = None
+    async def _send_chunks(self, writer, fp, file_path: Path, ctx: TransferSession) -> bytes:
+        """Write the file as 0x01 chunks and return its SHA-256 digest for the 0x02 trailer."""
+        loop = asyncio.get_running_loop()
+        file_size = os.fstat(fp.fileno()).st_size
+        offset = 0
+        header_sent = False
+        # uvloop/winloop 的 loop.sendfile 只会抛 NotImplementedError，只有 asyncio 自带的事件循环才值得尝试
+        use_sendfile = isinstance(loop, asyncio.BaseEventLoop)
+        # sendfile 由内核直接拷贝文件到 socket，Python 看不到数据，此时改为在线程中并行计算摘要
+        digest_task: Optional[asyncio.Future] = None
         try:
-            reader, writer = await self.network.open_file_channel(host, port)
-            await self._send_handshake(writer, session_id, "receiver")
-            with save_path.open("wb") as fp:
-                while True:
-                    header = await reader.readexactly(5)
-                    chunk_type = header[0]
-                    length = int.from_bytes(header[1:5], "little")
-                    data = await reader.readexactly(length)
-                    if chunk_type == 0x01:
-                        fp.write(data)
-                        context["bytes_transferred"] += len(data)
-                        self._emit_event(
-                            {
-                                "type": "progress",
-                                "session_id": session_id,
-                                "direction": "receive",
-                                "bytes": context["bytes_transferred"],
-                                "total": context["file_size"],
-                            }
-                        )
-                    elif chunk_type == 0x02:
-                        break
-                    elif chunk_type == 0x03:
-                        raise RuntimeError("Sender reported failure")
+            while use_sendfile and offset < file_size:
+                size = min(self.chunk_size, file_size - offset)
+                writer.write(encode_chunk_header(0x01, size))
+                try:
+                    sent = await loop.sendfile(writer.transport, fp, offset, size, fallback=False)
+                except SENDFILE_UNAVAILABLE:
+                    # 只在第一块上判定是否支持 sendfile（SSL、无 os.sendfile 等）：头已写出，数据交给读循环；
+                    # 之后的块再失败说明流已不完整，直接报错
+                    if offset:
+                        raise
+                    header_sent = True
+                    break
+                if sent != size:
+                    raise RuntimeError("File changed during transfer")
+                if digest_task is None:
+                    digest_task = asyncio.ensure_future(asyncio.to_thread(self._sha256_file, file_path))
+                offset += size
+                self._emit_send_progress(ctx, offset)
+            if digest_task is not None and offset == file_size:
+                return await digest_task
+            return await self._copy_chunks(writer, fp, offset, file_size, header_sent, ctx)
+        finally:
+            if digest_task is not None and not digest_task.done():
+                digest_task.cancel()
+
+    async def _copy_chunks(
+        self, writer, fp, offset: int, file_size: int, header_sent: bool, ctx: TransferSession
+    ) -> bytes:
+        """Read/write fallback; the next chunk is read (and hashed) in a thread while the current one drains."""
+        sha = hashlib.sha256()
+
+        def read_block() -> bytes:
+            block = fp.read(min(self.chunk_size, file_size - fp.tell()))
+            sha.update(block)
+            return block
+
+        fp.seek(offset)
+        pending: Optional[asyncio.Future] = None
+        try:
+            if offset < file_size:
+                pending = asyncio.ensure_future(asyncio.to_thread(read_block))
+            while pending is not None:
+                chunk = await pending
+                if len(chunk) != min(self.chunk_size, file_size - offset):
+                    raise RuntimeError("File changed during transfer")
+                offset += len(chunk)
+                # 双缓冲：先发起下一块的读取，再写出并 drain 当前块
+                pending = asyncio.ensure_future(asyncio.to_thread(read_block)) if offset < file_size else None
+                if header_sent:
+                    writer.write(chunk)
+                    header_sent = False
+                else:
+                    # 头和数据作为一次写交给 transport，避免先单独发出 5 字节的头
+                    writer.writelines((encode_chunk_header(0x01, len(chunk)), chunk))
+                await writer.drain()
+                self._emit_send_progress(ctx, offset)
+        finally:
+            if pending is not None:
+                # 线程里的读取取消不了：等它结束再返回，免得在文件关闭后还去读 fp
+                with contextlib.suppress(Exception):
+                    await asyncio.shield(pending)
+        return sha.digest()
+
+    def _emit_send_progress(self, ctx: TransferSession, offset: int) -> None:
+        ctx.bytes_transferred = offset
+        self._emit_event(
+            {
+                "type": "progress",
+                "session_id": ctx.session_id,
+                "direction": "send",
+                "bytes": offset,
+                "total": ctx.file_size,
+            }
+        )
+
+    async def _start_receiver_channel(self, ctx: TransferSession, host: str, port: int) -> None:
+        session_id = ctx.session_id
+        save_path = ctx.path
+        transport = None
+        verified = False
+        sha = hashlib.sha256()
+
+        def on_data(size: int) -> None:
+            ctx.bytes_transferred += size
+            self._emit_event(
+                {
+                    "type": "progress",
+                    "session_id": session_id,
+                    "direction": "receive",
+                    "bytes": ctx.bytes_transferred,
+                    "total": ctx.file_size,
+                }
+            )
+
+        try:
+            # 缓冲区与分块等大：整块直接落盘，零碎的尾块合并成一次写
+            with save_path.open("wb", buffering=self.chunk_size) as fp:
+                transport, receiver = await self.network.open_file_transport(
+                    lambda: ChunkReceiver(fp, sha, on_data, self.chunk_size), host, port
+                )
+                transport.write(self._handshake(session_id, "receiver"))
+                trailer = await receiver.finished
+            self._verify_digest(sha, trailer, ctx.checksum)
+            verified = True
             await self.notify_complete(session_id)
             self._emit_event({"type": "saved", "session_id": session_id, "path": str(save_path)})
         except asyncio.CancelledError:
@@ -271,43 +463,42 @@ class FileTransferManager:
             logger.error("Receiver channel failed for %s: %s", session_id, exc)
             await self.notify_error(session_id, str(exc))
         finally:
-            if writer:
-                try:
-                    writer.close()
-                    await writer.wait_closed()
-                except Exception:
-                    pass
+            if transport:
+                transport.close()
+            if not verified:
+                # 不完整或校验失败的文件不留在磁盘上
+                save_path.unlink(missing_ok=True)
 
     async def _send_with_ack(self, command: MsgType, payload: Dict[str, Any]) -> Dict[str, Any]:
         message = self._build_message(command, payload)
-        future: asyncio.Future = asyncio.get_event_loop().create_future()
+        future: asyncio.Future = asyncio.get_running_loop().create_future()
         self._pending_acks[message["id"]] = future
-        schema = validator.load_schema(command.value)
-        await self.network.send(message, schema)
+        await self.network.send(message)
         return await asyncio.wait_for(future, timeout=15)
 
     async def _send_message(self, command: MsgType, payload: Dict[str, Any]) -> None:
         message = self._build_message(command, payload)
-        schema = validator.load_schema(command.value)
-        await self.network.send(message, schema)
+        await self.network.send(message)
 
     def _build_message(self, command: MsgType, payload: Dict[str, Any]) -> Dict[str, Any]:
         message = {
-            "id": uuid4().hex,
+            "id": self.session.next_id(),
             "type": "request",
             "timestamp": int(time.time()),
-            "command": command.value,
+            "command": COMMAND_TEXT[command],
             "headers": self.session.build_headers(),
             "payload": payload,
         }
         return message
 
     async def _send_handshake(self, writer, session_id: str, role: str) -> None:
-        handshake = json.dumps(
+        writer.write(self._handshake(session_id, role))
+        await writer.drain()
+
+    def _handshake(self, session_id: str, role: str) -> bytes:
+        return json.dumps(
             {"session_id": session_id, "role": role, "user_id": self.session.user_id or ""}
         ).encode("utf-8") + b"\n"
-        writer.write(handshake)
-        await writer.drain()
 
     def _emit_event(self, payload: Dict[str, Any]) -> None:
         try:
@@ -316,12 +507,19 @@ class FileTransferManager:
             logger.debug("Failed to enqueue file event", exc_info=True)
 
     @staticmethod
-    def _sha256_file(path: Path) -> str:
-        sha = hashlib.sha256()
+    def _sha256_file(path: Path) -> bytes:
+        # file_digest runs the read/update loop in C and releases the GIL while hashing.
         with path.open("rb") as fp:
-            while True:
-                block = fp.read(1024 * 1024)
-                if not block:
-                    break
-                sha.update(block)
-        return sha.hexdigest()
+            return hashlib.file_digest(fp, "sha256").digest()
+
+    @staticmethod
+    def _verify_digest(sha: Any, trailer: bytes, checksum: Optional[str]) -> None:
+        """Compare the running hash with the 0x02 trailer (or the hex checksum from older senders)."""
+        if trailer:
+            expected = trailer
+        elif checksum:
+            expected = bytes.fromhex(checksum)
+        else:
+            return
+        if sha.digest() != expected:
+            raise RuntimeError("Checksum mismatch")
@@ -3,10 +3,10 @@ from __future__ import annotations
 
 import asyncio
 import time
-import uuid
 from typing import Any, Dict, Optional, TYPE_CHECKING
 
-from shared.protocol.commands import MsgType
+from shared.protocol.commands import COMMAND_TEXT, MsgType
+from shared.protocol.errors import StatusCode
 
 if TYPE_CHECKING:
     from client.core import NetworkClient, ClientSession
@@ -19,31 +19,36 @@ class FriendsManager:
         self.network = network
         self.session = session
         self._friends: list[str] = []
+        self._friend_set: set[str] = set()  # is_friend 查询用，与 _friends 同步
         self._pending_requests: list[Dict[str, Any]] = []
         self._sent_requests: list[Dict[str, Any]] = []
         self._pending: Dict[str, asyncio.Future] = {}
 
         # Register handlers for friend-related responses (ACK commands)
-        for command in (
-            MsgType.FRIEND_REQUEST_ACK,
-            MsgType.FRIEND_ACCEPT_ACK,
-            MsgType.FRIEND_REJECT_ACK,
-            MsgType.FRIEND_DELETE_ACK,
-            MsgType.FRIEND_LIST_ACK,
-        ):
-            self.network.register_handler(command, self._handle_response)
+        self.network.register_handlers(
+            dict.fromkeys(
+                (
+                    MsgType.FRIEND_REQUEST_ACK,
+                    MsgType.FRIEND_ACCEPT_ACK,
+                    MsgType.FRIEND_REJECT_ACK,
+                    MsgType.FRIEND_DELETE_ACK,
+                    MsgType.FRIEND_LIST_ACK,
+                ),
+                self._handle_response,
+            )
+        )
 
     async def _request(self, command: MsgType, payload: Dict[str, Any]) -> Dict[str, Any]:
         """Send a request and wait for response."""
         msg = {
-            "id": str(uuid.uuid4()),
+            "id": self.session.next_id(),
             "type": "request",
             "timestamp": int(time.time()),
-            "command": command.value,
+            "command": COMMAND_TEXT[command],
             "payload": payload,
         }
         msg = self.session.attach_headers(msg)
-        future: asyncio.Future = asyncio.get_event_loop().create_future()
+        future: asyncio.Future = asyncio.get_running_loop().create_future()
         self._pending[msg["id"]] = future
         await self.network.send(msg)
         response = await asyncio.wait_for(future, timeout=10.0)
@@ -75,8 +80,13 @@ class FriendsManager:
                 "request_id": request_id
             }
         )
-        # Refresh friend list after accepting
-        await self.refresh_friends()
+        # ACK 自带 friend_id，直接增量更新缓存，省掉一次 FRIEND_LIST 往返
+        friend_id = response.get("friend_id")
+        if not self._succeeded(response) or not friend_id:
+            await self.refresh_friends()
+            return response
+        self._drop_pending_request(request_id)
+        self._add_friend(friend_id)
         return response
 
     async def reject_friend_request(self, request_id: int) -> Dict[str, Any]:
@@ -87,8 +97,10 @@ class FriendsManager:
                 "request_id": request_id
             }
         )
-        # Refresh friend list after rejecting
-        await self.refresh_friends()
+        if not self._succeeded(response):
+            await self.refresh_friends()
+            return response
+        self._drop_pending_request(request_id)
         return response
 
     async def delete_friend(self, friend_id: str) -> Dict[str, Any]:
@@ -99,8 +111,12 @@ class FriendsManager:
                 "friend_id": friend_id
             }
         )
-        # Refresh friend list after deleting
-        await self.refresh_friends()
+        if not self._succeeded(response):
+            await self.refresh_friends()
+            return response
+        if friend_id in self._friend_set:
+            self._friend_set.discard(friend_id)
+            self._friends.remove(friend_id)
         return response
 
     async def refresh_friends(self) -> Dict[str, Any]:
@@ -108,6 +124,7 @@ class FriendsManager:
         payload = await self._request(MsgType.FRIEND_LIST, {})
 
         self._friends = payload.get("friends", [])
+        self._friend_set = set(self._friends)
         self._pending_requests = payload.get("pending_requests", [])
         self._sent_requests = payload.get("sent_requests", [])
 
@@ -117,6 +134,18 @@ class FriendsManager:
             "sent_requests": self._sent_requests
         }
 
+    @staticmethod
+    def _succeeded(response: Dict[str, Any]) -> bool:
+        return int(response.get("status", StatusCode.SUCCESS)) == int(StatusCode.SUCCESS)
+
+    def _add_friend(self, friend_id: str) -> None:
+        if friend_id not in self._friend_set:
+            self._friend_set.add(friend_id)
+            self._friends.append(friend_id)
+
+    def _drop_pending_request(self, request_id: int) -> None:
+        self._pending_requests = [r for r in self._pending_requests if r.get("id") != request_id]
+
     def get_friends(self) -> list[str]:
         """Get cached friend list."""
         return self._friends
@@ -131,4 +160,4 @@ class FriendsManager:
 
     def is_friend(self, user_id: str) -> bool:
         """Check if a user is in friend list."""
-        return user_id in self._friends
+        return user_id in self._friend_set
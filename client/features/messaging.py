@@ -2,18 +2,23 @@ from __future__ import annotations
 
 import asyncio
 import logging
+import sqlite3
 import time
-from typing import Any, Dict, Optional
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
 
 from client.core.network import NetworkClient
 from client.core.session import ClientSession
 from client.storage.local_db import LocalDatabase
-from shared.protocol import validator
-from shared.protocol.commands import MsgType
-from shared.protocol.messages import MessageSendMsg
+from shared.protocol.commands import COMMAND_TEXT, MsgType
 
 logger = logging.getLogger(__name__)
 
+# 未被 UI 取走的入站消息上限；超出时只落库，界面可从本地历史补齐
+INCOMING_QUEUE_SIZE = 1024
+# 本地落库按批提交：最多攒 32 条或等 100ms，一次事务写入
+WRITE_BATCH_SIZE = 32
+WRITE_FLUSH_INTERVAL = 0.1
+
 
 class MessagingManager:
     """Messaging feature facade: sending, receiving, persistence."""
@@ -22,9 +27,15 @@ class MessagingManager:
         self.network = network
         self.session = session
         self.storage = storage
-        self._incoming_queue: asyncio.Queue[Dict[str, Any]] = asyncio.Queue()
-        network.register_handler(MsgType.MESSAGE_EVENT, self._handle_event)
-        network.register_handler(MsgType.MESSAGE_ACK, self._handle_ack)
+        self._incoming_queue: asyncio.Queue[Dict[str, Any]] = asyncio.Queue(maxsize=INCOMING_QUEUE_SIZE)
+        self._write_queue: asyncio.Queue[Optional[Tuple[str, Dict[str, Any]]]] = asyncio.Queue()
+        self._writer_task: Optional[asyncio.Task] = None
+        network.register_handlers(
+            {
+                MsgType.MESSAGE_EVENT: self._handle_event,
+                MsgType.MESSAGE_ACK: self._handle_ack,
+            }
+        )
 
     async def send_text(self, conversation_id: str, target_id: str, text: str, reply_to: Optional[Dict[str, Any]] = None) -> None:
         content: Dict[str, Any] = {"type": "text", "text": text}
@@ -35,15 +46,9 @@ class MessagingManager:
             "target": {"type": "user", "id": target_id},
             "content": content,
         }
-        msg = MessageSendMsg(
-            type="request",
-            timestamp=int(time.time()),
-            payload=payload,
-            headers=self.session.build_headers(),
-        ).model_dump()
-        schema = validator.load_schema(msg["command"])
-        await self.network.send(msg, schema)
-        self.storage.save_outbound_message(msg)
+        msg = self._build_send_message(payload)
+        await self.network.send(msg)
+        self._persist("outbound", msg)
 
     async def send_room_text(self, room_id: str, text: str, conversation_id: Optional[str] = None, reply_to: Optional[Dict[str, Any]] = None) -> None:
         convo = conversation_id or room_id
@@ -55,25 +60,90 @@ class MessagingManager:
             "target": {"type": "room", "id": room_id},
             "content": content,
         }
-        msg = MessageSendMsg(
-            type="request",
-            timestamp=int(time.time()),
-            payload=payload,
-            headers=self.session.build_headers(),
-        ).model_dump()
-        schema = validator.load_schema(msg["command"])
-        await self.network.send(msg, schema)
-        self.storage.save_outbound_message(msg)
+        msg = self._build_send_message(payload)
+        await self.network.send(msg)
+        self._persist("outbound", msg)
+
+    def _build_send_message(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        # Plain dict instead of MessageSendMsg(...).model_dump(); NetworkClient.send validates the frame.
+        return {
+            "id": self.session.next_id(),
+            "type": "request",
+            "timestamp": int(time.time()),
+            "command": COMMAND_TEXT[MsgType.MESSAGE_SEND],
+            "headers": self.session.build_headers(),
+            "payload": payload,
+        }
 
     async def _handle_ack(self, message: Dict[str, Any]) -> None:
         logger.debug("Message ACK: %s", message.get("payload"))
 
     async def _handle_event(self, message: Dict[str, Any]) -> None:
-        await self._incoming_queue.put(message)
-        self.storage.save_inbound_message(message)
+        # 不在这里 await put：UI 消费过慢时会卡住整个接收循环（ACK、心跳回包等）
+        try:
+            self._incoming_queue.put_nowait(message)
+        except asyncio.QueueFull:
+            logger.warning("Incoming queue full, message %s only stored locally", message.get("id"))
+        self._persist("inbound", message)
 
     async def next_message(self, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
         try:
             return await asyncio.wait_for(self._incoming_queue.get(), timeout=timeout)
         except asyncio.TimeoutError:
             return None
+
+    async def messages(self) -> AsyncIterator[Dict[str, Any]]:
+        """Yield incoming messages as they arrive; runs until the consuming task is cancelled."""
+        incoming = self._incoming_queue
+        while True:
+            yield await incoming.get()
+
+    async def close(self) -> None:
+        """Stop the writer task, flushing anything still queued for the local database."""
+        task, self._writer_task = self._writer_task, None
+        if task is not None and not task.done():
+            # 用哨兵而不是 cancel()：wait_for 恰好拿到消息时可能吞掉取消
+            self._write_queue.put_nowait(None)
+            await task
+
+    def _persist(self, direction: str, message: Dict[str, Any]) -> None:
+        self._write_queue.put_nowait((direction, message))
+        if self._writer_task is None or self._writer_task.done():
+            self._writer_task = asyncio.create_task(self._writer_loop(), name="messaging-db-writer")
+
+    async def _writer_loop(self) -> None:
+        write_q = self._write_queue
+        loop = asyncio.get_running_loop()
+        batch: list[Tuple[str, Dict[str, Any]]] = []
+        try:
+            while True:
+                item = await write_q.get()
+                deadline = loop.time() + WRITE_FLUSH_INTERVAL
+                while item is not None:
+                    batch.append(item)
+                    timeout = deadline - loop.time()
+                    if len(batch) >= WRITE_BATCH_SIZE or timeout <= 0:
+                        break
+                    try:
+                        item = await asyncio.wait_for(write_q.get(), timeout)
+                    except asyncio.TimeoutError:
+                        break
+                # sqlite 提交（含 fsync）放到线程里做，不阻塞事件循环
+                await asyncio.to_thread(self._flush, batch)
+                batch = []
+                if item is None:
+                    return
+        finally:
+            # 事件循环关闭时任务被取消：把已取出和仍在排队的消息一并写入
+            while not write_q.empty():
+                item = write_q.get_nowait()
+                if item is not None:
+                    batch.append(item)
+            if batch:
+                self._flush(batch)
+
+    def _flush(self, batch: list[Tuple[str, Dict[str, Any]]]) -> None:
+        try:
+            self.storage.save_batch(batch)
+        except sqlite3.Error:
+            logger.exception("Failed to store %s messages locally", len(batch))
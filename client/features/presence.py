@@ -2,13 +2,12 @@ from __future__ import annotations
 
 import asyncio
 import logging
-import uuid
+import time
 from typing import Dict, List, Optional
 
 from client.core.network import NetworkClient
 from client.core.session import ClientSession
-from shared.protocol import validator
-from shared.protocol.commands import MsgType
+from shared.protocol.commands import COMMAND_TEXT, MsgType
 
 logger = logging.getLogger(__name__)
 
@@ -21,21 +20,24 @@ class PresenceManager:
         self.session = session
         self._presence_event = asyncio.Event()
         self._latest_roster: List[str] = []
-        network.register_handler(MsgType.PRESENCE_EVENT, self._handle_event)
-        network.register_handler(MsgType.PRESENCE_LIST, self._handle_list_response)
+        network.register_handlers(
+            {
+                MsgType.PRESENCE_EVENT: self._handle_event,
+                MsgType.PRESENCE_LIST: self._handle_list_response,
+            }
+        )
 
     async def request_roster(self) -> List[str]:
         self._presence_event.clear()
         request = {
-            "id": uuid.uuid4().hex,
+            "id": self.session.next_id(),
             "type": "request",
             "timestamp": self._timestamp(),
-            "command": MsgType.PRESENCE_LIST.value,
+            "command": COMMAND_TEXT[MsgType.PRESENCE_LIST],
             "headers": self.session.build_headers(),
             "payload": {},
         }
-        schema = validator.load_schema(request["command"])
-        await self.network.send(request, schema)
+        await self.network.send(request)
         try:
             await asyncio.wait_for(self._presence_event.wait(), timeout=5)
         except asyncio.TimeoutError:
@@ -58,6 +60,4 @@ class PresenceManager:
 
     @staticmethod
     def _timestamp() -> int:
-        import time
-
         return int(time.time())
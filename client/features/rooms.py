@@ -2,13 +2,11 @@ from __future__ import annotations
 
 import asyncio
 import time
-import uuid
 from typing import Any, Dict, List
 
 from client.core.network import NetworkClient
 from client.core.session import ClientSession
-from shared.protocol import validator
-from shared.protocol.commands import MsgType
+from shared.protocol.commands import COMMAND_TEXT, MsgType
 from shared.protocol.errors import ProtocolError, StatusCode
 
 
@@ -17,17 +15,21 @@ class RoomManager:
         self.network = network
         self.session = session
         self._pending: Dict[str, asyncio.Future] = {}
-        for command in (
-            MsgType.ROOM_CREATE,
-            MsgType.ROOM_JOIN,
-            MsgType.ROOM_LEAVE,
-            MsgType.ROOM_LIST,
-            MsgType.ROOM_MEMBERS,
-            MsgType.ROOM_INFO,
-            MsgType.ROOM_KICK,
-            MsgType.ROOM_DELETE,
-        ):
-            self.network.register_handler(command, self._handle_response)
+        self.network.register_handlers(
+            dict.fromkeys(
+                (
+                    MsgType.ROOM_CREATE,
+                    MsgType.ROOM_JOIN,
+                    MsgType.ROOM_LEAVE,
+                    MsgType.ROOM_LIST,
+                    MsgType.ROOM_MEMBERS,
+                    MsgType.ROOM_INFO,
+                    MsgType.ROOM_KICK,
+                    MsgType.ROOM_DELETE,
+                ),
+                self._handle_response,
+            )
+        )
 
     async def create_room(self, room_id: str, encrypted: bool = False, password: str | None = None) -> Dict[str, Any]:
         payload: Dict[str, Any] = {"room_id": room_id, "encrypted": encrypted}
@@ -69,17 +71,16 @@ class RoomManager:
 
     async def _request(self, command: MsgType, payload: Dict[str, Any]) -> Dict[str, Any]:
         msg = {
-            "id": str(uuid.uuid4()),
+            "id": self.session.next_id(),
             "type": "request",
             "timestamp": int(time.time()),
-            "command": command.value,
+            "command": COMMAND_TEXT[command],
             "payload": payload,
         }
         msg = self.session.attach_headers(msg)
-        future: asyncio.Future = asyncio.get_event_loop().create_future()
+        future: asyncio.Future = asyncio.get_running_loop().create_future()
         self._pending[msg["id"]] = future
-        schema = validator.load_schema(command.value)
-        await self.network.send(msg, schema)
+        await self.network.send(msg)
         try:
             response = await asyncio.wait_for(future, timeout=10)
         finally:
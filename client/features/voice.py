@@ -4,12 +4,18 @@
 from __future__ import annotations
 
 import asyncio
+import binascii
+import ctypes
+import functools
+import json
 import logging
 import queue
 import threading
 import time
 import uuid
-from typing import Any, Callable, Dict, Optional
+from array import array
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
 
 try:
     import pyaudio
@@ -24,12 +30,111 @@ except (ImportError, Exception):
     # opuslib might be installed but the native Opus library might not be available
     OPUS_AVAILABLE = False
 
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
 from shared.protocol import DEFAULT_VERSION
 from shared.protocol.commands import MsgType
 from shared.protocol.errors import ProtocolError, StatusCode
 
 logger = logging.getLogger(__name__)
 
+# 输入回调 -> 编码线程、编码线程 -> 发送协程两级缓冲的容量（20ms/帧）；满了丢最旧的帧，
+# 网络卡顿后只发最新的音频，端到端延迟以缓冲容量为上限
+VOICE_PCM_BUFFER_FRAMES = 4
+VOICE_SEND_BUFFER_FRAMES = 6
+# 发送协程与网络写协程之间的包队列上限；满时丢最旧的包，网络抖动不会反压到编码
+VOICE_NET_QUEUE_PACKETS = 8
+# 收到的语音帧先进这个环形缓冲（约 1s），由解码线程取出解码；满了丢最旧的帧
+VOICE_DECODE_BUFFER_FRAMES = 50
+# 每丢这么多帧记一次日志
+VOICE_DROP_LOG_INTERVAL = 250
+# 每帧时长（毫秒）
+VOICE_FRAME_MS = 20
+# 每条 voice/data 消息打包的帧数（2 帧 = 40ms），分摊 JSON 信封和 send 的开销
+VOICE_FRAMES_PER_SEND = 2
+# voice/data 的 timestamp 只有秒级精度：每秒音频（按包数计）才重新读一次墙上时钟
+VOICE_PACKETS_PER_SECOND = max(1, 1000 // (VOICE_FRAME_MS * VOICE_FRAMES_PER_SEND))
+# Opus 编码档位 (bitrate bps, complexity)，按发送积压在相邻档位间切换；初始为中间档
+OPUS_QUALITY_LEVELS = ((16000, 3), (24000, 5), (32000, 8))
+# 编码线程每编码这么多帧采样一次发送积压（约 0.5s）
+VOICE_ADAPT_INTERVAL_FRAMES = 25
+# 积压按帧计，包括写协程队列里还没写出的包（网络卡住时积压在那里）：
+# 超过 3 包（120ms）或采样间隔内有丢帧即降档；连续若干次采样都没有积压才升档，避免来回抖动
+VOICE_BACKLOG_HIGH_FRAMES = 3 * VOICE_FRAMES_PER_SEND
+VOICE_CALM_SAMPLES_TO_UPGRADE = 4
+# 静音门限：一帧的平均绝对幅度（int16）低于该值视为静音，不编码也不发送
+VOICE_VAD_LEVEL = 200
+# 说话结束后继续发送的帧数（300ms），避免截掉句尾的弱音节
+VOICE_VAD_HANGOVER_FRAMES = 15
+# voice/data 预序列化信封的尾部：关闭 data 列表并补上 seq、id、timestamp
+_VOICE_DATA_SUFFIX = b'"],"seq":%d},"id":"%s","timestamp":%d}'
+# opus_encode 单包输出上限（libopus 文档推荐值）
+OPUS_MAX_PACKET_BYTES = 4000
+_C_INT16_P = ctypes.POINTER(ctypes.c_int16)
+# 播放端抖动缓冲上限（帧数）；超出时丢最旧的帧，避免延迟累积
+VOICE_PLAYBACK_BUFFER_FRAMES = 5
+
+
+def _libopus_version() -> Optional[str]:
+    """Return the linked libopus version string, e.g. "libopus 1.4"."""
+    try:
+        from opuslib.api import info as opus_info
+        version = opus_info.get_version_string()
+    except Exception:
+        return None
+    return version.decode() if isinstance(version, bytes) else str(version)
+
+
+def _check_libopus_build() -> None:
+    """Log the libopus in use; warn when it predates default SIMD (RTCD) builds."""
+    version = _libopus_version()
+    if not version:
+        return
+    logger.info("Using %s", version)
+    # libopus 1.3 起 x86/ARM 默认开启 intrinsics + 运行时 CPU 检测（SSE4.1/AVX2/NEON）；更老的库多为纯 C 实现
+    parts = version.split()[-1].split(".")
+    try:
+        major, minor = int(parts[0]), int(parts[1].split("-")[0])
+    except (IndexError, ValueError):
+        return
+    if (major, minor) < (1, 3):
+        logger.warning("%s predates SIMD-enabled default builds; upgrade libopus to >= 1.3 for faster encode/decode", version)
+
+
+def pcm_samples(pcm: bytes) -> Any:
+    """Zero-copy int16 sample view over a PCM frame (ndarray with numpy, memoryview otherwise).
+
+    PortAudio 回调交出的 bytes 就是唯一一份采样数据；各级 DSP 都在这个视图上读，不再各自拷贝一遍。
+    """
+    if NUMPY_AVAILABLE:
+        return np.frombuffer(pcm, dtype=np.int16)
+    return memoryview(pcm).cast("h")
+
+
+def frame_level(pcm: bytes) -> int:
+    """Mean absolute amplitude of a 16-bit PCM frame (cheap energy measure for the VAD gate)."""
+    samples = pcm_samples(pcm)
+    if not len(samples):
+        return 0
+    if NUMPY_AVAILABLE:
+        # 先升到 int32：abs(-32768) 在 int16 下会溢出
+        return int(np.abs(samples.astype(np.int32)).mean())
+    return sum(map(abs, samples)) // len(samples)
+
+
+def mix_frames(frames: List[bytes]) -> bytes:
+    """Mix equal-length 16-bit PCM frames with a saturating sum."""
+    if NUMPY_AVAILABLE:
+        # int32 累加后截断回 int16；NumPy 内部走 SIMD，不逐样本跑 Python
+        mixed = np.sum([pcm_samples(frame) for frame in frames], axis=0, dtype=np.int32)
+        return np.clip(mixed, -32768, 32767).astype(np.int16).tobytes()
+    mixed = [sum(samples) for samples in zip(*(pcm_samples(frame) for frame in frames))]
+    return array("h", [-32768 if v < -32768 else 32767 if v > 32767 else v for v in mixed]).tobytes()
+
 
 class VoiceCallError(ProtocolError):
     """Voice call specific error."""
@@ -68,21 +173,42 @@ class AudioHandler:
         self.output_stream: Optional[pyaudio.Stream] = None
         self.encoder = None
         self.decoder = None
+        # 直接绑定的 opus_encode/opus_decode 及复用的输出缓冲（见 _bind_opus_native）
+        self._opus_encode = None
+        self._opus_decode = None
+        self._packet_out = None
+        self._pcm_out = None
+        self._on_pcm: Optional[Callable[[bytes], None]] = None
+        self._quality: Optional[int] = None
+        self._calm_samples = 0
+        # 解码后的 PCM 按发送者分队列，由 PortAudio 输出回调各取一帧混音；都缺帧时播放静音
+        self._playback: Dict[str, Deque[bytes]] = {}
+        # Opus 解码器有状态，群聊里每个发送者各用一个
+        self._decoders: Dict[str, Any] = {}
+        self._silence = bytes(self.chunk_size)
 
         if self.use_opus:
             try:
                 # Opus application type: 2048 = VOIP
                 self.encoder = opuslib.Encoder(sample_rate, channels, opuslib.APPLICATION_VOIP)
                 self.decoder = opuslib.Decoder(sample_rate, channels)
-                logger.info(f"Opus codec initialized: {sample_rate}Hz, {channels} channel(s)")
+                logger.info("Opus codec initialized: %sHz, %s channel(s)", sample_rate, channels)
+                _check_libopus_build()
+                self._bind_opus_native()
+                self._set_quality(len(OPUS_QUALITY_LEVELS) // 2)
+                self._enable_dtx()
             except Exception as e:
-                logger.error(f"Failed to initialize Opus codec: {e}, falling back to PCM")
+                logger.error("Failed to initialize Opus codec: %s, falling back to PCM", e)
                 self.use_opus = False
 
-    def start_input(self) -> None:
-        """Start capturing audio from microphone."""
+    def start_input(self, on_pcm: Callable[[bytes], None]) -> None:
+        """Start capturing audio from microphone; `on_pcm` receives each raw PCM frame.
+
+        `on_pcm` runs on PortAudio's callback thread and must not block.
+        """
         if self.input_stream:
             return
+        self._on_pcm = on_pcm
         try:
             # Test microphone access first
             logger.info("Requesting microphone access...")
@@ -92,6 +218,7 @@ class AudioHandler:
                 rate=self.sample_rate,
                 input=True,
                 frames_per_buffer=self.frame_size,
+                stream_callback=self._input_callback,
             )
             logger.info("Audio input stream started (Microphone access granted)")
         except OSError as e:
@@ -117,6 +244,7 @@ class AudioHandler:
                 rate=self.sample_rate,
                 output=True,
                 frames_per_buffer=self.frame_size,
+                stream_callback=self._output_callback,
             )
             logger.info("Audio output stream started")
         except Exception as e:
@@ -125,39 +253,144 @@ class AudioHandler:
                 message=f"Failed to start audio output: {e}"
             )
 
-    def read_frame(self) -> Optional[bytes]:
-        """Read one audio frame from mic and encode if opus is enabled."""
-        if not self.input_stream:
-            return None
+    def adapt_quality(self, backlog_frames: int, dropped_frames: int = 0) -> None:
+        """Step encoder bitrate/complexity down when frames back up or get dropped, and back up once drained.
+
+        Must be called from the thread that calls encode(): libopus encoder state is not thread-safe.
+        """
+        if self._quality is None:
+            return
+        if dropped_frames or backlog_frames > VOICE_BACKLOG_HIGH_FRAMES:
+            self._calm_samples = 0
+            if self._quality > 0:
+                self._set_quality(self._quality - 1)
+        elif backlog_frames < VOICE_FRAMES_PER_SEND:
+            self._calm_samples += 1
+            if self._calm_samples >= VOICE_CALM_SAMPLES_TO_UPGRADE and self._quality < len(OPUS_QUALITY_LEVELS) - 1:
+                self._calm_samples = 0
+                self._set_quality(self._quality + 1)
+
+    def _set_quality(self, level: int) -> None:
+        bitrate, complexity = OPUS_QUALITY_LEVELS[level]
         try:
-            # 检查stream是否仍然活跃
-            if not self.input_stream or not hasattr(self.input_stream, 'read'):
-                return None
+            self.encoder.bitrate = bitrate
+            self.encoder.complexity = complexity
+        except Exception as e:
+            logger.debug("Failed to adjust Opus encoder settings: %s", e)
+            return
+        self._quality = level
+        logger.debug("Opus encoder set to %s bps, complexity %s", bitrate, complexity)
 
-            pcm_data = self.input_stream.read(self.frame_size, exception_on_overflow=False)
-            if self.use_opus and self.encoder:
-                return self.encoder.encode(pcm_data, self.frame_size)
+    def is_speech(self, pcm_data: bytes) -> bool:
+        """Energy-threshold VAD: True when the frame is loud enough to be worth sending."""
+        return frame_level(pcm_data) >= VOICE_VAD_LEVEL
+
+    def _enable_dtx(self) -> None:
+        # 静音门限之外的低能量帧（说话尾音）交给 Opus DTX 压成极小的包；
+        # opuslib 的 dtx 属性 setter 误用了 get 请求，这里直接走 encoder_ctl
+        try:
+            from opuslib.api import ctl as opus_ctl, encoder as opus_encoder
+            opus_encoder.encoder_ctl(self.encoder.encoder_state, opus_ctl.set_dtx, 1)
+        except Exception as e:
+            logger.debug("Failed to enable Opus DTX: %s", e)
+
+    def _bind_opus_native(self) -> None:
+        """Call libopus through opuslib's ctypes bindings with preallocated output buffers.
+
+        opuslib's Encoder.encode/Decoder.decode allocate a fresh ctypes buffer per call and
+        decode copies the samples through a Python list; at 50 frames/s both add up.
+        """
+        try:
+            from opuslib.api import decoder as opus_decoder, encoder as opus_encoder
+            opus_encode = opus_encoder.libopus_encode
+            opus_decode = opus_decoder.libopus_decode
+            if not hasattr(self.encoder, "encoder_state") or not hasattr(self.decoder, "decoder_state"):
+                raise AttributeError("opuslib codec objects expose no native state")
+        except Exception as e:
+            logger.debug("Direct libopus binding unavailable, using opuslib wrappers: %s", e)
+            return
+        self._opus_encode = opus_encode
+        self._opus_decode = opus_decode
+        self._packet_out = ctypes.create_string_buffer(OPUS_MAX_PACKET_BYTES)
+        self._pcm_out = (ctypes.c_int16 * (self.frame_size * self.channels))()
+
+    def _input_callback(self, in_data, frame_count, time_info, status):
+        # in_data 是 PyAudio 从 PortAudio 缓冲拷出的唯一一份 bytes；之后的 VAD/编码都直接在它上面做
+        # （pcm_samples 视图、ctypes.cast 指针），采集路径上没有别的逐帧分配
+        on_pcm = self._on_pcm
+        if in_data and on_pcm is not None:
+            on_pcm(in_data)
+        return (None, pyaudio.paContinue)
+
+    def _output_callback(self, in_data, frame_count, time_info, status):
+        needed = frame_count * self.channels * 2
+        # list() 在持有 GIL 时一次性拷贝，事件循环线程新增发送者不会打断这里的遍历
+        frames = [pending.popleft() for pending in list(self._playback.values()) if pending]
+        if not frames:
+            pcm_data = self._silence
+        elif len(frames) == 1:
+            pcm_data = frames[0]
+        else:
+            pcm_data = mix_frames([frame[:needed].ljust(needed, b"\0") for frame in frames])
+        if len(pcm_data) != needed:
+            pcm_data = pcm_data[:needed].ljust(needed, b"\0")
+        return (pcm_data, pyaudio.paContinue)
+
+    def encode(self, pcm_data: bytes) -> Optional[bytes]:
+        """Encode one PCM frame (pass-through when opus is disabled)."""
+        if not (self.use_opus and self.encoder):
             return pcm_data
-        except (OSError, IOError) as e:
-            # Stream已关闭或设备不可用
-            logger.debug(f"Audio stream closed or unavailable: {e}")
-            return None
+        try:
+            # opuslib 通过 ctypes.CDLL 调用 libopus，调用期间本身就会释放 GIL
+            if self._opus_encode is None:
+                return self.encoder.encode(pcm_data, self.frame_size)
+            if len(pcm_data) != self.chunk_size:
+                raise ValueError(f"expected {self.chunk_size} bytes of PCM, got {len(pcm_data)}")
+            size = self._opus_encode(
+                self.encoder.encoder_state,
+                ctypes.cast(pcm_data, _C_INT16_P),
+                self.frame_size,
+                self._packet_out,
+                OPUS_MAX_PACKET_BYTES,
+            )
+            if size < 0:
+                raise RuntimeError(f"opus_encode failed ({size})")
+            return ctypes.string_at(self._packet_out, size)
         except Exception as e:
-            logger.error(f"Failed to read audio frame: {e}")
+            logger.error("Failed to encode audio frame: %s", e)
             return None
 
-    def write_frame(self, data: bytes) -> None:
-        """Decode (if opus) and write audio frame to speaker."""
+    def write_frame(self, data: bytes, source: str = "") -> None:
+        """Decode (if opus) and queue audio frame from `source` for the speaker callback."""
         if not self.output_stream:
             return
         try:
             if self.use_opus and self.decoder:
-                pcm_data = self.decoder.decode(data, self.frame_size)
+                decoder = self._decoder_for(source)
+                if self._opus_decode is None:
+                    pcm_data = decoder.decode(data, self.frame_size)
+                else:
+                    samples = self._opus_decode(
+                        decoder.decoder_state, data, len(data), self._pcm_out, self.frame_size, 0
+                    )
+                    if samples < 0:
+                        raise RuntimeError(f"opus_decode failed ({samples})")
+                    pcm_data = ctypes.string_at(self._pcm_out, samples * self.channels * 2)
             else:
                 pcm_data = data
-            self.output_stream.write(pcm_data)
+            playback = self._playback.get(source)
+            if playback is None:
+                playback = self._playback[source] = deque(maxlen=VOICE_PLAYBACK_BUFFER_FRAMES)
+            playback.append(pcm_data)
         except Exception as e:
-            logger.error(f"Failed to write audio frame: {e}")
+            logger.error("Failed to write audio frame: %s", e)
+
+    def _decoder_for(self, source: str) -> Any:
+        decoder = self._decoders.get(source)
+        if decoder is None:
+            decoder = self.decoder if not self._decoders else opuslib.Decoder(self.sample_rate, self.channels)
+            self._decoders[source] = decoder
+        return decoder
 
     def stop_input(self) -> None:
         """Stop audio capture."""
@@ -165,6 +398,7 @@ class AudioHandler:
             self.input_stream.stop_stream()
             self.input_stream.close()
             self.input_stream = None
+            self._on_pcm = None
             logger.info("Audio input stream stopped")
 
     def stop_output(self) -> None:
@@ -173,6 +407,8 @@ class AudioHandler:
             self.output_stream.stop_stream()
             self.output_stream.close()
             self.output_stream = None
+            self._playback.clear()
+            self._decoders.clear()
             logger.info("Audio output stream stopped")
 
     def cleanup(self) -> None:
@@ -196,14 +432,34 @@ class VoiceManager:
         self.current_call: Optional[Dict[str, Any]] = None
         self.audio_handler: Optional[AudioHandler] = None
         self._send_task: Optional[asyncio.Task] = None
+        self._writer_task: Optional[asyncio.Task] = None
+        self._net_out: Optional[asyncio.Queue] = None
         self._receive_loop_running = False
-        self._audio_send_queue: queue.Queue[bytes] = queue.Queue()
-        self._audio_thread: Optional[threading.Thread] = None
+        # 单生产者（采集线程）/单消费者（发送协程）：deque 的 append/popleft 是原子的，无需加锁
+        self._audio_send_buffer: Deque[bytes] = deque(maxlen=VOICE_SEND_BUFFER_FRAMES)
+        # 静音门关闭时由编码线程置位：发送协程把不满一包的尾帧立即发出
+        self._flush_send_buffer = False
+        # PortAudio 输入回调只把原始 PCM 放进缓冲，编码交给单独的编码线程
+        self._pcm_buffer: Deque[bytes] = deque(maxlen=VOICE_PCM_BUFFER_FRAMES)
+        self._dropped_frames = 0
+        self._pcm_ready = threading.Event()
+        # 入站帧（发送者, Opus/PCM 字节）：事件循环只负责入队，解码在 VoiceDecode 线程里做
+        self._decode_buffer: Deque[Tuple[str, bytes]] = deque(maxlen=VOICE_DECODE_BUFFER_FRAMES)
+        self._decode_ready = threading.Event()
+        self._audio_stop = threading.Event()
+        self._encode_thread: Optional[threading.Thread] = None
+        self._decode_thread: Optional[threading.Thread] = None
+        self._audio_ready = asyncio.Event()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
 
         # Register event handlers
-        self.network.register_handler(MsgType.VOICE_CALL_ACK, self._handle_call_ack)
-        self.network.register_handler(MsgType.VOICE_EVENT, self._handle_voice_event)
-        self.network.register_handler(MsgType.VOICE_DATA, self._handle_voice_data)
+        self.network.register_handlers(
+            {
+                MsgType.VOICE_CALL_ACK: self._handle_call_ack,
+                MsgType.VOICE_EVENT: self._handle_voice_event,
+                MsgType.VOICE_DATA: self._handle_voice_data,
+            }
+        )
 
     async def initiate_call(self, target_type: str, target_id: str, call_type: str = "direct") -> Dict[str, Any]:
         """
@@ -222,7 +478,7 @@ class VoiceManager:
 
         call_id = uuid.uuid4().hex
         headers = self.session.build_headers()
-        logger.info(f"[INITIATE CALL] Starting new call {call_id}, target={target_type}:{target_id}")
+        logger.info("[INITIATE CALL] Starting new call %s, target=%s:%s", call_id, target_type, target_id)
 
         msg = {
             "id": call_id,
@@ -255,7 +511,7 @@ class VoiceManager:
             "participants": [self.session.user_id] if self.session.user_id else [],  # 添加参与者列表
         }
         self._notify_ui("status", "正在呼叫...")
-        logger.info(f"[INITIATE CALL] Call {call_id} initiated successfully")
+        logger.info("[INITIATE CALL] Call %s initiated successfully", call_id)
         return {"status": 200, "call_id": call_id}
 
     async def answer_call(self, call_id: str) -> Dict[str, Any]:
@@ -263,10 +519,10 @@ class VoiceManager:
         if not self.current_call or self.current_call.get("call_id") != call_id:
             raise VoiceCallError(StatusCode.NOT_FOUND, message="Call not found")
 
-        logger.info(f"[ANSWER CALL] Answering call {call_id}...")
+        logger.info("[ANSWER CALL] Answering call %s...", call_id)
 
         msg = {
-            "id": uuid.uuid4().hex,
+            "id": self.session.next_id(),
             "type": "request",
             "timestamp": int(time.time()),
             "command": MsgType.VOICE_ANSWER.value,
@@ -279,16 +535,16 @@ class VoiceManager:
 
         await self.network.send(msg)
         self.current_call["status"] = "connected"
-        logger.info(f"[ANSWER CALL] Starting audio streams for call {call_id}...")
+        logger.info("[ANSWER CALL] Starting audio streams for call %s...", call_id)
         await self._start_audio_streams_async()  # 使用异步版本
         self._notify_ui("status", "通话已接通")
-        logger.info(f"[ANSWER CALL] Call {call_id} answered successfully")
+        logger.info("[ANSWER CALL] Call %s answered successfully", call_id)
         return {"status": 200, "call_id": call_id}
 
     async def reject_call(self, call_id: str) -> Dict[str, Any]:
         """Reject an incoming call."""
         msg = {
-            "id": uuid.uuid4().hex,
+            "id": self.session.next_id(),
             "type": "request",
             "timestamp": int(time.time()),
             "command": MsgType.VOICE_REJECT.value,
@@ -299,7 +555,7 @@ class VoiceManager:
         await self.network.send(msg)
         self.current_call = None
         self._notify_ui("status", "已拒绝通话")
-        logger.info(f"Rejected call {call_id}")
+        logger.info("Rejected call %s", call_id)
         return {"status": 200, "call_id": call_id}
 
     async def end_call(self) -> Dict[str, Any]:
@@ -310,7 +566,7 @@ class VoiceManager:
 
         call_id = self.current_call.get("call_id")
         call_type = self.current_call.get("call_type", "direct")
-        logger.info(f"[END CALL] Ending call {call_id}, type={call_type}...")
+        logger.info("[END CALL] Ending call %s, type=%s...", call_id, call_type)
 
         # 计算通话时长并准备通话结束信息
         call_end_info = self._prepare_call_end_info("local")
@@ -329,7 +585,7 @@ class VoiceManager:
 
         # 发送end消息到服务器
         msg = {
-            "id": uuid.uuid4().hex,
+            "id": self.session.next_id(),
             "type": "request",
             "timestamp": int(time.time()),
             "command": MsgType.VOICE_END.value,
@@ -342,7 +598,7 @@ class VoiceManager:
             await self.network.send(msg)
             logger.info("[END CALL] VOICE_END message sent successfully")
         except Exception as e:
-            logger.warning(f"[END CALL] Failed to send end_call message: {e}")
+            logger.warning("[END CALL] Failed to send end_call message: %s", e)
 
         # 最后清除通话状态
         self.current_call = None
@@ -354,7 +610,7 @@ class VoiceManager:
         call_end_info["add_to_conversation"] = (call_type == "direct")
         self._notify_ui("call_ended", call_end_info)
         self._notify_ui("status", "通话已结束")
-        logger.info(f"[END CALL] Call {call_id} ended successfully")
+        logger.info("[END CALL] Call %s ended successfully", call_id)
         return {"status": 200, "call_id": call_id}
 
     async def _start_audio_streams_async(self) -> None:
@@ -365,27 +621,24 @@ class VoiceManager:
             self.audio_handler = AudioHandler(
                 sample_rate=48000,
                 channels=1,
-                frame_duration=20,
+                frame_duration=VOICE_FRAME_MS,
                 use_opus=OPUS_AVAILABLE
             )
 
-            self.audio_handler.start_input()
+            self._loop = asyncio.get_running_loop()
+            self.audio_handler.start_input(self._on_pcm)
             self.audio_handler.start_output()
 
-            # Start audio capture thread
-            self._audio_thread = threading.Thread(
-                target=self._audio_capture_loop,
-                name="VoiceCapture",
-                daemon=True
-            )
-            self._audio_thread.start()
+            # Start audio encode/decode threads
+            self._start_audio_threads()
 
-            # Start audio send task
+            # Start network writer and audio send task
+            self._start_network_writer()
             self._send_task = asyncio.create_task(self._audio_send_loop(), name="VoiceSend")
 
             logger.info("[START AUDIO] Audio streams started successfully")
         except Exception as e:
-            logger.error(f"[START AUDIO] Failed to start audio streams: {e}", exc_info=True)
+            logger.error("[START AUDIO] Failed to start audio streams: %s", e, exc_info=True)
             self._stop_audio_streams()
             self._notify_ui("error", f"音频启动失败: {e}")
 
@@ -400,36 +653,70 @@ class VoiceManager:
             self.audio_handler = AudioHandler(
                 sample_rate=48000,
                 channels=1,
-                frame_duration=20,
+                frame_duration=VOICE_FRAME_MS,
                 use_opus=OPUS_AVAILABLE
             )
 
             logger.info("[START AUDIO] Starting audio input (microphone)...")
-            self.audio_handler.start_input()
+            self._loop = asyncio.get_running_loop()
+            self.audio_handler.start_input(self._on_pcm)
 
             logger.info("[START AUDIO] Starting audio output (speaker)...")
             self.audio_handler.start_output()
 
-            # Start audio capture thread
-            logger.info("[START AUDIO] Starting audio capture thread...")
-            self._audio_thread = threading.Thread(
-                target=self._audio_capture_loop,
-                name="VoiceCapture",
-                daemon=True
-            )
-            self._audio_thread.start()
+            # Start audio encode/decode threads
+            logger.info("[START AUDIO] Starting audio encode/decode threads...")
+            self._start_audio_threads()
 
             # Start audio send task
             logger.info("[START AUDIO] Starting audio send task...")
+            self._start_network_writer()
             self._send_task = asyncio.create_task(self._audio_send_loop(), name="VoiceSend")
 
             logger.info("[START AUDIO] Audio streams started successfully")
         except Exception as e:
-            logger.error(f"[START AUDIO] Failed to start audio streams: {e}", exc_info=True)
+            logger.error("[START AUDIO] Failed to start audio streams: %s", e, exc_info=True)
             # 启动失败时清理
             self._stop_audio_streams()
             self._notify_ui("error", f"音频启动失败: {e}")
 
+    def _start_audio_threads(self) -> None:
+        """Start the encode (PCM -> frame) thread fed by the input stream callback and the
+        decode (frame -> playback) thread fed by _handle_voice_data."""
+        self._dropped_frames = 0
+        self._audio_stop.clear()
+        self._encode_thread = threading.Thread(
+            target=self._audio_encode_loop,
+            name="VoiceEncode",
+            daemon=True
+        )
+        self._encode_thread.start()
+        self._decode_thread = threading.Thread(
+            target=self._audio_decode_loop,
+            name="VoiceDecode",
+            daemon=True
+        )
+        self._decode_thread.start()
+
+    def _start_network_writer(self) -> None:
+        """Start the coroutine that drains the outgoing packet queue to the network."""
+        self._net_out = asyncio.Queue(maxsize=VOICE_NET_QUEUE_PACKETS)
+        self._writer_task = asyncio.create_task(self._network_writer(self._net_out), name="VoiceWriter")
+
+    def _on_pcm(self, pcm: bytes) -> None:
+        """Input stream callback hook (PortAudio thread): hand the frame to the encoder."""
+        pcm_buffer = self._pcm_buffer
+        if len(pcm_buffer) == pcm_buffer.maxlen:
+            self._count_dropped_frame()
+        pcm_buffer.append(pcm)
+        self._pcm_ready.set()
+
+    def _count_dropped_frame(self) -> None:
+        """Record a frame overwritten by a full buffer (drop-oldest policy)."""
+        self._dropped_frames += 1
+        if self._dropped_frames % VOICE_DROP_LOG_INTERVAL == 0:
+            logger.warning("[VOICE] Dropped %s late audio frames so far", self._dropped_frames)
+
     def _stop_audio_streams(self) -> None:
         """Stop audio capture and playback."""
         logger.info("[VOICE CLEANUP] Starting audio streams cleanup...")
@@ -439,21 +726,23 @@ class VoiceManager:
             logger.info("[VOICE CLEANUP] Cancelling audio send task...")
             self._send_task.cancel()
             self._send_task = None
-
-        # 注意：不要立即清理audio_handler，因为捕获线程可能还在使用
-        # 先让线程检测到状态变化并退出（最多20ms一帧）
-        # 给线程最多100ms时间退出
-        if self._audio_thread and self._audio_thread.is_alive():
-            logger.info("[VOICE CLEANUP] Waiting for audio capture thread to exit...")
-            for i in range(10):  # 最多等待100ms
-                if not self._audio_thread.is_alive():
-                    logger.info(f"[VOICE CLEANUP] Audio capture thread exited after {i*10}ms")
-                    break
-                time.sleep(0.01)  # 等待10ms
-            else:
-                logger.warning("[VOICE CLEANUP] Audio capture thread still alive after 100ms, forcing cleanup")
-
-        self._audio_thread = None
+        if self._writer_task and not self._writer_task.done():
+            self._writer_task.cancel()
+        self._writer_task = None
+        self._net_out = None
+
+        # 注意：不要立即清理audio_handler，因为编解码线程可能还在使用
+        # 置停止标志并唤醒在 _pcm_ready/_decode_ready 上等待的线程，join 在线程退出时立即返回
+        self._audio_stop.set()
+        self._pcm_ready.set()
+        self._decode_ready.set()
+        for thread in (self._encode_thread, self._decode_thread):
+            if thread and thread.is_alive():
+                thread.join(timeout=0.1)
+                if thread.is_alive():
+                    logger.warning("[VOICE CLEANUP] Audio thread %s still alive after 100ms, forcing cleanup", thread.name)
+        self._encode_thread = None
+        self._decode_thread = None
 
         # 现在安全地清理音频处理器
         if self.audio_handler:
@@ -461,59 +750,108 @@ class VoiceManager:
             try:
                 self.audio_handler.cleanup()
             except Exception as e:
-                logger.error(f"Error during audio handler cleanup: {e}")
+                logger.error("Error during audio handler cleanup: %s", e)
             self.audio_handler = None
 
-        # 清空并重新创建音频队列
-        try:
-            logger.info("[VOICE CLEANUP] Clearing audio queue...")
-            cleared_count = 0
-            while not self._audio_send_queue.empty():
-                try:
-                    self._audio_send_queue.get_nowait()
-                    cleared_count += 1
-                except:
-                    break
-            if cleared_count > 0:
-                logger.info(f"[VOICE CLEANUP] Cleared {cleared_count} frames from queue")
-
-            # 重新创建队列以确保完全清洁
-            self._audio_send_queue = queue.Queue()
-            logger.info("[VOICE CLEANUP] Audio queue recreated")
-        except Exception as e:
-            logger.error(f"[VOICE CLEANUP] Error clearing queue: {e}")
-            # 强制重新创建
-            self._audio_send_queue = queue.Queue()
+        cleared_count = len(self._audio_send_buffer) + len(self._pcm_buffer) + len(self._decode_buffer)
+        self._audio_send_buffer.clear()
+        self._flush_send_buffer = False
+        self._pcm_buffer.clear()
+        self._decode_buffer.clear()
+        if cleared_count > 0:
+            logger.info("[VOICE CLEANUP] Cleared %s frames from send buffer", cleared_count)
 
         logger.info("[VOICE CLEANUP] Audio streams cleanup completed")
 
 
-    def _audio_capture_loop(self) -> None:
-        """Capture audio in background thread and queue for sending."""
-        logger.info("[AUDIO CAPTURE] Audio capture thread started")
-        frame_count = 0
-        while self.audio_handler and self.current_call and self.current_call.get("status") == "connected":
+    def _audio_encode_loop(self) -> None:
+        """Encode captured PCM in background thread and queue frames for sending."""
+        pcm_buffer = self._pcm_buffer
+        pcm_ready = self._pcm_ready
+        send_buffer = self._audio_send_buffer
+        wake_sender = functools.partial(self._loop.call_soon_threadsafe, self._audio_ready.set)
+        encoded = 0
+        last_dropped = self._dropped_frames
+        hangover = 0
+        stop = self._audio_stop
+        while not stop.is_set():
             try:
-                # 双重检查：确保audio_handler仍然存在
+                if not pcm_buffer:
+                    pcm_ready.clear()
+                    if not pcm_buffer:
+                        pcm_ready.wait(timeout=0.1)
+                        continue
                 handler = self.audio_handler
                 if not handler:
                     break
-
-                frame = handler.read_frame()
-                if frame:
-                    self._audio_send_queue.put(frame)
-                    frame_count += 1
-                    if frame_count % 50 == 0:  # 每50帧记录一次（约1秒）
-                        logger.debug(f"[AUDIO CAPTURE] Captured {frame_count} frames, queue size: {self._audio_send_queue.qsize()}")
+                pcm = pcm_buffer.popleft()
+                # 静音门：持续静音（过了挂起期）的帧直接丢弃，编码和发送都省掉；对端缺帧时自动播放静音
+                if handler.is_speech(pcm):
+                    hangover = VOICE_VAD_HANGOVER_FRAMES
+                elif hangover:
+                    hangover -= 1
                 else:
-                    time.sleep(0.001)  # Small delay on error
+                    continue
+                frame = handler.encode(pcm)
+                encoded += 1
+                if encoded % VOICE_ADAPT_INTERVAL_FRAMES == 0:
+                    # 发送循环立即把包交给写协程，网络卡住时积压在 _net_out 里（满了丢最旧的包）
+                    net_out = self._net_out
+                    backlog = len(send_buffer)
+                    if net_out is not None:
+                        backlog += net_out.qsize() * VOICE_FRAMES_PER_SEND
+                    dropped = self._dropped_frames
+                    handler.adapt_quality(backlog, dropped - last_dropped)
+                    last_dropped = dropped
+                if frame:
+                    if len(send_buffer) == send_buffer.maxlen:
+                        self._count_dropped_frame()
+                    send_buffer.append(frame)
+                    # 发送协程只在攒够一包时才需要醒来；跨线程唤醒要写自管道（一次系统调用），按包而不是按帧触发
+                    if len(send_buffer) >= VOICE_FRAMES_PER_SEND:
+                        wake_sender()
+                if not hangover and send_buffer:
+                    # 静音门就此关闭：不满一包的尾帧现在发出，而不是留到下一句话开头
+                    self._flush_send_buffer = True
+                    wake_sender()
             except Exception as e:
-                logger.error(f"[AUDIO CAPTURE] Audio capture error: {e}")
+                logger.error("[AUDIO ENCODE] Audio encode error: %s", e)
                 break
-        logger.info(f"[AUDIO CAPTURE] Audio capture thread exiting (captured {frame_count} frames total)")
+        logger.info("[AUDIO ENCODE] Audio encode thread exiting")
+
+    def _audio_decode_loop(self) -> None:
+        """Decode received frames in background thread and queue the PCM for playback."""
+        decode_buffer = self._decode_buffer
+        decode_ready = self._decode_ready
+        stop = self._audio_stop
+        while not stop.is_set():
+            try:
+                if not decode_buffer:
+                    decode_ready.clear()
+                    if not decode_buffer:
+                        decode_ready.wait(timeout=0.1)
+                        continue
+                handler = self.audio_handler
+                if not handler:
+                    break
+                source, frame = decode_buffer.popleft()
+                handler.write_frame(frame, source)
+            except Exception as e:
+                logger.error("[AUDIO DECODE] Audio decode error: %s", e)
+                break
+        logger.info("[AUDIO DECODE] Audio decode thread exiting")
 
     async def _audio_send_loop(self) -> None:
-        """Send audio frames from queue to network."""
+        """Send audio frames from the capture buffer to network."""
+        frames = self._audio_send_buffer
+        ready = self._audio_ready
+        net_out = self._net_out
+        # 信封在整个通话期间不变：每通话预先序列化一次，之后每包只在字节层拼接 data/seq/id/timestamp
+        b2a_base64 = binascii.b2a_base64
+        prefix = b""
+        prefix_call_id = None
+        seq = 0
+        timestamp = 0
         while True:
             try:
                 # 检查通话状态，如果通话已结束则退出
@@ -521,46 +859,84 @@ class VoiceManager:
                     logger.info("Audio send loop: call ended, exiting")
                     break
 
-                # Get frame from queue (non-blocking with timeout)
-                try:
-                    frame = self._audio_send_queue.get(timeout=0.1)
-                except queue.Empty:
-                    await asyncio.sleep(0.01)
-                    continue
+                # 攒够一包再发；不够时挂起直到编码线程唤醒（边沿触发，不轮询）。
+                # 通话结束的各条路径都会经 _stop_audio_streams() 取消本任务，因此无需超时
+                if not self._send_batch_ready():
+                    ready.clear()
+                    if not self._send_batch_ready():
+                        await ready.wait()
+                        continue
+                self._flush_send_buffer = False
+                batch = [frames.popleft() for _ in range(min(len(frames), VOICE_FRAMES_PER_SEND))]
 
                 # 再次检查通话状态（双重检查，防止在获取frame期间状态改变）
                 if self.current_call and self.current_call.get("status") == "connected":
                     call_id = self.current_call.get("call_id")
-                    msg = {
-                        "id": uuid.uuid4().hex[:8],  # Short ID for efficiency
-                        "type": "event",
-                        "timestamp": int(time.time()),
-                        "command": MsgType.VOICE_DATA.value,
-                        "headers": self.session.build_headers(),  # 修复：使用session构建headers
-                        "payload": {
-                            "call_id": call_id,
-                            "data": frame.hex(),  # Encode bytes as hex string
-                            "codec": "opus" if OPUS_AVAILABLE else "pcm",
-                            "seq": int(time.time() * 1000)  # Sequence number
-                        }
-                    }
-                    try:
-                        await self.network.send(msg)
-                    except Exception as send_error:
-                        # 发送失败，但不立即退出，让状态检查来决定是否退出
-                        logger.debug(f"Audio send failed (will retry if call still active): {send_error}")
-                        await asyncio.sleep(0.05)  # 短暂延迟后重试
+                    if prefix_call_id != call_id:
+                        prefix = self._render_voice_prefix(call_id)
+                        prefix_call_id = call_id
+                        seq = 0
+                    seq += 1  # 每通话单调递增的包序号
+                    if (seq - 1) % VOICE_PACKETS_PER_SECOND == 0:
+                        timestamp = int(time.time())
+                    # base64 只膨胀 4/3（hex 是 2 倍）；直接调用 binascii，省去 base64 模块的包装层
+                    body = b"".join((
+                        prefix,
+                        b'","'.join([b2a_base64(frame, newline=False) for frame in batch]),
+                        _VOICE_DATA_SUFFIX % (seq, self.session.next_id().encode("ascii"), timestamp),
+                    ))
+                    # 只入队不等待网络：写协程卡住时丢最旧的包，本循环和编码线程不受影响
+                    if net_out.full():
+                        net_out.get_nowait()
+                        for _ in range(VOICE_FRAMES_PER_SEND):
+                            self._count_dropped_frame()
+                    net_out.put_nowait(body)
             except asyncio.CancelledError:
                 logger.info("Audio send loop cancelled")
                 break
             except Exception as e:
                 # 其他未预期的错误，记录但不终止循环（除非通话状态已改变）
-                logger.warning(f"Unexpected error in audio send loop: {e}")
+                logger.warning("Unexpected error in audio send loop: %s", e)
                 if not self.current_call or self.current_call.get("status") not in ("connected", "ringing", "calling"):
                     logger.info("Audio send loop: call no longer active after error, exiting")
                     break
                 await asyncio.sleep(0.1)  # 短暂延迟后继续
 
+    def _send_batch_ready(self) -> bool:
+        """A full packet is buffered, or the VAD gate closed on a partial one."""
+        buffered = len(self._audio_send_buffer)
+        return buffered >= VOICE_FRAMES_PER_SEND or bool(buffered and self._flush_send_buffer)
+
+    async def _network_writer(self, net_out: asyncio.Queue) -> None:
+        """Drain pre-rendered voice packets to the network, isolated from the send loop."""
+        send_raw = self.network.send_raw
+        while True:
+            body = await net_out.get()
+            try:
+                await send_raw(body)
+            except asyncio.CancelledError:
+                raise
+            except Exception as send_error:
+                # 发送失败只丢这一包；通话是否结束由发送循环的状态检查决定
+                logger.debug("Audio send failed (will retry if call still active): %s", send_error)
+                await asyncio.sleep(0.05)
+
+    def _render_voice_prefix(self, call_id: Optional[str]) -> bytes:
+        """Serialize the per-call constant part of voice/data, open right before the data list."""
+        head = {
+            "type": "event",
+            "command": MsgType.VOICE_DATA.value,
+            "headers": self.session.build_headers(),  # 修复：使用session构建headers
+            "payload": {
+                "call_id": call_id,
+                "encoding": "base64",
+                "codec": "opus" if OPUS_AVAILABLE else "pcm",
+            },
+        }
+        rendered = json.dumps(head, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        # rendered 以 payload 和外层的两个 "}" 结尾，去掉后接上 data 列表的开头
+        return rendered[:-2] + b',"data":["'
+
     async def _handle_call_ack(self, message: Dict[str, Any]) -> None:
         """Handle acknowledgment of call initiation."""
         payload = message.get("payload", {})
@@ -582,9 +958,12 @@ class VoiceManager:
             payload = message.get("payload", {})
             event_type = payload.get("event_type")
             call_id = payload.get("call_id")
+            # 事件开始时的通话状态快照；下面只读它，重新赋值 self.current_call 的分支各自处理
+            call = self.current_call
+            notify = self._notify_ui
 
-            logger.info(f"[VOICE CLIENT] Received voice event: {event_type}, call_id={call_id}, full_payload={payload}")
-            logger.info(f"[VOICE CLIENT] Current call state: {self.current_call}")
+            logger.info("[VOICE CLIENT] Received voice event: %s, call_id=%s, full_payload=%s", event_type, call_id, payload)
+            logger.info("[VOICE CLIENT] Current call state: %s", call)
 
             if event_type == "incoming":
                 # Incoming call
@@ -604,7 +983,7 @@ class VoiceManager:
                     "connect_time": None,
                     "participants": [from_user],  # 添加参与者列表（发起者）
                 }
-                self._notify_ui("incoming_call", {
+                notify("incoming_call", {
                     "call_id": call_id,
                     "from_user": from_user,
                     "call_type": call_type
@@ -612,33 +991,33 @@ class VoiceManager:
 
             elif event_type == "connected":
                 # Call connected
-                if self.current_call and self.current_call.get("call_id") == call_id:
-                    self.current_call["status"] = "connected"
-                    self.current_call["connect_time"] = time.time()
+                if call and call.get("call_id") == call_id:
+                    call["status"] = "connected"
+                    call["connect_time"] = time.time()
                     # 更新参与者列表
                     members = payload.get("members", [])
                     if members:
-                        self.current_call["participants"] = members
-                        logger.info(f"[VOICE CLIENT] Call connected with {len(members)} participants: {members}")
+                        call["participants"] = members
+                        logger.info("[VOICE CLIENT] Call connected with %s participants: %s", len(members), members)
                     await self._start_audio_streams_async()  # 使用异步版本
-                    self._notify_ui("status", "通话已接通")
+                    notify("status", "通话已接通")
 
             elif event_type in ("ended", "rejected"):
                 # Call ended or rejected
-                logger.info(f"[VOICE CLIENT] Processing {event_type} event, current_call exists: {self.current_call is not None}")
-                if self.current_call:
-                    logger.info(f"[VOICE CLIENT] Current call_id: {self.current_call.get('call_id')}, event call_id: {call_id}")
+                logger.info("[VOICE CLIENT] Processing %s event, current_call exists: %s", event_type, call is not None)
+                if call:
+                    logger.info("[VOICE CLIENT] Current call_id: %s, event call_id: %s", call.get('call_id'), call_id)
 
                 # 检查是否是当前通话或者是之前退出的通话的最终结束通知
-                is_current_call = self.current_call and self.current_call.get("call_id") == call_id
+                is_current_call = call and call.get("call_id") == call_id
                 has_call_info_in_payload = all(k in payload for k in ["call_type", "target_type", "target_id", "participants"])
 
                 if is_current_call or has_call_info_in_payload:
-                    logger.info(f"[VOICE CLIENT] Ending call {call_id} due to {event_type}")
+                    logger.info("[VOICE CLIENT] Ending call %s due to %s", call_id, event_type)
 
                     try:
                         # 准备通话结束信息
-                        logger.info(f"[VOICE CLIENT] Preparing call end info...")
+                        logger.info("[VOICE CLIENT] Preparing call end info...")
 
                         if is_current_call:
                             # 当前通话，使用本地信息
@@ -646,9 +1025,7 @@ class VoiceManager:
                         else:
                             # 已退出的通话，使用服务器提供的信息
                             duration = payload.get("duration", 0)
-                            minutes = duration // 60
-                            seconds = duration % 60
-                            duration_str = f"{minutes:02d}:{seconds:02d}"
+                            duration_str = "%02d:%02d" % divmod(duration, 60)
 
                             participants = payload.get("participants", [])
                             call_type = payload.get("call_type", "direct")
@@ -659,10 +1036,8 @@ class VoiceManager:
                             other_party = target_id
                             if call_type == "direct":
                                 # 私聊：对方是参与者中不是自己的那个
-                                for p in participants:
-                                    if p != self.session.user_id:
-                                        other_party = p
-                                        break
+                                my_id = self.session.user_id
+                                other_party = next((p for p in participants if p != my_id), target_id)
 
                             call_end_info = {
                                 "duration": duration,
@@ -678,9 +1053,9 @@ class VoiceManager:
 
                         # 对于服务器发送的ended事件，总是添加到会话（因为这表示通话真正结束）
                         call_end_info["add_to_conversation"] = True
-                        logger.info(f"[VOICE CLIENT] Call end info prepared: {call_end_info}")
+                        logger.info("[VOICE CLIENT] Call end info prepared: %s", call_end_info)
                     except Exception as e:
-                        logger.error(f"[VOICE CLIENT] Error preparing call end info: {e}", exc_info=True)
+                        logger.error("[VOICE CLIENT] Error preparing call end info: %s", e, exc_info=True)
                         call_end_info = {
                             "duration": 0,
                             "duration_str": "00:00",
@@ -696,64 +1071,62 @@ class VoiceManager:
                     if is_current_call:
                         try:
                             # 先设置状态为ending，让音频发送循环退出
-                            logger.info(f"[VOICE CLIENT] Setting call status to ending...")
-                            self.current_call["status"] = "ending"
+                            logger.info("[VOICE CLIENT] Setting call status to ending...")
+                            call["status"] = "ending"
 
                             # 停止音频流
-                            logger.info(f"[VOICE CLIENT] Stopping audio streams...")
+                            logger.info("[VOICE CLIENT] Stopping audio streams...")
                             self._stop_audio_streams()
-                            logger.info(f"[VOICE CLIENT] Audio streams stopped")
+                            logger.info("[VOICE CLIENT] Audio streams stopped")
                         except Exception as e:
-                            logger.error(f"[VOICE CLIENT] Error stopping audio streams: {e}", exc_info=True)
+                            logger.error("[VOICE CLIENT] Error stopping audio streams: %s", e, exc_info=True)
 
                         # 清除通话状态
-                        logger.info(f"[VOICE CLIENT] Clearing current_call...")
+                        logger.info("[VOICE CLIENT] Clearing current_call...")
                         self.current_call = None
 
                     try:
                         # 发送通话结束事件到UI
-                        logger.info(f"[VOICE CLIENT] Notifying UI of call_ended...")
-                        self._notify_ui("call_ended", call_end_info)
-                        logger.info(f"[VOICE CLIENT] UI notified successfully")
+                        logger.info("[VOICE CLIENT] Notifying UI of call_ended...")
+                        notify("call_ended", call_end_info)
+                        logger.info("[VOICE CLIENT] UI notified successfully")
                     except Exception as e:
-                        logger.error(f"[VOICE CLIENT] Error notifying UI: {e}", exc_info=True)
+                        logger.error("[VOICE CLIENT] Error notifying UI: %s", e, exc_info=True)
 
                     msg = "对方已拒绝" if event_type == "rejected" else "通话已结束"
-                    self._notify_ui("status", msg)
-                    logger.info(f"[VOICE CLIENT] Call {call_id} ended successfully")
+                    notify("status", msg)
+                    logger.info("[VOICE CLIENT] Call %s ended successfully", call_id)
                 else:
-                    logger.warning(f"[VOICE CLIENT] Received {event_type} for call {call_id} but current_call mismatch or None and no call info in payload")
+                    logger.warning("[VOICE CLIENT] Received %s for call %s but current_call mismatch or None and no call info in payload", event_type, call_id)
 
             elif event_type == "error":
                 # Call error
                 error_msg = payload.get("message", "Unknown error")
-                self._notify_ui("error", f"通话错误: {error_msg}")
+                notify("error", f"通话错误: {error_msg}")
                 # 先设置状态，然后停止音频流
-                if self.current_call:
-                    self.current_call["status"] = "error"
+                if call:
+                    call["status"] = "error"
                 self._stop_audio_streams()
                 self.current_call = None
 
             elif event_type in ("member_joined", "member_left"):
                 # Group call member events
                 members = payload.get("members", [])
-                if self.current_call:
-                    self.current_call["participants"] = members
-                    logger.info(f"[VOICE CLIENT] Members updated: {members}")
+                if call:
+                    call["participants"] = members
+                    logger.info("[VOICE CLIENT] Members updated: %s", members)
 
                     # 如果是自己刚加入（member_joined），需要启动音频
-                    if event_type == "member_joined":
-                        user_id = payload.get("user_id")
-                        if user_id == self.session.user_id:
-                            logger.info(f"[VOICE CLIENT] I just joined the call, starting audio streams")
-                            self.current_call["status"] = "connected"
-                            self.current_call["connect_time"] = time.time()
-                            await self._start_audio_streams_async()
+                    if event_type == "member_joined" and payload.get("user_id") == self.session.user_id:
+                        logger.info("[VOICE CLIENT] I just joined the call, starting audio streams")
+                        call["status"] = "connected"
+                        call["connect_time"] = time.time()
+                        await self._start_audio_streams_async()
 
-                self._notify_ui("members_changed", members)
+                notify("members_changed", members)
 
         except Exception as e:
-            logger.error(f"[VOICE CLIENT] Fatal error in _handle_voice_event: {e}", exc_info=True)
+            logger.error("[VOICE CLIENT] Fatal error in _handle_voice_event: %s", e, exc_info=True)
             # 确保即使出错也清理资源
             try:
                 self._stop_audio_streams()
@@ -773,13 +1146,23 @@ class VoiceManager:
         if call_id != self.current_call.get("call_id"):
             return
 
-        data_hex = payload.get("data")
-        if data_hex and self.audio_handler:
+        data = payload.get("data")
+        if data and self.audio_handler:
             try:
-                audio_data = bytes.fromhex(data_hex)
-                self.audio_handler.write_frame(audio_data)
+                # 旧版本客户端每条消息只有一帧，且不带 encoding 字段（hex）
+                if isinstance(data, str):
+                    data = [data]
+                decode = binascii.a2b_base64 if payload.get("encoding") == "base64" else bytes.fromhex
+                source = payload.get("from_user", "")
+                decode_buffer = self._decode_buffer
+                # 事件循环上只做 base64 解码和入队；Opus 解码交给 VoiceDecode 线程
+                for encoded in data:
+                    if len(decode_buffer) == decode_buffer.maxlen:
+                        self._count_dropped_frame()
+                    decode_buffer.append((source, decode(encoded)))
+                self._decode_ready.set()
             except Exception as e:
-                logger.error(f"Failed to play audio frame: {e}")
+                logger.error("Failed to play audio frame: %s", e)
 
     def _notify_ui(self, event_type: str, data: Any) -> None:
         """Notify UI about voice events."""
@@ -793,7 +1176,8 @@ class VoiceManager:
         Args:
             end_source: "local" if current user hung up, "remote" if other party hung up
         """
-        if not self.current_call:
+        call = self.current_call
+        if not call:
             return {
                 "duration": 0,
                 "duration_str": "00:00",
@@ -803,33 +1187,18 @@ class VoiceManager:
                 "target_id": "未知"
             }
 
-        # 计算通话时长
-        connect_time = self.current_call.get("connect_time")
-        if connect_time:
-            # 通话已接通，计算实际通话时长
-            duration = int(time.time() - connect_time)
-        else:
-            # 通话未接通（呼叫中就挂断了）
-            duration = 0
-
+        # 计算通话时长：已接通才有 connect_time，呼叫中就挂断的时长为 0
+        connect_time = call.get("connect_time")
+        duration = int(time.time() - connect_time) if connect_time else 0
         # 格式化时长为 MM:SS
-        minutes = duration // 60
-        seconds = duration % 60
-        duration_str = f"{minutes:02d}:{seconds:02d}"
-
-        # 确定对方是谁
-        is_initiator = self.current_call.get("is_initiator", True)
-        target_type = self.current_call.get("target_type", "user")
-        target_id = self.current_call.get("target_id", "未知")
-        call_type = self.current_call.get("call_type", "direct")
-        participants = self.current_call.get("participants", [])
-
-        if is_initiator:
-            # 我是呼叫方，对方是目标
-            other_party = target_id
-        else:
-            # 我是接听方，对方是呼叫者
-            other_party = self.current_call.get("from_user", "未知")
+        duration_str = "%02d:%02d" % divmod(duration, 60)
+
+        # 确定对方是谁：我是呼叫方时对方是目标，否则是呼叫者
+        target_type = call.get("target_type", "user")
+        target_id = call.get("target_id", "未知")
+        call_type = call.get("call_type", "direct")
+        participants = call.get("participants", [])
+        other_party = target_id if call.get("is_initiator", True) else call.get("from_user", "未知")
 
         return {
             "duration": duration,
@@ -15,15 +15,26 @@ async def run_client() -> None:
     logging.basicConfig(level=CLIENT_CONFIG["log_level"])
     network = NetworkClient()
     session = ClientSession(network)
-    db = LocalDatabase(CLIENT_CONFIG["local_db_path"])
     auth = AuthManager(network, session)
-    messaging = MessagingManager(network, session, db)
     presence = PresenceManager(network, session)
     rooms = RoomManager(network, session)
+
+    # 打开 SQLite（建表、PRAGMA）放到线程里，与 TCP 握手并行
+    connect_task = asyncio.create_task(network.connect())
+    try:
+        db = await asyncio.to_thread(LocalDatabase, CLIENT_CONFIG["local_db_path"])
+    except BaseException:
+        connect_task.cancel()
+        raise
+    messaging = MessagingManager(network, session, db)
     cli = ChatCLI(auth, messaging, presence, rooms)
 
-    await network.connect()
-    await cli.run()
+    try:
+        await connect_task
+        await cli.run()
+    finally:
+        await messaging.close()
+        db.close()
 
 
 if __name__ == "__main__":
@@ -1,4 +1,4 @@
 from .cache import InMemoryCache
-from .local_db import LocalDatabase
+from .local_db import HistoryRec, LocalDatabase
 
-__all__ = ["InMemoryCache", "LocalDatabase"]
+__all__ = ["HistoryRec", "InMemoryCache", "LocalDatabase"]
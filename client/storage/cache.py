@@ -1,27 +1,46 @@
 from __future__ import annotations
 
 import time
-from typing import Any, Dict, Optional, Tuple
+from collections import OrderedDict
+from typing import Any, Optional, Tuple
+
+# 每写入这么多次顺带清理一次过期项；get 只判断不删除
+SWEEP_EVERY_SETS = 1024
+# 条目数上限：超出时淘汰最久未访问的项，内存占用与 TTL 的取值无关
+DEFAULT_MAXSIZE = 4096
 
 
 class InMemoryCache:
-    """Very lightweight TTL cache for presence/messaging metadata."""
+    """Very lightweight size-capped LRU + TTL cache for presence/messaging metadata."""
 
-    def __init__(self) -> None:
-        self._store: Dict[str, Tuple[float, Any]] = {}
+    def __init__(self, maxsize: int = DEFAULT_MAXSIZE) -> None:
+        self.maxsize = maxsize
+        self._store: OrderedDict[str, Tuple[float, Any]] = OrderedDict()
+        self._sets = 0
 
     def set(self, key: str, value: Any, ttl: float = 60.0) -> None:
-        self._store[key] = (time.time() + ttl, value)
+        store = self._store
+        store[key] = (time.monotonic() + ttl, value)
+        store.move_to_end(key)
+        if len(store) > self.maxsize:
+            store.popitem(last=False)
+        self._sets += 1
+        if self._sets % SWEEP_EVERY_SETS == 0:
+            self.sweep()
 
     def get(self, key: str) -> Optional[Any]:
         record = self._store.get(key)
-        if not record:
-            return None
-        expires_at, value = record
-        if expires_at < time.time():
-            self._store.pop(key, None)
+        if record is None or record[0] < time.monotonic():
             return None
-        return value
+        self._store.move_to_end(key)
+        return record[1]
+
+    def sweep(self) -> None:
+        """Drop expired entries."""
+        now = time.monotonic()
+        expired = [key for key, (expires_at, _) in self._store.items() if expires_at < now]
+        for key in expired:
+            del self._store[key]
 
     def clear(self) -> None:
         self._store.clear()
@@ -3,19 +3,90 @@ from __future__ import annotations
 import ast
 import json
 import sqlite3
+import threading
 import time
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# WAL：读不阻塞写；synchronous=NORMAL 在 WAL 下只在检查点 fsync，断电最多丢最后几个事务
+_CONNECTION_PRAGMAS = (
+    "PRAGMA page_size=8192",  # 只对新建的库生效（必须在建表前），旧库保持原页大小
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-20000",  # 约 20MB 页缓存
+    "PRAGMA mmap_size=268435456",  # 最多 256MB 走内存映射读，全表扫描不再逐页 read()
+)
+
+# PRAGMA user_version：1 = 历史上用 repr() 写入的 payload 已改写为 JSON
+_SCHEMA_VERSION = 1
+
+_INSERT_SQL = (
+    "INSERT OR REPLACE INTO messages (id, direction, conversation_id, payload, created_at) VALUES (?, ?, ?, ?, ?)"
+)
+
+
+@dataclass(slots=True)
+class HistoryRec:
+    """Flattened view of a stored record: the fields history scans read, plus the record itself."""
+
+    id: str
+    sender_id: Optional[str]
+    conversation_id: Optional[str]
+    record: Dict[str, Any]
 
 
 class LocalDatabase:
-    """Minimal SQLite-backed storage for messages."""
+    """Minimal SQLite-backed storage for messages.
+
+    One long-lived write connection (writes serialized by a lock, so batches may be flushed
+    from worker threads) plus one read-only connection per reading thread; under WAL the
+    readers never wait for the writer.
+    """
 
     def __init__(self, path: str) -> None:
         self.path = Path(path)
-        self.conn = sqlite3.connect(self.path, check_same_thread=False)
-        self.conn.row_factory = sqlite3.Row
+        self.conn = self._connect()
+        self._write_lock = threading.Lock()
+        self._readers = threading.local()
+        # 各线程的读连接也登记在这里（受 _write_lock 保护），close() 时统一关闭、释放 mmap
+        self._reader_conns: List[sqlite3.Connection] = []
         self._init_schema()
+        # 写入只走这一个游标和同一条 SQL，语句编译一次后一直复用
+        self._insert_cur = self.conn.cursor()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        for pragma in _CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        return conn
+
+    def _reader(self) -> sqlite3.Connection:
+        """Read-only connection owned by the calling thread; reused so its page cache stays warm."""
+        conn = getattr(self._readers, "conn", None)
+        if conn is None:
+            conn = self._connect()
+            conn.execute("PRAGMA query_only=1")
+            with self._write_lock:
+                self._reader_conns.append(conn)
+            self._readers.conn = conn
+        return conn
+
+    def close(self) -> None:
+        """Close the write connection and every thread's read connection."""
+        with self._write_lock:
+            readers, self._reader_conns = self._reader_conns, []
+            for conn in readers:
+                conn.close()
+            self.conn.close()
 
     def _init_schema(self) -> None:
         self.conn.execute(
@@ -24,76 +95,147 @@ class LocalDatabase:
                 id TEXT PRIMARY KEY,
                 direction TEXT,
                 conversation_id TEXT,
-                payload TEXT,
+                payload BLOB,
                 created_at INTEGER
             )
             """
         )
+        # 按会话取最近消息直接走 (conversation_id, created_at) 索引的区间扫描，无需排序；
+        # 旧的单列索引是它的最左前缀，已多余
         self.conn.execute(
-            "CREATE INDEX IF NOT EXISTS idx_messages_conversation ON messages(conversation_id)"
+            "CREATE INDEX IF NOT EXISTS idx_msg_conv_time ON messages(conversation_id, created_at DESC)"
         )
+        self.conn.execute("DROP INDEX IF EXISTS idx_messages_conversation")
         self.conn.commit()
+        if self.conn.execute("PRAGMA user_version").fetchone()[0] < _SCHEMA_VERSION:
+            self._migrate_legacy_payloads()
+
+    def _migrate_legacy_payloads(self) -> None:
+        """One-shot rewrite of legacy non-JSON payload rows, so reads can parse JSON unguarded."""
+        fixed = []
+        for row in self.conn.execute("SELECT id, payload FROM messages WHERE typeof(payload) = 'text'"):
+            try:
+                json.loads(row["payload"])
+                continue
+            except json.JSONDecodeError:
+                pass
+            try:
+                payload = _dump_payload(ast.literal_eval(row["payload"]))
+            except (ValueError, TypeError, SyntaxError, MemoryError, RecursionError):
+                payload = "{}"
+            fixed.append((payload, row["id"]))
+        with self.conn:
+            self.conn.executemany("UPDATE messages SET payload = ? WHERE id = ?", fixed)
+            self.conn.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
 
     def save_outbound_message(self, message: Dict[str, Any]) -> None:
-        self._insert("outbound", message)
+        self.save_batch([("outbound", message)])
 
     def save_inbound_message(self, message: Dict[str, Any]) -> None:
-        self._insert("inbound", message)
+        self.save_batch([("inbound", message)])
+
+    def save_batch(self, records: Iterable[Tuple[str, Dict[str, Any]]]) -> None:
+        """Insert (direction, message) pairs in a single transaction."""
+        rows = [row for row in (self._to_row(direction, message) for direction, message in records) if row]
+        if not rows:
+            return
+        with self._write_lock, self.conn:
+            self._insert_cur.executemany(_INSERT_SQL, rows)
 
-    def _insert(self, direction: str, message: Dict[str, Any]) -> None:
+    @staticmethod
+    def _to_row(direction: str, message: Dict[str, Any]) -> Optional[Tuple[Any, ...]]:
         payload = message.get("payload") or {}
         conversation_id = payload.get("conversation_id") or message.get("conversation_id")
         if not conversation_id:
             target = payload.get("target") or {}
             conversation_id = target.get("id")
         if not conversation_id:
-            return
+            return None
         created_at = int(
             message.get("timestamp")
             or payload.get("timestamp")
             or time.time()
         )
-        self.conn.execute(
-            "INSERT OR REPLACE INTO messages (id, direction, conversation_id, payload, created_at) VALUES (?, ?, ?, ?, ?)",
-            (
-                message.get("id"),
-                direction,
-                conversation_id,
-                json.dumps(message, ensure_ascii=False),
-                created_at,
-            ),
+        return (
+            message.get("id"),
+            direction,
+            conversation_id,
+            _dump_payload(message),
+            created_at,
         )
-        self.conn.commit()
 
     def load_all_messages(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        return list(self.iter_messages(limit))
+
+    def load_all_indexed(self) -> Dict[str, HistoryRec]:
+        """All records oldest-first, keyed by message id; rows without an id are skipped."""
+        indexed: Dict[str, HistoryRec] = {}
+        for record in self.iter_messages():
+            msg_id = record["id"]
+            if not msg_id:
+                continue
+            payload = record["message"].get("payload") or {}
+            indexed[msg_id] = HistoryRec(
+                msg_id,
+                payload.get("sender_id"),
+                record["conversation_id"] or payload.get("conversation_id"),
+                record,
+            )
+        return indexed
+
+    def message_ids(self) -> set:
+        """Ids of all stored messages, read from the id column without decoding any payload."""
+        return {row[0] for row in self._reader().execute("SELECT id FROM messages WHERE id IS NOT NULL")}
+
+    def iter_messages(self, limit: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """Stream records oldest-first straight from the cursor instead of materializing all rows."""
         query = "SELECT * FROM messages ORDER BY created_at ASC"
         params: tuple[Any, ...] = ()
         if limit is not None:
             query += " LIMIT ?"
             params = (limit,)
-        rows = self.conn.execute(query, params).fetchall()
-        return [self._row_to_record(row) for row in rows]
+        row_to_record = self._row_to_record
+        for row in self._reader().execute(query, params):
+            yield row_to_record(row)
 
     def recent_messages(self, limit: int = 20) -> List[Dict[str, Any]]:
-        rows = self.conn.execute(
+        rows = self._reader().execute(
             "SELECT * FROM messages ORDER BY created_at DESC LIMIT ?", (limit,)
         ).fetchall()
         return [self._row_to_record(row) for row in rows]
 
+    def recent_by_conversation(self, conversation_id: str, limit: int = 20) -> List[Dict[str, Any]]:
+        rows = self._reader().execute(
+            "SELECT id, direction, conversation_id, created_at, payload FROM messages "
+            "WHERE conversation_id = ? ORDER BY created_at DESC LIMIT ?",
+            (conversation_id, limit),
+        ).fetchall()
+        return [self._row_to_record(row) for row in rows]
+
     def _row_to_record(self, row: sqlite3.Row) -> Dict[str, Any]:
-        payload = row["payload"]
-        data: Dict[str, Any]
-        try:
-            data = json.loads(payload)
-        except json.JSONDecodeError:
-            try:
-                data = ast.literal_eval(payload)
-            except Exception:
-                data = {}
         return {
             "id": row["id"],
             "direction": row["direction"],
             "conversation_id": row["conversation_id"],
             "created_at": row["created_at"],
-            "message": data,
+            "message": _load_payload(row["payload"]),
         }
+
+
+def _dump_payload(message: Dict[str, Any]) -> Any:
+    # orjson 直接产出紧凑的 UTF-8 字节，按 BLOB 存（旧库的 TEXT 列同样原样保存 BLOB）；
+    # 它拒绝的输入（非 str 键、超 64 位整数等）交给 json 兜底，存成 TEXT
+    if ORJSON_AVAILABLE:
+        try:
+            return orjson.dumps(message)
+        except TypeError:
+            pass
+    return json.dumps(message, ensure_ascii=False, separators=(",", ":"))
+
+
+def _load_payload(payload: Any) -> Any:
+    # BLOB 行由 orjson 写入，用 orjson 读；TEXT 行（json 兜底写入的或历史数据）可能含
+    # orjson 会读成 float 的超大整数，仍交给 json。orjson.JSONDecodeError 是 json.JSONDecodeError 的子类
+    if ORJSON_AVAILABLE and isinstance(payload, bytes):
+        return orjson.loads(payload)
+    return json.loads(payload)
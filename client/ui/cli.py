@@ -2,9 +2,18 @@ from __future__ import annotations
 
 import asyncio
 import logging
+import sys
+from typing import Awaitable, Callable, Dict
 
 import contextlib
 
+try:
+    from prompt_toolkit import PromptSession
+    from prompt_toolkit.patch_stdout import patch_stdout
+    PROMPT_TOOLKIT_AVAILABLE = True
+except ImportError:
+    PROMPT_TOOLKIT_AVAILABLE = False
+
 from client.features import AuthManager, MessagingManager, PresenceManager, RoomManager
 from shared.protocol.errors import ProtocolError
 from shared.utils.common import sha256_hex
@@ -21,47 +30,88 @@ class ChatCLI:
         self.presence = presence
         self.rooms = rooms
         self._receiver_task: asyncio.Task | None = None
-        self._receiver_stop = asyncio.Event()
+        # 命令名 -> 处理协程（参数为整行拆分后的 parts）；quit 在循环里单独处理
+        self._handlers: Dict[str, Callable[[list[str]], Awaitable[None]]] = {
+            "help": self._handle_help,
+            "login": self._handle_login,
+            "register": self._handle_register,
+            "room": self._handle_room_command,
+            "send": self._handle_send,
+            "send_room": self._handle_send_room,
+            "presence": self._handle_presence,
+        }
 
     async def run(self) -> None:
         logger.info("CLI ready. Type 'help' for commands.")
-        loop = asyncio.get_event_loop()
-        self._receiver_stop.clear()
         self._receiver_task = asyncio.create_task(self._print_incoming(), name="cli-incoming-printer")
+        # prompt_toolkit 的输入行直接跑在事件循环上，patch_stdout 让收到的消息打印在输入行上方；
+        # 没装时退回线程池里的 input()
+        stdout_guard = patch_stdout() if PROMPT_TOOLKIT_AVAILABLE else contextlib.nullcontext()
         try:
-            while True:
-                cmd = await loop.run_in_executor(None, input, "> ")
-                parts = cmd.strip().split()
-                if not parts:
-                    continue
-                match parts[0]:
-                    case "help":
-                        self._show_help()
-                    case "login":
-                        await self._handle_login(parts)
-                    case "register":
-                        await self._handle_register(parts)
-                    case "room":
-                        await self._handle_room(parts[1:])
-                    case "send":
-                        await self._handle_send(parts)
-                    case "send_room":
-                        await self._handle_send_room(parts)
-                    case "presence":
-                        roster = await self.presence.request_roster()
-                        print("Online:", roster)
-                    case "quit":
-                        await self.auth.logout()
-                        break
-                    case _:
-                        print("Unknown command")
+            with stdout_guard:
+                await self._command_loop()
         finally:
-            self._receiver_stop.set()
             if self._receiver_task:
                 self._receiver_task.cancel()
                 with contextlib.suppress(asyncio.CancelledError):
                     await self._receiver_task
 
+    async def _command_loop(self) -> None:
+        if PROMPT_TOOLKIT_AVAILABLE:
+            prompt = PromptSession().prompt_async
+        else:
+            prompt = await self._stdin_prompt()
+        handlers = self._handlers
+        while True:
+            parts = (await prompt("> ")).split()
+            if not parts:
+                continue
+            if parts[0] == "quit":
+                await self.auth.logout()
+                break
+            handler = handlers.get(parts[0])
+            if handler is None:
+                print("Unknown command")
+                continue
+            await handler(parts)
+
+    @staticmethod
+    async def _stdin_prompt() -> Callable[[str], Awaitable[str]]:
+        """Line reader for stdin without prompt_toolkit: event-loop driven for piped stdin, input() on a TTY."""
+        loop = asyncio.get_running_loop()
+
+        def blocking_prompt(message: str) -> Awaitable[str]:
+            return loop.run_in_executor(None, input, message)
+
+        # 终端不能交给事件循环：connect_read_pipe 会给整个终端设上 O_NONBLOCK，
+        # 与 stdin 共用的 stdout 大量输出时会抛 BlockingIOError，退出后 shell 也留在非阻塞模式
+        if sys.stdin.isatty():
+            return blocking_prompt
+        reader = asyncio.StreamReader()
+        try:
+            # Unix 管道/文件重定向：stdin 直接挂到事件循环上，不占线程池
+            await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), sys.stdin)
+        except (NotImplementedError, OSError, ValueError):
+            # Windows 等不支持管道读的环境，退回线程池里的 input()
+            return blocking_prompt
+
+        async def pipe_prompt(message: str) -> str:
+            print(message, end="", flush=True)
+            line = await reader.readline()
+            # EOF（Ctrl-D / 管道关闭）按 quit 处理
+            return line.decode(errors="replace") if line else "quit"
+        return pipe_prompt
+
+    async def _handle_help(self, parts: list[str]) -> None:
+        self._show_help()
+
+    async def _handle_presence(self, parts: list[str]) -> None:
+        roster = await self.presence.request_roster()
+        print("Online:", roster)
+
+    async def _handle_room_command(self, parts: list[str]) -> None:
+        await self._handle_room(parts[1:])
+
     def _show_help(self) -> None:
         print(
             "Commands: register <user> <password>, login <user> <password>, "
@@ -181,20 +231,18 @@ class ChatCLI:
             print(f"Room command failed unexpectedly: {exc}")
 
     async def _print_incoming(self) -> None:
-        while not self._receiver_stop.is_set():
+        # 消息到达才醒来；退出时由 run() 取消本任务
+        async for msg in self.messaging.messages():
             try:
-                msg = await self.messaging.next_message(timeout=1.0)
-                if not msg:
-                    continue
                 payload = msg.get("payload", {})
                 content = payload.get("content", {})
                 text = content.get("text") or content
                 sender = payload.get("sender_id", "unknown")
                 convo = payload.get("conversation_id", "n/a")
-                print(f"\n[{convo}] {sender}: {text}")
-                print("> ", end="", flush=True)
-            except asyncio.TimeoutError:
-                continue
+                if PROMPT_TOOLKIT_AVAILABLE:
+                    print(f"[{convo}] {sender}: {text}")
+                else:
+                    print(f"\n[{convo}] {sender}: {text}")
+                    print("> ", end="", flush=True)
             except Exception as exc:
                 logger.error("Incoming printer error: %s", exc)
-                await asyncio.sleep(1)
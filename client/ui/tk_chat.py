@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import asyncio
 import logging
+import os
 import queue
 import random
 import threading
@@ -9,13 +10,27 @@ import time
 import tkinter as tk
 from pathlib import Path
 from tkinter import filedialog, messagebox, scrolledtext, ttk
-from typing import Any, Dict, Optional, Tuple
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+# 后台事件循环优先用 libuv 实现（Linux/macOS: uvloop，Windows: winloop），都没装时用标准库
+try:
+    import uvloop
+    _new_event_loop = uvloop.new_event_loop
+    UVLOOP_AVAILABLE = True
+except ImportError:
+    try:
+        import winloop
+        _new_event_loop = winloop.new_event_loop
+        UVLOOP_AVAILABLE = True
+    except ImportError:
+        _new_event_loop = asyncio.new_event_loop
+        UVLOOP_AVAILABLE = False
 
 from client.config import CLIENT_CONFIG
 from client.core import ClientSession, NetworkClient
 from client.features import AuthManager, FileTransferManager, FriendsManager, MessagingManager, PresenceManager, RoomManager, VoiceManager
-from client.storage import LocalDatabase
-from client.ui.modern_style import ModernStyle
+from client.storage import HistoryRec, LocalDatabase
+from client.ui.modern_style import COLORS, FONTS
 from shared.protocol.commands import MsgType
 from shared.protocol.errors import StatusCode
 from shared.utils.common import sha256_hex
@@ -24,13 +39,97 @@ logger = logging.getLogger(__name__)
 
 UIEvent = Tuple[str, Any]
 
+# 主窗口每次最多从 ui_queue 取这么多事件；取满说明还有积压，空闲时立刻接着处理
+UI_DRAIN_BATCH = 256
+# 在线状态事件先在运行时里按用户合并，这么久（秒）后作为一个 presence_batch 推给 UI
+PRESENCE_BATCH_DELAY = 0.05
+# 队列取空后下一次检查的间隔（毫秒）；平台支持 createfilehandler 时只在积压时用到
+UI_POLL_INTERVAL_MS = 120
+
+
+def _supersede_key(event: UIEvent) -> Optional[Hashable]:
+    """Key under which a later event fully replaces an earlier one (None: never coalesced)."""
+    kind, payload = event
+    if kind == "voice" and payload.get("type") == "members_changed":
+        return ("voice", "members_changed")
+    return None
+
+
+def coalesce_ui_events(events: List[UIEvent]) -> List[UIEvent]:
+    """Drop events superseded by a later one with the same key; keeps relative order otherwise."""
+    last_index: Dict[Hashable, int] = {}
+    for index, event in enumerate(events):
+        key = _supersede_key(event)
+        if key is not None:
+            last_index[key] = index
+    if not last_index:
+        return events
+    return [
+        event for index, event in enumerate(events)
+        if (key := _supersede_key(event)) is None or last_index[key] == index
+    ]
+
+
+class WakeupQueue(queue.Queue):
+    """UI event queue that also makes a pipe readable on every put.
+
+    Tk waits on ``wakeup_fd`` via ``createfilehandler`` instead of polling with
+    ``after``.  Every producer (runtime, file transfer, voice threads) shares the
+    queue object, so the wakeup lives in ``put`` rather than at each call site.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.wakeup_fd, self._wakeup_w = os.pipe()
+        os.set_blocking(self.wakeup_fd, False)
+        os.set_blocking(self._wakeup_w, False)
+        self._wakeup_lock = threading.Lock()
+        self._closed = False
+
+    def put(self, item: UIEvent, block: bool = True, timeout: Optional[float] = None) -> None:
+        super().put(item, block, timeout)
+        with self._wakeup_lock:
+            if self._closed:
+                return
+            try:
+                os.write(self._wakeup_w, b"x")
+            except BlockingIOError:
+                pass  # 管道已满：消费者反正会被唤醒
+
+    def clear_wakeup(self) -> None:
+        """Discard pending wakeup bytes; call before draining the queue."""
+        try:
+            while os.read(self.wakeup_fd, 4096):
+                pass
+        except BlockingIOError:
+            pass
+
+    def close(self) -> None:
+        with self._wakeup_lock:
+            if self._closed:
+                return
+            self._closed = True
+            os.close(self.wakeup_fd)
+            os.close(self._wakeup_w)
+
+
+def new_ui_queue() -> queue.Queue[UIEvent]:
+    """Pipe-backed queue where Tk can watch it; a plain queue (polled with ``after``) elsewhere.
+
+    Windows Tk has no ``createfilehandler`` and ``os.set_blocking`` only covers pipes
+    there from Python 3.12, so the wakeup pipe is created on POSIX only.
+    """
+    if os.name == "posix":
+        return WakeupQueue()
+    return queue.Queue()
+
 
 class ClientRuntime:
     """Runs the asyncio client stack in a background event loop for the Tk UI."""
 
     def __init__(self, ui_queue: queue.Queue[UIEvent], config_override: Optional[Dict[str, Any]] = None) -> None:
         self.ui_queue = ui_queue
-        self.loop = asyncio.new_event_loop()
+        self.loop = _new_event_loop()
         self.thread = threading.Thread(target=self._run_loop, name="TkClientLoop", daemon=True)
         self.config = CLIENT_CONFIG.copy()
         if config_override:
@@ -49,6 +148,9 @@ class ClientRuntime:
         self._message_task: Optional[asyncio.Task] = None
         self._started = False
         self._connected = False  # 标记是否已连接到服务器
+        self._connect_attempted = asyncio.Event()  # 首次连接结束（无论成败）时置位，登录/注册在此等待
+        self._presence_pending: Dict[str, str] = {}
+        self._presence_flush_handle: Optional[asyncio.TimerHandle] = None
 
         # 注册presence事件监听器，实时更新在线列表
         self.network.register_handler(MsgType.PRESENCE_EVENT, self._handle_presence_event)
@@ -61,8 +163,16 @@ class ClientRuntime:
         user_id = payload.get("user_id")
         state = payload.get("state")
         if user_id and state:
-            # 推送到UI队列
-            self.ui_queue.put(("presence_update", {"user_id": user_id, "state": state}))
+            # 同一用户只保留最新状态，定时器到点后整批推送到UI队列
+            self._presence_pending[user_id] = state
+            if self._presence_flush_handle is None:
+                self._presence_flush_handle = self.loop.call_later(PRESENCE_BATCH_DELAY, self._flush_presence)
+
+    def _flush_presence(self) -> None:
+        self._presence_flush_handle = None
+        snapshot, self._presence_pending = self._presence_pending, {}
+        if snapshot:
+            self.ui_queue.put(("presence_batch", snapshot))
 
     async def _handle_friend_event(self, message: Dict[str, Any]) -> None:
         """处理好友事件"""
@@ -82,22 +192,31 @@ class ClientRuntime:
         self.submit(self._startup(), ("startup", None))
 
     async def _startup(self) -> str:
-        await self.network.connect()
-        self._start_message_listener()
-        self._connected = True  # 标记连接完成
+        try:
+            await self.network.connect()
+            self._start_message_listener()
+            self._connected = True  # 标记连接完成
+        finally:
+            self._connect_attempted.set()
         return "连接服务器成功"
 
+    async def _wait_connected(self) -> None:
+        await self._connect_attempted.wait()
+        if not self._connected:
+            raise ConnectionError("未连接到服务器")
+
     def _start_message_listener(self) -> None:
         if self._message_task and not self._message_task.done():
             return
 
         async def _run() -> None:
-            while True:
-                try:
-                    msg = await self.messaging.next_message()
-                except asyncio.CancelledError:
-                    break
-                self.ui_queue.put(("message", msg))
+            # 热路径：异步生成器省掉每条消息的 next_message/wait_for 协程，put 预先绑定
+            put = self.ui_queue.put
+            try:
+                async for msg in self.messaging.messages():
+                    put(("message", msg))
+            except asyncio.CancelledError:
+                pass
 
         def _create_task() -> None:
             self._message_task = asyncio.create_task(_run())
@@ -108,17 +227,23 @@ class ClientRuntime:
         future = asyncio.run_coroutine_threadsafe(coro, self.loop)
         future.add_done_callback(lambda fut: self.ui_queue.put(("future", (tag, fut))))
 
+    def _compute_history_sync(self, existing_ids: set) -> Tuple[int, List[HistoryRec]]:
+        """Runs in a worker thread: (total message count, records whose id was in ``existing_ids``)."""
+        indexed = self.db.load_all_indexed()
+        return len(indexed), [rec for msg_id, rec in indexed.items() if msg_id in existing_ids]
+
     async def login(self, username: str, password: str) -> Dict[str, Any]:
+        await self._wait_connected()
         # 登录前，先记录当前本地数据库中已有的消息ID
         # 这样可以区分历史消息和登录后收到的离线消息
-        existing_messages = self.db.load_all_messages()
-        existing_message_ids = {msg.get("message", {}).get("id") for msg in existing_messages if msg.get("message", {}).get("id")}
+        existing_message_ids = await asyncio.to_thread(self.db.message_ids)
         print(f"[DEBUG] 登录前已有 {len(existing_message_ids)} 条消息")
 
         success = await self.auth.login(username, sha256_hex(password))
         roster: list[str] = []
         rooms: list[str] = []
         history: list[Dict[str, Any]] = []
+        history_recs: list[HistoryRec] = []
         if success:
             roster = await self.presence.request_roster()
             rooms = await self.rooms.list_rooms()
@@ -129,16 +254,17 @@ class ClientRuntime:
 
             # 加载历史消息：只包含登录前已有的消息
             # 登录后新收到的离线消息不应该被当作历史消息
-            all_messages = self.db.load_all_messages()
-            history = [msg for msg in all_messages if msg.get("message", {}).get("id") in existing_message_ids]
-            new_messages_count = len(all_messages) - len(history)
-            print(f"[DEBUG] 登录后数据库有 {len(all_messages)} 条消息")
+            total, history_recs = await asyncio.to_thread(self._compute_history_sync, existing_message_ids)
+            history = [rec.record for rec in history_recs]
+            new_messages_count = total - len(history)
+            print(f"[DEBUG] 登录后数据库有 {total} 条消息")
             print(f"[DEBUG] 加载 {len(history)} 条历史消息")
             print(f"[DEBUG] 新收到 {new_messages_count} 条离线消息（将作为新消息处理）")
 
-        return {"success": success, "username": username, "roster": roster, "rooms": rooms, "history": history, "existing_ids": existing_message_ids}
+        return {"success": success, "username": username, "roster": roster, "rooms": rooms, "history": history, "history_recs": history_recs, "existing_ids": existing_message_ids}
 
     async def register(self, username: str, password: str) -> Dict[str, Any]:
+        await self._wait_connected()
         success = await self.auth.register(username, sha256_hex(password))
         # 注册成功后不获取数据，因为用户还没有真正登录（没有token）
         # 用户需要重新登录才能获取roster、rooms等数据
@@ -246,18 +372,20 @@ class ClientRuntime:
                     pass
             if self._message_task:
                 self._message_task.cancel()
+            await self.messaging.close()
             await self.network.close()
 
-        if not self._started:
-            return
-        fut = asyncio.run_coroutine_threadsafe(_shutdown(), self.loop)
-        try:
-            fut.result(timeout=2)
-        except Exception:
-            pass
-        self.loop.call_soon_threadsafe(self.loop.stop)
-        self.thread.join(timeout=2)
-        self._started = False
+        if self._started:
+            fut = asyncio.run_coroutine_threadsafe(_shutdown(), self.loop)
+            try:
+                fut.result(timeout=2)
+            except Exception:
+                pass
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self.thread.join(timeout=2)
+            self._started = False
+        # 消息已由 messaging.close() 落库；关闭写连接和各工作线程的读连接
+        self.db.close()
 
 
 class LoginWindow(tk.Tk):
@@ -268,14 +396,14 @@ class LoginWindow(tk.Tk):
         self.title("💬 Socket Chat - 登录")
         self.geometry("450x500")
         self.resizable(False, False)
-        self.configure(bg=ModernStyle.COLORS["darkest"])
+        self.configure(bg=COLORS["darkest"])
 
         self.host_var = tk.StringVar(value=CLIENT_CONFIG["server_host"])
         self.username_var = tk.StringVar(value="alice")
         self.password_var = tk.StringVar(value="alice")
         self.status_var = tk.StringVar(value="")
 
-        self.ui_queue: queue.Queue[UIEvent] = queue.Queue()
+        self.ui_queue = new_ui_queue()
         self.runtime: Optional[ClientRuntime] = None
         self.auth_payload: Optional[Dict[str, Any]] = None
         self._current_host: Optional[str] = None
@@ -298,7 +426,7 @@ class LoginWindow(tk.Tk):
         self.geometry(f"{width}x{height}+{x}+{y}")
 
     def _create_gradient_bg(self) -> None:
-        self.bg_canvas = tk.Canvas(self, bg=ModernStyle.COLORS["darkest"], highlightthickness=0)
+        self.bg_canvas = tk.Canvas(self, bg=COLORS["darkest"], highlightthickness=0)
         self.bg_canvas.pack(fill=tk.BOTH, expand=True)
 
         # 添加装饰性星点
@@ -307,9 +435,9 @@ class LoginWindow(tk.Tk):
             y = random.randint(0, 500)
             size = random.randint(2, 6)
             color = random.choice([
-                ModernStyle.COLORS["primary"],
-                ModernStyle.COLORS["secondary"],
-                ModernStyle.COLORS["success"]
+                COLORS["primary"],
+                COLORS["secondary"],
+                COLORS["success"]
             ])
             self.bg_canvas.create_oval(x, y, x + size, y + size, fill=color, outline="")
 
@@ -317,38 +445,38 @@ class LoginWindow(tk.Tk):
         # 卡片容器
         card_frame = tk.Frame(
             self.bg_canvas,
-            bg=ModernStyle.COLORS["card_bg"],
+            bg=COLORS["card_bg"],
             relief="flat",
             bd=0,
-            highlightbackground=ModernStyle.COLORS["gray"],
+            highlightbackground=COLORS["gray"],
             highlightthickness=1
         )
         card_frame.place(relx=0.5, rely=0.5, anchor="center", width=380, height=420)
 
         # 标题区域
-        title_frame = tk.Frame(card_frame, bg=ModernStyle.COLORS["card_bg"])
+        title_frame = tk.Frame(card_frame, bg=COLORS["card_bg"])
         title_frame.pack(fill=tk.X, pady=(25, 15))
 
         title_label = tk.Label(
             title_frame,
             text="💬 Socket Chat",
-            font=ModernStyle.FONTS["title"],
-            bg=ModernStyle.COLORS["card_bg"],
-            fg=ModernStyle.COLORS["light"]
+            font=FONTS["title"],
+            bg=COLORS["card_bg"],
+            fg=COLORS["light"]
         )
         title_label.pack()
 
         subtitle_label = tk.Label(
             title_frame,
             text="安全、高效的即时通信平台",
-            font=ModernStyle.FONTS["small"],
-            bg=ModernStyle.COLORS["card_bg"],
-            fg=ModernStyle.COLORS["gray_light"]
+            font=FONTS["small"],
+            bg=COLORS["card_bg"],
+            fg=COLORS["gray_light"]
         )
         subtitle_label.pack(pady=(5, 0))
 
         # 表单区域
-        form_frame = tk.Frame(card_frame, bg=ModernStyle.COLORS["card_bg"])
+        form_frame = tk.Frame(card_frame, bg=COLORS["card_bg"])
         form_frame.pack(fill=tk.BOTH, expand=True, padx=30, pady=15)
 
         self._create_input_field(form_frame, "🌐 服务器IP:", self.host_var, 0)
@@ -356,17 +484,17 @@ class LoginWindow(tk.Tk):
         self._create_input_field(form_frame, "🔒 密码:", self.password_var, 2, show="*")
 
         # 按钮区域
-        button_frame = tk.Frame(form_frame, bg=ModernStyle.COLORS["card_bg"])
+        button_frame = tk.Frame(form_frame, bg=COLORS["card_bg"])
         button_frame.pack(fill=tk.X, pady=(20, 10))
 
         self.login_btn = tk.Button(
             button_frame,
             text="🚀 登录系统",
-            font=ModernStyle.FONTS["subheading"],
-            bg=ModernStyle.COLORS["primary"],
-            fg=ModernStyle.COLORS["light"],
-            activebackground=ModernStyle.COLORS["primary_dark"],
-            activeforeground=ModernStyle.COLORS["light"],
+            font=FONTS["subheading"],
+            bg=COLORS["primary"],
+            fg=COLORS["light"],
+            activebackground=COLORS["primary_dark"],
+            activeforeground=COLORS["light"],
             relief="flat",
             bd=0,
             padx=20,
@@ -379,11 +507,11 @@ class LoginWindow(tk.Tk):
         self.register_btn = tk.Button(
             button_frame,
             text="📝 注册账号",
-            font=ModernStyle.FONTS["normal"],
-            bg=ModernStyle.COLORS["secondary"],
-            fg=ModernStyle.COLORS["light"],
-            activebackground=ModernStyle.COLORS["secondary_dark"],
-            activeforeground=ModernStyle.COLORS["light"],
+            font=FONTS["normal"],
+            bg=COLORS["secondary"],
+            fg=COLORS["light"],
+            activebackground=COLORS["secondary_dark"],
+            activeforeground=COLORS["light"],
             relief="flat",
             bd=0,
             padx=20,
@@ -397,9 +525,9 @@ class LoginWindow(tk.Tk):
         self.status_label = tk.Label(
             form_frame,
             textvariable=self.status_var,
-            font=ModernStyle.FONTS["small"],
-            bg=ModernStyle.COLORS["card_bg"],
-            fg=ModernStyle.COLORS["warning"],
+            font=FONTS["small"],
+            bg=COLORS["card_bg"],
+            fg=COLORS["warning"],
             height=2
         )
         self.status_label.pack(fill=tk.X)
@@ -408,22 +536,22 @@ class LoginWindow(tk.Tk):
         footer_label = tk.Label(
             card_frame,
             text="基于 Socket 通信 • 安全可靠",
-            font=ModernStyle.FONTS["small"],
-            bg=ModernStyle.COLORS["card_bg"],
-            fg=ModernStyle.COLORS["gray"]
+            font=FONTS["small"],
+            bg=COLORS["card_bg"],
+            fg=COLORS["gray"]
         )
         footer_label.pack(side=tk.BOTTOM, pady=10)
 
     def _create_input_field(self, parent: tk.Frame, label_text: str, var: tk.StringVar, row: int, show: Optional[str] = None) -> None:
-        field_frame = tk.Frame(parent, bg=ModernStyle.COLORS["card_bg"])
+        field_frame = tk.Frame(parent, bg=COLORS["card_bg"])
         field_frame.pack(fill=tk.X, pady=8)
 
         label = tk.Label(
             field_frame,
             text=label_text,
-            font=ModernStyle.FONTS["normal"],
-            bg=ModernStyle.COLORS["card_bg"],
-            fg=ModernStyle.COLORS["lighter"],
+            font=FONTS["normal"],
+            bg=COLORS["card_bg"],
+            fg=COLORS["lighter"],
             width=12,
             anchor="w"
         )
@@ -432,21 +560,21 @@ class LoginWindow(tk.Tk):
         entry = tk.Entry(
             field_frame,
             textvariable=var,
-            font=ModernStyle.FONTS["normal"],
+            font=FONTS["normal"],
             show=show,
-            bg=ModernStyle.COLORS["darker"],
-            fg=ModernStyle.COLORS["light"],
+            bg=COLORS["darker"],
+            fg=COLORS["light"],
             relief="flat",
             bd=2,
             highlightthickness=1,
-            highlightcolor=ModernStyle.COLORS["primary"],
-            highlightbackground=ModernStyle.COLORS["gray"]
+            highlightcolor=COLORS["primary"],
+            highlightbackground=COLORS["gray"]
         )
         entry.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(10, 0))
 
         # 焦点高亮效果
-        entry.bind("<FocusIn>", lambda e: entry.config(highlightbackground=ModernStyle.COLORS["primary"]))
-        entry.bind("<FocusOut>", lambda e: entry.config(highlightbackground=ModernStyle.COLORS["gray"]))
+        entry.bind("<FocusIn>", lambda e: entry.config(highlightbackground=COLORS["primary"]))
+        entry.bind("<FocusOut>", lambda e: entry.config(highlightbackground=COLORS["gray"]))
 
     def _ensure_runtime(self, host: str) -> ClientRuntime:
         if self.runtime and self._current_host == host:
@@ -474,19 +602,13 @@ class LoginWindow(tk.Tk):
             return
         runtime = self._ensure_runtime(host)
 
-        # 检查是否已连接到服务器
-        if not runtime._connected:
-            self.status_var.set("正在连接服务器，请稍候...")
-            # 延迟重试，等待连接完成
-            self.after(500, lambda: self._submit_auth(action))
-            return
-
+        # 不必等连接完成再提交：login/register 会在运行时里等到连接结束
         if action == "login":
             runtime.submit(runtime.login(username, password), ("login", username))
-            self.status_var.set("正在登录...")
+            self.status_var.set("正在登录..." if runtime._connected else "正在连接服务器，连接后自动登录...")
         else:
             runtime.submit(runtime.register(username, password), ("register", username))
-            self.status_var.set("正在注册...")
+            self.status_var.set("正在注册..." if runtime._connected else "正在连接服务器，连接后自动注册...")
 
     def _process_queue(self) -> None:
         try:
@@ -540,13 +662,13 @@ class LoginWindow(tk.Tk):
 
     def _show_status(self, message: str, status_type: str = "normal") -> None:
         colors = {
-            "success": ModernStyle.COLORS["success"],
-            "warning": ModernStyle.COLORS["warning"],
-            "danger": ModernStyle.COLORS["danger"],
-            "normal": ModernStyle.COLORS["gray"]
+            "success": COLORS["success"],
+            "warning": COLORS["warning"],
+            "danger": COLORS["danger"],
+            "normal": COLORS["gray"]
         }
         self.status_var.set(message)
-        self.status_label.config(fg=colors.get(status_type, ModernStyle.COLORS["gray"]))
+        self.status_label.config(fg=colors.get(status_type, COLORS["gray"]))
 
     def _on_close(self) -> None:
         for after_id in self.after_ids:
@@ -556,6 +678,8 @@ class LoginWindow(tk.Tk):
                 pass
         if self.runtime:
             self.runtime.shutdown()
+        if isinstance(self.ui_queue, WakeupQueue):
+            self.ui_queue.close()
         self.destroy()
 
 
@@ -567,7 +691,7 @@ class TkChatApp(tk.Tk):
         self.title(f"💬 Socket Chat - {auth_payload.get('username', '用户')}")
         self.geometry("1400x850")  # 增大默认窗口尺寸
         self.minsize(1200, 700)    # 增大最小尺寸
-        self.configure(bg=ModernStyle.COLORS["darkest"])
+        self.configure(bg=COLORS["darkest"])
 
         self.runtime = runtime
         self.ui_queue = runtime.ui_queue
@@ -600,7 +724,8 @@ class TkChatApp(tk.Tk):
         self._build_layout()
         self._build_file_panel(self._right_paned)
         self.protocol("WM_DELETE_WINDOW", self._on_close)
-        self._queue_job = self.after(100, self._process_queue)
+        self._wakeup_fd = self._watch_ui_queue()
+        self._queue_job: Optional[str] = self.after(100, self._process_queue)
 
         # 初始化用户列表
         self._initialize_user_lists(auth_payload)
@@ -616,82 +741,78 @@ class TkChatApp(tk.Tk):
         # 从在线列表开始
         all_users_set = set(auth_payload.get("roster", []))
 
-        # 从历史消息中提取用户
-        history = auth_payload.get("history", [])
-        for record in history:
-            message = record.get("message", {})
-            payload = message.get("payload", {})
-            sender = payload.get("sender_id")
-            if sender:
-                all_users_set.add(sender)
-            # 从会话ID中提取用户
-            conv_id = record.get("conversation_id") or payload.get("conversation_id")
+        # 从历史消息中提取用户（登录时已在后台线程里摊平成 HistoryRec）
+        recs = auth_payload.get("history_recs", [])
+        all_users_set.update(rec.sender_id for rec in recs if rec.sender_id)
+        # 从会话ID中提取用户：私聊会话ID形如 "userA|userB"，partition 不像 split 那样每次分配列表
+        for rec in recs:
+            conv_id = rec.conversation_id
             if conv_id and "|" in conv_id:
-                for user in conv_id.split("|"):
-                    if user:
-                        all_users_set.add(user)
+                first, _, second = conv_id.partition("|")
+                all_users_set.update((first, second))
+        all_users_set.discard("")
 
         # 更新全部用户列表
         self._populate_all_users(sorted(all_users_set))
 
     def _build_layout(self) -> None:
         # 顶部Header
-        header = tk.Frame(self, bg=ModernStyle.COLORS["dark"], height=60)
+        header = tk.Frame(self, bg=COLORS["dark"], height=60)
         header.pack(fill=tk.X, padx=10, pady=10)
         header.pack_propagate(False)
 
         # 标题区域
-        title_frame = tk.Frame(header, bg=ModernStyle.COLORS["dark"])
+        title_frame = tk.Frame(header, bg=COLORS["dark"])
         title_frame.pack(side=tk.LEFT, padx=20)
 
         icon_label = tk.Label(
             title_frame,
             text="💬",
             font=("Arial", 20),
-            bg=ModernStyle.COLORS["dark"],
-            fg=ModernStyle.COLORS["primary"]
+            bg=COLORS["dark"],
+            fg=COLORS["primary"]
         )
         icon_label.pack(side=tk.LEFT)
 
         title_label = tk.Label(
             title_frame,
             text="Socket Chat",
-            font=ModernStyle.FONTS["heading"],
-            bg=ModernStyle.COLORS["dark"],
-            fg=ModernStyle.COLORS["light"]
+            font=FONTS["heading"],
+            bg=COLORS["dark"],
+            fg=COLORS["light"]
         )
         title_label.pack(side=tk.LEFT, padx=(10, 0))
 
         # 用户信息区域
-        user_frame = tk.Frame(header, bg=ModernStyle.COLORS["dark"])
+        user_frame = tk.Frame(header, bg=COLORS["dark"])
         user_frame.pack(side=tk.RIGHT, padx=20)
 
         connection_indicator = tk.Label(
             user_frame,
             text="●",
             font=("Arial", 12),
-            bg=ModernStyle.COLORS["dark"],
-            fg=ModernStyle.COLORS["success"]
+            bg=COLORS["dark"],
+            fg=COLORS["success"]
         )
         connection_indicator.pack(side=tk.LEFT, padx=(0, 10))
 
         user_label = tk.Label(
             user_frame,
             text=f"用户: {self.current_user}",
-            font=ModernStyle.FONTS["normal"],
-            bg=ModernStyle.COLORS["dark"],
-            fg=ModernStyle.COLORS["lighter"]
+            font=FONTS["normal"],
+            bg=COLORS["dark"],
+            fg=COLORS["lighter"]
         )
         user_label.pack(side=tk.LEFT, padx=(0, 20))
 
         logout_btn = tk.Button(
             user_frame,
             text="退出登录",
-            font=ModernStyle.FONTS["small"],
-            bg=ModernStyle.COLORS["danger"],
-            fg=ModernStyle.COLORS["light"],
-            activebackground=ModernStyle.COLORS["danger_dark"],
-            activeforeground=ModernStyle.COLORS["light"],
+            font=FONTS["small"],
+            bg=COLORS["danger"],
+            fg=COLORS["light"],
+            activebackground=COLORS["danger_dark"],
+            activeforeground=COLORS["light"],
             relief="flat",
             bd=0,
             padx=10,
@@ -702,11 +823,11 @@ class TkChatApp(tk.Tk):
         logout_btn.pack(side=tk.LEFT)
 
         # 主内容区
-        main = tk.Frame(self, bg=ModernStyle.COLORS["darkest"])
+        main = tk.Frame(self, bg=COLORS["darkest"])
         main.pack(fill=tk.BOTH, expand=True, padx=10, pady=(0, 10))
 
         # 左侧面板
-        left = tk.Frame(main, bg=ModernStyle.COLORS["dark"], width=380)  # 再次增大左侧面板宽度
+        left = tk.Frame(main, bg=COLORS["dark"], width=380)  # 再次增大左侧面板宽度
         left.pack(side=tk.LEFT, fill=tk.Y, padx=(0, 10))
         left.pack_propagate(False)
 
@@ -714,9 +835,9 @@ class TkChatApp(tk.Tk):
         convo_title = tk.Label(
             left,
             text="💬 会话列表",
-            font=ModernStyle.FONTS["subheading"],
-            bg=ModernStyle.COLORS["dark"],
-            fg=ModernStyle.COLORS["light"],
+            font=FONTS["subheading"],
+            bg=COLORS["dark"],
+            fg=COLORS["light"],
             pady=10
         )
         convo_title.pack(fill=tk.X)
@@ -735,9 +856,9 @@ class TkChatApp(tk.Tk):
         users_title = tk.Label(
             left,
             text="👥 用户列表",
-            font=ModernStyle.FONTS["subheading"],
-            bg=ModernStyle.COLORS["dark"],
-            fg=ModernStyle.COLORS["light"],
+            font=FONTS["subheading"],
+            bg=COLORS["dark"],
+            fg=COLORS["light"],
             pady=10
         )
         users_title.pack(fill=tk.X, pady=(10, 0))
@@ -747,54 +868,54 @@ class TkChatApp(tk.Tk):
         users_notebook.pack(fill=tk.BOTH, expand=True, padx=10, pady=(0, 10))
 
         # 在线用户标签页
-        online_frame = tk.Frame(users_notebook, bg=ModernStyle.COLORS["darker"])
+        online_frame = tk.Frame(users_notebook, bg=COLORS["darker"])
         users_notebook.add(online_frame, text="🟢 在线")
 
         self.presence_list = tk.Listbox(
             online_frame,
-            bg=ModernStyle.COLORS["darker"],
-            fg=ModernStyle.COLORS["light"],
-            selectbackground=ModernStyle.COLORS["primary"],
-            selectforeground=ModernStyle.COLORS["light"],
+            bg=COLORS["darker"],
+            fg=COLORS["light"],
+            selectbackground=COLORS["primary"],
+            selectforeground=COLORS["light"],
             relief="flat",
             bd=0,
-            font=ModernStyle.FONTS["normal"]
+            font=FONTS["normal"]
         )
         self.presence_list.pack(fill=tk.BOTH, expand=True)
         # 双击在线用户开始聊天
         self.presence_list.bind("<Double-1>", self._on_online_user_double_click)
 
         # 离线用户标签页
-        offline_frame = tk.Frame(users_notebook, bg=ModernStyle.COLORS["darker"])
+        offline_frame = tk.Frame(users_notebook, bg=COLORS["darker"])
         users_notebook.add(offline_frame, text="⚪ 离线")
 
         self.offline_list = tk.Listbox(
             offline_frame,
-            bg=ModernStyle.COLORS["darker"],
-            fg=ModernStyle.COLORS["light"],
-            selectbackground=ModernStyle.COLORS["secondary"],
-            selectforeground=ModernStyle.COLORS["light"],
+            bg=COLORS["darker"],
+            fg=COLORS["light"],
+            selectbackground=COLORS["secondary"],
+            selectforeground=COLORS["light"],
             relief="flat",
             bd=0,
-            font=ModernStyle.FONTS["normal"]
+            font=FONTS["normal"]
         )
         self.offline_list.pack(fill=tk.BOTH, expand=True)
         # 双击离线用户也可以开始聊天（发送离线消息）
         self.offline_list.bind("<Double-1>", self._on_offline_user_double_click)
 
         # 全部用户标签页
-        all_users_frame = tk.Frame(users_notebook, bg=ModernStyle.COLORS["darker"])
+        all_users_frame = tk.Frame(users_notebook, bg=COLORS["darker"])
         users_notebook.add(all_users_frame, text="📋 全部")
 
         self.all_users_list = tk.Listbox(
             all_users_frame,
-            bg=ModernStyle.COLORS["darker"],
-            fg=ModernStyle.COLORS["light"],
-            selectbackground=ModernStyle.COLORS["success"],
-            selectforeground=ModernStyle.COLORS["light"],
+            bg=COLORS["darker"],
+            fg=COLORS["light"],
+            selectbackground=COLORS["success"],
+            selectforeground=COLORS["light"],
             relief="flat",
             bd=0,
-            font=ModernStyle.FONTS["normal"]
+            font=FONTS["normal"]
         )
         self.all_users_list.pack(fill=tk.BOTH, expand=True)
         # 双击全部用户列表也可以开始聊天
@@ -803,11 +924,11 @@ class TkChatApp(tk.Tk):
         refresh_btn = tk.Button(
             left,
             text="🔄 刷新用户列表",
-            font=ModernStyle.FONTS["small"],
-            bg=ModernStyle.COLORS["primary"],
-            fg=ModernStyle.COLORS["light"],
-            activebackground=ModernStyle.COLORS["primary_dark"],
-            activeforeground=ModernStyle.COLORS["light"],
+            font=FONTS["small"],
+            bg=COLORS["primary"],
+            fg=COLORS["light"],
+            activebackground=COLORS["primary_dark"],
+            activeforeground=COLORS["light"],
             relief="flat",
             bd=0,
             padx=15,  # 增大按钮内边距
@@ -821,11 +942,11 @@ class TkChatApp(tk.Tk):
         room_btn = tk.Button(
             left,
             text="🏠 房间管理",
-            font=ModernStyle.FONTS["small"],
-            bg=ModernStyle.COLORS["secondary"],
-            fg=ModernStyle.COLORS["light"],
-            activebackground=ModernStyle.COLORS["secondary_dark"],
-            activeforeground=ModernStyle.COLORS["light"],
+            font=FONTS["small"],
+            bg=COLORS["secondary"],
+            fg=COLORS["light"],
+            activebackground=COLORS["secondary_dark"],
+            activeforeground=COLORS["light"],
             relief="flat",
             bd=0,
             padx=15,  # 增大按钮内边距
@@ -839,11 +960,11 @@ class TkChatApp(tk.Tk):
         friend_btn = tk.Button(
             left,
             text="👥 好友管理",
-            font=ModernStyle.FONTS["small"],
-            bg=ModernStyle.COLORS["success"],
-            fg=ModernStyle.COLORS["light"],
-            activebackground=ModernStyle.COLORS["success_dark"],
-            activeforeground=ModernStyle.COLORS["light"],
+            font=FONTS["small"],
+            bg=COLORS["success"],
+            fg=COLORS["light"],
+            activebackground=COLORS["success_dark"],
+            activeforeground=COLORS["light"],
             relief="flat",
             bd=0,
             padx=15,
@@ -854,40 +975,40 @@ class TkChatApp(tk.Tk):
         friend_btn.pack(fill=tk.X, padx=10, pady=5)
 
         # 右侧面板
-        right = tk.Frame(main, bg=ModernStyle.COLORS["dark"])
+        right = tk.Frame(main, bg=COLORS["dark"])
         right.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         self._right_panel = right
 
         # 创建主PanedWindow（上中下三部分）
-        right_paned = tk.PanedWindow(right, orient=tk.VERTICAL, bg=ModernStyle.COLORS["dark"], sashwidth=5, sashrelief=tk.RAISED)
+        right_paned = tk.PanedWindow(right, orient=tk.VERTICAL, bg=COLORS["dark"], sashwidth=5, sashrelief=tk.RAISED)
         right_paned.pack(fill=tk.BOTH, expand=True)
         self._right_paned = right_paned  # 保存引用供后续使用
 
         # 第一部分：消息显示区域
-        msg_display_container = tk.Frame(right_paned, bg=ModernStyle.COLORS["dark"])
+        msg_display_container = tk.Frame(right_paned, bg=COLORS["dark"])
         right_paned.add(msg_display_container, minsize=150)
 
         # 消息记录标题
         chat_title = tk.Label(
             msg_display_container,
             text="💬 消息记录",
-            font=ModernStyle.FONTS["subheading"],
-            bg=ModernStyle.COLORS["dark"],
-            fg=ModernStyle.COLORS["light"],
+            font=FONTS["subheading"],
+            bg=COLORS["dark"],
+            fg=COLORS["light"],
             pady=10
         )
         chat_title.pack(fill=tk.X)
 
-        msg_frame = tk.Frame(msg_display_container, bg=ModernStyle.COLORS["darker"])
+        msg_frame = tk.Frame(msg_display_container, bg=COLORS["darker"])
         msg_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=(0, 10))
 
         self.chat_display = scrolledtext.ScrolledText(
             msg_frame,
             wrap=tk.WORD,
             state=tk.DISABLED,
-            font=ModernStyle.FONTS["normal"],
-            bg=ModernStyle.COLORS["darker"],
-            fg=ModernStyle.COLORS["light"],
+            font=FONTS["normal"],
+            bg=COLORS["darker"],
+            fg=COLORS["light"],
             padx=15,
             pady=10,
             relief="flat",
@@ -896,46 +1017,46 @@ class TkChatApp(tk.Tk):
         self.chat_display.pack(fill=tk.BOTH, expand=True)
 
         # 配置消息标签样式
-        self.chat_display.tag_config("system", foreground=ModernStyle.COLORS["gray"], justify="center")
-        self.chat_display.tag_config("time", foreground=ModernStyle.COLORS["gray_light"], font=ModernStyle.FONTS["small"])
-        self.chat_display.tag_config("self", foreground=ModernStyle.COLORS["primary_light"])
-        self.chat_display.tag_config("other", foreground=ModernStyle.COLORS["secondary"])
-        self.chat_display.tag_config("command", foreground=ModernStyle.COLORS["success"], font=ModernStyle.FONTS["monospace"])
-        self.chat_display.tag_config("quoted", foreground=ModernStyle.COLORS["gray"], background=ModernStyle.COLORS["darker"], lmargin1=20, lmargin2=20)
+        self.chat_display.tag_config("system", foreground=COLORS["gray"], justify="center")
+        self.chat_display.tag_config("time", foreground=COLORS["gray_light"], font=FONTS["small"])
+        self.chat_display.tag_config("self", foreground=COLORS["primary_light"])
+        self.chat_display.tag_config("other", foreground=COLORS["secondary"])
+        self.chat_display.tag_config("command", foreground=COLORS["success"], font=FONTS["monospace"])
+        self.chat_display.tag_config("quoted", foreground=COLORS["gray"], background=COLORS["darker"], lmargin1=20, lmargin2=20)
 
         # 添加右键菜单用于引用回复
-        self.chat_context_menu = tk.Menu(self.chat_display, tearoff=0, bg=ModernStyle.COLORS["card_bg"], fg=ModernStyle.COLORS["light"])
+        self.chat_context_menu = tk.Menu(self.chat_display, tearoff=0, bg=COLORS["card_bg"], fg=COLORS["light"])
         self.chat_context_menu.add_command(label="📝 引用回复", command=self._quote_selected_message)
         self.chat_display.bind("<Button-3>", self._show_context_menu)  # 右键点击
 
         # 第二部分：发送消息区域
-        composer_container = tk.Frame(right_paned, bg=ModernStyle.COLORS["dark"])
+        composer_container = tk.Frame(right_paned, bg=COLORS["dark"])
         right_paned.add(composer_container, minsize=180)
 
         # 发送消息区域
         composer_title = tk.Label(
             composer_container,
             text="📤 发送消息",
-            font=ModernStyle.FONTS["subheading"],
-            bg=ModernStyle.COLORS["dark"],
-            fg=ModernStyle.COLORS["light"],
+            font=FONTS["subheading"],
+            bg=COLORS["dark"],
+            fg=COLORS["light"],
             pady=8
         )
         composer_title.pack(fill=tk.X)
 
-        composer = tk.Frame(composer_container, bg=ModernStyle.COLORS["card_bg"])
+        composer = tk.Frame(composer_container, bg=COLORS["card_bg"])
         composer.pack(fill=tk.BOTH, expand=True, padx=10, pady=(0, 10))
 
         # 模式选择
-        mode_frame = tk.Frame(composer, bg=ModernStyle.COLORS["card_bg"])
+        mode_frame = tk.Frame(composer, bg=COLORS["card_bg"])
         mode_frame.pack(fill=tk.X, padx=10, pady=(10, 5))
 
         tk.Label(
             mode_frame,
             text="发送至:",
-            font=ModernStyle.FONTS["normal"],
-            bg=ModernStyle.COLORS["card_bg"],
-            fg=ModernStyle.COLORS["lighter"]
+            font=FONTS["normal"],
+            bg=COLORS["card_bg"],
+            fg=COLORS["lighter"]
         ).pack(side=tk.LEFT)
 
         tk.Radiobutton(
@@ -943,12 +1064,12 @@ class TkChatApp(tk.Tk):
             text="私聊",
             value="user",
             variable=self.target_mode,
-            font=ModernStyle.FONTS["small"],
-            bg=ModernStyle.COLORS["card_bg"],
-            fg=ModernStyle.COLORS["lighter"],
-            selectcolor=ModernStyle.COLORS["primary"],
-            activebackground=ModernStyle.COLORS["card_bg"],
-            activeforeground=ModernStyle.COLORS["light"]
+            font=FONTS["small"],
+            bg=COLORS["card_bg"],
+            fg=COLORS["lighter"],
+            selectcolor=COLORS["primary"],
+            activebackground=COLORS["card_bg"],
+            activeforeground=COLORS["light"]
         ).pack(side=tk.LEFT, padx=10)
 
         tk.Radiobutton(
@@ -956,33 +1077,33 @@ class TkChatApp(tk.Tk):
             text="房间",
             value="room",
             variable=self.target_mode,
-            font=ModernStyle.FONTS["small"],
-            bg=ModernStyle.COLORS["card_bg"],
-            fg=ModernStyle.COLORS["lighter"],
-            selectcolor=ModernStyle.COLORS["primary"],
-            activebackground=ModernStyle.COLORS["card_bg"],
-            activeforeground=ModernStyle.COLORS["light"]
+            font=FONTS["small"],
+            bg=COLORS["card_bg"],
+            fg=COLORS["lighter"],
+            selectcolor=COLORS["primary"],
+            activebackground=COLORS["card_bg"],
+            activeforeground=COLORS["light"]
         ).pack(side=tk.LEFT)
 
         # 目标输入
-        form_row = tk.Frame(composer, bg=ModernStyle.COLORS["card_bg"])
+        form_row = tk.Frame(composer, bg=COLORS["card_bg"])
         form_row.pack(fill=tk.X, padx=10, pady=5)
 
         tk.Label(
             form_row,
             text="会话ID:",
-            font=ModernStyle.FONTS["small"],
-            bg=ModernStyle.COLORS["card_bg"],
-            fg=ModernStyle.COLORS["lighter"],
+            font=FONTS["small"],
+            bg=COLORS["card_bg"],
+            fg=COLORS["lighter"],
             width=10
         ).grid(row=0, column=0, sticky=tk.W, pady=2)
 
         tk.Entry(
             form_row,
             textvariable=self.conversation_var,
-            font=ModernStyle.FONTS["small"],
-            bg=ModernStyle.COLORS["darker"],
-            fg=ModernStyle.COLORS["light"],
+            font=FONTS["small"],
+            bg=COLORS["darker"],
+            fg=COLORS["light"],
             relief="flat",
             bd=1
         ).grid(row=0, column=1, sticky=tk.EW, padx=5, pady=2)
@@ -990,18 +1111,18 @@ class TkChatApp(tk.Tk):
         tk.Label(
             form_row,
             text="目标ID:",
-            font=ModernStyle.FONTS["small"],
-            bg=ModernStyle.COLORS["card_bg"],
-            fg=ModernStyle.COLORS["lighter"],
+            font=FONTS["small"],
+            bg=COLORS["card_bg"],
+            fg=COLORS["lighter"],
             width=10
         ).grid(row=1, column=0, sticky=tk.W, pady=2)
 
         tk.Entry(
             form_row,
             textvariable=self.target_var,
-            font=ModernStyle.FONTS["small"],
-            bg=ModernStyle.COLORS["darker"],
-            fg=ModernStyle.COLORS["light"],
+            font=FONTS["small"],
+            bg=COLORS["darker"],
+            fg=COLORS["light"],
             relief="flat",
             bd=1
         ).grid(row=1, column=1, sticky=tk.EW, padx=5, pady=2)
@@ -1009,28 +1130,28 @@ class TkChatApp(tk.Tk):
         form_row.columnconfigure(1, weight=1)
 
         # 引用预览区域（默认隐藏）
-        self.reply_preview_frame = tk.Frame(composer, bg=ModernStyle.COLORS["card_bg"])
+        self.reply_preview_frame = tk.Frame(composer, bg=COLORS["card_bg"])
         # 默认不pack，只在有引用时显示
 
-        reply_preview_header = tk.Frame(self.reply_preview_frame, bg=ModernStyle.COLORS["darker"])
+        reply_preview_header = tk.Frame(self.reply_preview_frame, bg=COLORS["darker"])
         reply_preview_header.pack(fill=tk.X, padx=10, pady=(5, 0))
 
         tk.Label(
             reply_preview_header,
             text="💬 引用回复",
-            font=ModernStyle.FONTS["small"],
-            bg=ModernStyle.COLORS["darker"],
-            fg=ModernStyle.COLORS["primary"]
+            font=FONTS["small"],
+            bg=COLORS["darker"],
+            fg=COLORS["primary"]
         ).pack(side=tk.LEFT, padx=5)
 
         self.cancel_reply_btn = tk.Button(
             reply_preview_header,
             text="✕",
-            font=ModernStyle.FONTS["small"],
-            bg=ModernStyle.COLORS["darker"],
-            fg=ModernStyle.COLORS["danger"],
-            activebackground=ModernStyle.COLORS["danger"],
-            activeforeground=ModernStyle.COLORS["light"],
+            font=FONTS["small"],
+            bg=COLORS["darker"],
+            fg=COLORS["danger"],
+            activebackground=COLORS["danger"],
+            activeforeground=COLORS["light"],
             relief="flat",
             bd=0,
             padx=5,
@@ -1043,9 +1164,9 @@ class TkChatApp(tk.Tk):
         self.reply_preview_label = tk.Label(
             self.reply_preview_frame,
             text="",
-            font=ModernStyle.FONTS["small"],
-            bg=ModernStyle.COLORS["darker"],
-            fg=ModernStyle.COLORS["gray_light"],
+            font=FONTS["small"],
+            bg=COLORS["darker"],
+            fg=COLORS["gray_light"],
             anchor=tk.W,
             justify=tk.LEFT,
             wraplength=600
@@ -1057,9 +1178,9 @@ class TkChatApp(tk.Tk):
             composer,
             height=3,
             wrap=tk.WORD,
-            font=ModernStyle.FONTS["normal"],
-            bg=ModernStyle.COLORS["darker"],
-            fg=ModernStyle.COLORS["light"],
+            font=FONTS["normal"],
+            bg=COLORS["darker"],
+            fg=COLORS["light"],
             relief="flat",
             bd=1
         )
@@ -1067,17 +1188,17 @@ class TkChatApp(tk.Tk):
         self.message_input.bind("<Return>", lambda e: "break" if e.state & 0x1 else self._send_message())
 
         # 操作按钮
-        action_row = tk.Frame(composer, bg=ModernStyle.COLORS["card_bg"])
+        action_row = tk.Frame(composer, bg=COLORS["card_bg"])
         action_row.pack(fill=tk.X, padx=10, pady=(5, 10))
 
         send_btn = tk.Button(
             action_row,
             text="📤 发送",
-            font=ModernStyle.FONTS["small"],
-            bg=ModernStyle.COLORS["primary"],
-            fg=ModernStyle.COLORS["light"],
-            activebackground=ModernStyle.COLORS["primary_dark"],
-            activeforeground=ModernStyle.COLORS["light"],
+            font=FONTS["small"],
+            bg=COLORS["primary"],
+            fg=COLORS["light"],
+            activebackground=COLORS["primary_dark"],
+            activeforeground=COLORS["light"],
             relief="flat",
             bd=0,
             padx=15,
@@ -1090,11 +1211,11 @@ class TkChatApp(tk.Tk):
         voice_call_btn = tk.Button(
             action_row,
             text="📞 语音通话",
-            font=ModernStyle.FONTS["small"],
-            bg=ModernStyle.COLORS["success"],
-            fg=ModernStyle.COLORS["light"],
-            activebackground=ModernStyle.COLORS["success_dark"],
-            activeforeground=ModernStyle.COLORS["light"],
+            font=FONTS["small"],
+            bg=COLORS["success"],
+            fg=COLORS["light"],
+            activebackground=COLORS["success_dark"],
+            activeforeground=COLORS["light"],
             relief="flat",
             bd=0,
             padx=15,
@@ -1105,23 +1226,48 @@ class TkChatApp(tk.Tk):
         voice_call_btn.pack(side=tk.LEFT, padx=2)
 
         # 底部状态栏
-        footer = tk.Frame(self, bg=ModernStyle.COLORS["dark"], height=25)
+        footer = tk.Frame(self, bg=COLORS["dark"], height=25)
         footer.pack(fill=tk.X, padx=10, pady=(0, 10))
         footer.pack_propagate(False)
 
         status_label = tk.Label(
             footer,
             textvariable=self.status_var,
-            font=ModernStyle.FONTS["small"],
-            bg=ModernStyle.COLORS["dark"],
-            fg=ModernStyle.COLORS["gray_light"]
+            font=FONTS["small"],
+            bg=COLORS["dark"],
+            fg=COLORS["gray_light"]
         )
         status_label.pack(side=tk.LEFT, padx=10)
 
+    def _watch_ui_queue(self) -> Optional[int]:
+        """Register the queue's wakeup pipe with Tk; None means fall back to polling (e.g. Windows)."""
+        fd = getattr(self.ui_queue, "wakeup_fd", None)
+        if fd is None:
+            return None
+        try:
+            self.tk.createfilehandler(fd, tk.READABLE, self._on_ui_wakeup)
+        except (AttributeError, RuntimeError, tk.TclError):
+            return None
+        return fd
+
+    def _on_ui_wakeup(self, fd: int, mask: int) -> None:
+        self.ui_queue.clear_wakeup()
+        # 已排了积压批次时由它接着取，避免同时挂两个任务
+        if self._queue_job is None:
+            self._process_queue()
+
     def _process_queue(self) -> None:
+        self._queue_job = None
+        # 先取空队列再处理：一次突发里被后续事件覆盖的语音成员列表更新只重绘最后一次（在线状态已在运行时合并成 presence_batch）
+        pending: List[UIEvent] = []
+        ui_queue = self.ui_queue
         try:
-            while True:
-                kind, payload = self.ui_queue.get_nowait()
+            while len(pending) < UI_DRAIN_BATCH:
+                pending.append(ui_queue.get_nowait())
+        except queue.Empty:
+            pass
+        try:
+            for kind, payload in coalesce_ui_events(pending):
                 try:
                     if kind == "message":
                         self._append_message(payload)
@@ -1132,8 +1278,8 @@ class TkChatApp(tk.Tk):
                         self._set_status(str(payload))
                     elif kind == "file":
                         self._handle_file_event(payload)
-                    elif kind == "presence_update":
-                        self._handle_presence_update(payload)
+                    elif kind == "presence_batch":
+                        self._handle_presence_batch(payload)
                     elif kind == "voice":
                         self._handle_voice_event(payload)
                     elif kind == "friend_event":
@@ -1145,14 +1291,16 @@ class TkChatApp(tk.Tk):
                         self._append_log(f"[错误] 处理事件 {kind} 时出错: {e}")
                     except:
                         pass
-        except queue.Empty:
-            pass
         except tk.TclError:
             return
         except Exception as e:
             # 捕获队列处理中的意外异常
             logger.error(f"Unexpected error in _process_queue: {e}", exc_info=True)
-        self._queue_job = self.after(120, self._process_queue)
+        if len(pending) >= UI_DRAIN_BATCH:
+            # 还有积压：让 Tk 先重绘，空闲后马上处理下一批，不等固定间隔
+            self._queue_job = self.after_idle(self._process_queue)
+        elif self._wakeup_fd is None:
+            self._queue_job = self.after(UI_POLL_INTERVAL_MS, self._process_queue)
 
     def _handle_future(self, tag: Tuple[str, Optional[str]], future: Any) -> None:
         action, meta = tag
@@ -1634,52 +1782,49 @@ class TkChatApp(tk.Tk):
         else:
             self._append_log(f"已开始与 {target_user} 的对话")
 
-    def _handle_presence_update(self, event: Dict[str, Any]) -> None:
-        """处理实时在线状态更新"""
-        user_id = event.get("user_id")
-        state = event.get("state")
-
-        if not user_id or user_id == self.current_user:
+    def _handle_presence_batch(self, states: Dict[str, str]) -> None:
+        """批量应用在线状态变化：先在内存里算出新列表，每个 Listbox 最多重写一次"""
+        states = {user_id: state for user_id, state in states.items() if user_id != self.current_user}
+        if not states:
             return
 
         # 确保用户在全部用户列表中
-        self._add_to_all_users(user_id)
-
-        # 获取当前在线列表
-        current_online = set(self.presence_list.get(0, tk.END))
+        all_users = set(self.all_users_list.get(0, tk.END))
+        if not all_users.issuperset(states):
+            all_users.update(states)
+            self._populate_all_users(sorted(all_users))
 
-        if state == "online":
-            # 用户上线
-            if user_id not in current_online:
-                self.presence_list.insert(tk.END, user_id)
+        online = list(self.presence_list.get(0, tk.END))
+        offline = list(self.offline_list.get(0, tk.END))
+        online_set = set(online)
+        online_changed = offline_changed = False
+
+        for user_id, state in states.items():
+            if state == "online" and user_id not in online_set:
+                # 用户上线，并从离线列表中移除
+                online.append(user_id)
+                online_set.add(user_id)
+                online_changed = True
                 self._append_log(f"🟢 {user_id} 上线了")
-
-                # 从离线列表中移除
-                for i in range(self.offline_list.size()):
-                    if self.offline_list.get(i) == user_id:
-                        self.offline_list.delete(i)
-                        break
-        elif state == "offline":
-            # 用户下线
-            if user_id in current_online:
-                # 从在线列表中删除
-                for i in range(self.presence_list.size()):
-                    if self.presence_list.get(i) == user_id:
-                        self.presence_list.delete(i)
-                        break
+                if user_id in offline:
+                    offline.remove(user_id)
+                    offline_changed = True
+            elif state == "offline" and user_id in online_set:
+                # 用户下线，加入离线列表（按字母顺序）
+                online.remove(user_id)
+                online_set.discard(user_id)
+                online_changed = True
                 self._append_log(f"⚪ {user_id} 离线了")
+                offline.append(user_id)
+                offline.sort()
+                offline_changed = True
 
-                # 添加到离线列表
-                # 检查是否在全部用户列表中
-                all_users = set(self.all_users_list.get(0, tk.END))
-                if user_id in all_users:
-                    # 按字母顺序插入
-                    offline_users = list(self.offline_list.get(0, tk.END))
-                    offline_users.append(user_id)
-                    offline_users.sort()
-                    self.offline_list.delete(0, tk.END)
-                    for user in offline_users:
-                        self.offline_list.insert(tk.END, user)
+        if online_changed:
+            self.presence_list.delete(0, tk.END)
+            self.presence_list.insert(tk.END, *online)
+        if offline_changed:
+            self.offline_list.delete(0, tk.END)
+            self.offline_list.insert(tk.END, *offline)
 
     def _prompt_room_password(self, room_id: str) -> Optional[str]:
         """提示用户输入房间密码"""
@@ -1732,34 +1877,34 @@ class TkChatApp(tk.Tk):
 
     def _build_file_panel(self, parent: tk.Widget) -> None:
         # 下半部分：文件传输面板容器
-        file_container = tk.Frame(parent, bg=ModernStyle.COLORS["dark"])
+        file_container = tk.Frame(parent, bg=COLORS["dark"])
         parent.add(file_container, minsize=200)  # 增大最小高度以容纳进度条
 
         # 文件传输标题
         file_title = tk.Label(
             file_container,
             text="📎 文件传输",
-            font=ModernStyle.FONTS["subheading"],
-            bg=ModernStyle.COLORS["dark"],
-            fg=ModernStyle.COLORS["light"],
+            font=FONTS["subheading"],
+            bg=COLORS["dark"],
+            fg=COLORS["light"],
             pady=8
         )
         file_title.pack(fill=tk.X)
 
-        frame = tk.Frame(file_container, bg=ModernStyle.COLORS["card_bg"])
+        frame = tk.Frame(file_container, bg=COLORS["card_bg"])
         frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=(0, 10))
 
-        controls = tk.Frame(frame, bg=ModernStyle.COLORS["card_bg"])
+        controls = tk.Frame(frame, bg=COLORS["card_bg"])
         controls.pack(fill=tk.X, padx=10, pady=10)
 
         send_file_btn = tk.Button(
             controls,
             text="📎 选择文件并发送",
-            font=ModernStyle.FONTS["small"],
-            bg=ModernStyle.COLORS["primary"],
-            fg=ModernStyle.COLORS["light"],
-            activebackground=ModernStyle.COLORS["primary_dark"],
-            activeforeground=ModernStyle.COLORS["light"],
+            font=FONTS["small"],
+            bg=COLORS["primary"],
+            fg=COLORS["light"],
+            activebackground=COLORS["primary_dark"],
+            activeforeground=COLORS["light"],
             relief="flat",
             bd=0,
             padx=15,
@@ -1770,7 +1915,7 @@ class TkChatApp(tk.Tk):
         send_file_btn.pack(side=tk.LEFT, padx=2)
 
         # 创建包含表格和进度条的容器
-        tree_container = tk.Frame(frame, bg=ModernStyle.COLORS["card_bg"])
+        tree_container = tk.Frame(frame, bg=COLORS["card_bg"])
         tree_container.pack(fill=tk.BOTH, expand=True, padx=10, pady=(0, 10))
 
         self.file_tree = ttk.Treeview(
@@ -2442,7 +2587,7 @@ class TkChatApp(tk.Tk):
         dialog.title("来电")
         dialog.geometry("400x150")
         dialog.resizable(False, False)
-        dialog.configure(bg=ModernStyle.COLORS["dark"])
+        dialog.configure(bg=COLORS["dark"])
         dialog.transient(self)
         dialog.grab_set()
 
@@ -2457,13 +2602,13 @@ class TkChatApp(tk.Tk):
         tk.Label(
             dialog,
             text=f"📞 来自 {from_user} 的{call_type_text}",
-            font=ModernStyle.FONTS["heading"],
-            bg=ModernStyle.COLORS["dark"],
-            fg=ModernStyle.COLORS["light"]
+            font=FONTS["heading"],
+            bg=COLORS["dark"],
+            fg=COLORS["light"]
         ).pack(pady=20)
 
         # 按钮区域
-        button_frame = tk.Frame(dialog, bg=ModernStyle.COLORS["dark"])
+        button_frame = tk.Frame(dialog, bg=COLORS["dark"])
         button_frame.pack(fill=tk.X, padx=30, pady=10)
 
         def on_answer():
@@ -2484,11 +2629,11 @@ class TkChatApp(tk.Tk):
         tk.Button(
             button_frame,
             text="✅ 接听",
-            font=ModernStyle.FONTS["normal"],
-            bg=ModernStyle.COLORS["success"],
-            fg=ModernStyle.COLORS["light"],
-            activebackground=ModernStyle.COLORS["success_dark"],
-            activeforeground=ModernStyle.COLORS["light"],
+            font=FONTS["normal"],
+            bg=COLORS["success"],
+            fg=COLORS["light"],
+            activebackground=COLORS["success_dark"],
+            activeforeground=COLORS["light"],
             relief="flat",
             bd=0,
             padx=20,
@@ -2500,11 +2645,11 @@ class TkChatApp(tk.Tk):
         tk.Button(
             button_frame,
             text="❌ 拒绝",
-            font=ModernStyle.FONTS["normal"],
-            bg=ModernStyle.COLORS["danger"],
-            fg=ModernStyle.COLORS["light"],
-            activebackground=ModernStyle.COLORS["danger_dark"],
-            activeforeground=ModernStyle.COLORS["light"],
+            font=FONTS["normal"],
+            bg=COLORS["danger"],
+            fg=COLORS["light"],
+            activebackground=COLORS["danger_dark"],
+            activeforeground=COLORS["light"],
             relief="flat",
             bd=0,
             padx=20,
@@ -2527,7 +2672,7 @@ class TkChatApp(tk.Tk):
         dialog.title("语音通话中")
         dialog.geometry("350x480")  # 增加高度以显示所有内容
         dialog.resizable(False, False)
-        dialog.configure(bg=ModernStyle.COLORS["dark"])
+        dialog.configure(bg=COLORS["dark"])
         dialog.transient(self)
 
         self.voice_control_window = dialog
@@ -2562,44 +2707,44 @@ class TkChatApp(tk.Tk):
         call_type_text = "群聊语音" if call_type == "group" else "语音通话"
 
         # 标题区域
-        title_frame = tk.Frame(dialog, bg=ModernStyle.COLORS["dark"])
+        title_frame = tk.Frame(dialog, bg=COLORS["dark"])
         title_frame.pack(pady=(20, 10))
 
         tk.Label(
             title_frame,
             text=call_type_emoji,
             font=("Arial", 40),
-            bg=ModernStyle.COLORS["dark"],
-            fg=ModernStyle.COLORS["primary"]
+            bg=COLORS["dark"],
+            fg=COLORS["primary"]
         ).pack()
 
         tk.Label(
             title_frame,
             text=call_type_text,
-            font=ModernStyle.FONTS["small"],
-            bg=ModernStyle.COLORS["dark"],
-            fg=ModernStyle.COLORS["gray"]
+            font=FONTS["small"],
+            bg=COLORS["dark"],
+            fg=COLORS["gray"]
         ).pack()
 
         # 对方名称
         tk.Label(
             dialog,
             text=other_name,
-            font=ModernStyle.FONTS["heading"],
-            bg=ModernStyle.COLORS["dark"],
-            fg=ModernStyle.COLORS["light"]
+            font=FONTS["heading"],
+            bg=COLORS["dark"],
+            fg=COLORS["light"]
         ).pack(pady=(5, 5))
 
         # 状态和时长
-        status_frame = tk.Frame(dialog, bg=ModernStyle.COLORS["dark"])
+        status_frame = tk.Frame(dialog, bg=COLORS["dark"])
         status_frame.pack(pady=10)
 
         status_label = tk.Label(
             status_frame,
             text=status_text,
-            font=ModernStyle.FONTS["normal"],
-            bg=ModernStyle.COLORS["dark"],
-            fg=ModernStyle.COLORS["success"] if status == "connected" else ModernStyle.COLORS["warning"]
+            font=FONTS["normal"],
+            bg=COLORS["dark"],
+            fg=COLORS["success"] if status == "connected" else COLORS["warning"]
         )
         status_label.pack()
 
@@ -2607,22 +2752,22 @@ class TkChatApp(tk.Tk):
         duration_label = tk.Label(
             status_frame,
             text="00:00",
-            font=ModernStyle.FONTS["subheading"],
-            bg=ModernStyle.COLORS["dark"],
-            fg=ModernStyle.COLORS["light"]
+            font=FONTS["subheading"],
+            bg=COLORS["dark"],
+            fg=COLORS["light"]
         )
         duration_label.pack(pady=(5, 0))
 
         # 参与者列表（仅群聊时显示）
-        participants_frame = tk.Frame(dialog, bg=ModernStyle.COLORS["dark"])
+        participants_frame = tk.Frame(dialog, bg=COLORS["dark"])
 
         # 参与者标题
         participants_title = tk.Label(
             participants_frame,
             text="",
-            font=ModernStyle.FONTS["small"],
-            bg=ModernStyle.COLORS["dark"],
-            fg=ModernStyle.COLORS["gray"]
+            font=FONTS["small"],
+            bg=COLORS["dark"],
+            fg=COLORS["gray"]
         )
         participants_title.pack(pady=(0, 3))
 
@@ -2630,9 +2775,9 @@ class TkChatApp(tk.Tk):
         participants_list = tk.Label(
             participants_frame,
             text="",
-            font=ModernStyle.FONTS["small"],
-            bg=ModernStyle.COLORS["dark"],
-            fg=ModernStyle.COLORS["primary"],
+            font=FONTS["small"],
+            bg=COLORS["dark"],
+            fg=COLORS["primary"],
             justify=tk.LEFT,
             wraplength=250
         )
@@ -2680,7 +2825,7 @@ class TkChatApp(tk.Tk):
                     start_time = call_info.get("start_time", time.time())
                     elapsed = int(time.time() - start_time)
                     if elapsed > 60:
-                        duration_label.config(text=f"等待中 {elapsed}秒", fg=ModernStyle.COLORS["warning"])
+                        duration_label.config(text=f"等待中 {elapsed}秒", fg=COLORS["warning"])
                     else:
                         duration_label.config(text="等待接听...")
 
@@ -2763,11 +2908,11 @@ class TkChatApp(tk.Tk):
         tk.Button(
             dialog,
             text="📵 挂断",
-            font=ModernStyle.FONTS["subheading"],
-            bg=ModernStyle.COLORS["danger"],
-            fg=ModernStyle.COLORS["light"],
-            activebackground=ModernStyle.COLORS["danger_dark"],
-            activeforeground=ModernStyle.COLORS["light"],
+            font=FONTS["subheading"],
+            bg=COLORS["danger"],
+            fg=COLORS["light"],
+            activebackground=COLORS["danger_dark"],
+            activeforeground=COLORS["light"],
             relief="flat",
             bd=0,
             padx=40,
@@ -2820,12 +2965,17 @@ class TkChatApp(tk.Tk):
         self._append_log(f"已清理与 {friend_id} 的聊天记录")
 
     def _on_close(self) -> None:
-        if hasattr(self, "_queue_job"):
+        if self._wakeup_fd is not None:
+            self.tk.deletefilehandler(self._wakeup_fd)
+            self._wakeup_fd = None
+        if self._queue_job is not None:
             try:
                 self.after_cancel(self._queue_job)
             except tk.TclError:
                 pass
         self.runtime.shutdown()
+        if isinstance(self.ui_queue, WakeupQueue):
+            self.ui_queue.close()
         self.destroy()
 
     def _show_context_menu(self, event: Any) -> None:
@@ -2913,7 +3063,7 @@ class RoomManagerWindow(tk.Toplevel):
         self.title("🏠 房间管理")
         self.geometry("1000x700")  # 增大窗口尺寸
         self.resizable(True, True)  # 允许调节大小
-        self.configure(bg=ModernStyle.COLORS["darkest"])
+        self.configure(bg=COLORS["darkest"])
         self.status_var = tk.StringVar(value="请选择操作")
         self.current_room: Optional[str] = None
 
@@ -2928,8 +3078,8 @@ class RoomManagerWindow(tk.Toplevel):
         self.notebook = ttk.Notebook(self)
         self.notebook.pack(fill=tk.BOTH, expand=True)
 
-        self.overview_frame = tk.Frame(self.notebook, bg=ModernStyle.COLORS["dark"])
-        self.ops_frame = tk.Frame(self.notebook, bg=ModernStyle.COLORS["dark"])
+        self.overview_frame = tk.Frame(self.notebook, bg=COLORS["dark"])
+        self.ops_frame = tk.Frame(self.notebook, bg=COLORS["dark"])
         self.notebook.add(self.overview_frame, text="房间概览")
         self.notebook.add(self.ops_frame, text="房间操作")
 
@@ -3266,7 +3416,7 @@ class FriendManagerWindow(tk.Toplevel):
         self.title("👥 好友管理")
         self.geometry("900x700")
         self.resizable(True, True)
-        self.configure(bg=ModernStyle.COLORS["darkest"])
+        self.configure(bg=COLORS["darkest"])
         self.status_var = tk.StringVar(value="请选择操作")
 
         # 居中窗口
@@ -3282,15 +3432,15 @@ class FriendManagerWindow(tk.Toplevel):
         self.notebook.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
 
         # 好友列表标签页
-        self.friends_frame = tk.Frame(self.notebook, bg=ModernStyle.COLORS["dark"])
+        self.friends_frame = tk.Frame(self.notebook, bg=COLORS["dark"])
         self.notebook.add(self.friends_frame, text="📋 好友列表")
 
         # 添加好友标签页
-        self.add_frame = tk.Frame(self.notebook, bg=ModernStyle.COLORS["dark"])
+        self.add_frame = tk.Frame(self.notebook, bg=COLORS["dark"])
         self.notebook.add(self.add_frame, text="➕ 添加好友")
 
         # 好友请求标签页
-        self.requests_frame = tk.Frame(self.notebook, bg=ModernStyle.COLORS["dark"])
+        self.requests_frame = tk.Frame(self.notebook, bg=COLORS["dark"])
         self.notebook.add(self.requests_frame, text="📬 好友请求")
 
         self._build_friends_tab()
@@ -3298,16 +3448,16 @@ class FriendManagerWindow(tk.Toplevel):
         self._build_requests_tab()
 
         # 底部状态栏
-        status_frame = tk.Frame(self, bg=ModernStyle.COLORS["dark"], height=30)
+        status_frame = tk.Frame(self, bg=COLORS["dark"], height=30)
         status_frame.pack(fill=tk.X, padx=10, pady=(0, 10))
         status_frame.pack_propagate(False)
 
         tk.Label(
             status_frame,
             textvariable=self.status_var,
-            font=ModernStyle.FONTS["small"],
-            bg=ModernStyle.COLORS["dark"],
-            fg=ModernStyle.COLORS["gray_light"]
+            font=FONTS["small"],
+            bg=COLORS["dark"],
+            fg=COLORS["gray_light"]
         ).pack(side=tk.LEFT, padx=10)
 
         self.protocol("WM_DELETE_WINDOW", self._on_close)
@@ -3321,13 +3471,13 @@ class FriendManagerWindow(tk.Toplevel):
         tk.Label(
             self.friends_frame,
             text="我的好友",
-            font=ModernStyle.FONTS["heading"],
-            bg=ModernStyle.COLORS["dark"],
-            fg=ModernStyle.COLORS["light"]
+            font=FONTS["heading"],
+            bg=COLORS["dark"],
+            fg=COLORS["light"]
         ).pack(pady=20)
 
         # 好友列表框架
-        list_frame = tk.Frame(self.friends_frame, bg=ModernStyle.COLORS["darker"])
+        list_frame = tk.Frame(self.friends_frame, bg=COLORS["darker"])
         list_frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=(0, 10))
 
         # 使用 Treeview 显示好友列表
@@ -3351,17 +3501,17 @@ class FriendManagerWindow(tk.Toplevel):
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
 
         # 操作按钮
-        btn_frame = tk.Frame(self.friends_frame, bg=ModernStyle.COLORS["dark"])
+        btn_frame = tk.Frame(self.friends_frame, bg=COLORS["dark"])
         btn_frame.pack(fill=tk.X, padx=20, pady=10)
 
         tk.Button(
             btn_frame,
             text="🔄 刷新列表",
-            font=ModernStyle.FONTS["normal"],
-            bg=ModernStyle.COLORS["primary"],
-            fg=ModernStyle.COLORS["light"],
-            activebackground=ModernStyle.COLORS["primary_dark"],
-            activeforeground=ModernStyle.COLORS["light"],
+            font=FONTS["normal"],
+            bg=COLORS["primary"],
+            fg=COLORS["light"],
+            activebackground=COLORS["primary_dark"],
+            activeforeground=COLORS["light"],
             relief="flat",
             bd=0,
             padx=20,
@@ -3373,11 +3523,11 @@ class FriendManagerWindow(tk.Toplevel):
         tk.Button(
             btn_frame,
             text="💬 开始聊天",
-            font=ModernStyle.FONTS["normal"],
-            bg=ModernStyle.COLORS["success"],
-            fg=ModernStyle.COLORS["light"],
-            activebackground=ModernStyle.COLORS["success_dark"],
-            activeforeground=ModernStyle.COLORS["light"],
+            font=FONTS["normal"],
+            bg=COLORS["success"],
+            fg=COLORS["light"],
+            activebackground=COLORS["success_dark"],
+            activeforeground=COLORS["light"],
             relief="flat",
             bd=0,
             padx=20,
@@ -3389,11 +3539,11 @@ class FriendManagerWindow(tk.Toplevel):
         tk.Button(
             btn_frame,
             text="🗑️ 删除好友",
-            font=ModernStyle.FONTS["normal"],
-            bg=ModernStyle.COLORS["danger"],
-            fg=ModernStyle.COLORS["light"],
-            activebackground=ModernStyle.COLORS["danger_dark"],
-            activeforeground=ModernStyle.COLORS["light"],
+            font=FONTS["normal"],
+            bg=COLORS["danger"],
+            fg=COLORS["light"],
+            activebackground=COLORS["danger_dark"],
+            activeforeground=COLORS["light"],
             relief="flat",
             bd=0,
             padx=20,
@@ -3408,34 +3558,34 @@ class FriendManagerWindow(tk.Toplevel):
         tk.Label(
             self.add_frame,
             text="添加新好友",
-            font=ModernStyle.FONTS["heading"],
-            bg=ModernStyle.COLORS["dark"],
-            fg=ModernStyle.COLORS["light"]
+            font=FONTS["heading"],
+            bg=COLORS["dark"],
+            fg=COLORS["light"]
         ).pack(pady=30)
 
         # 表单容器
-        form_container = tk.Frame(self.add_frame, bg=ModernStyle.COLORS["card_bg"])
+        form_container = tk.Frame(self.add_frame, bg=COLORS["card_bg"])
         form_container.pack(fill=tk.BOTH, expand=True, padx=100, pady=20)
 
-        form_frame = tk.Frame(form_container, bg=ModernStyle.COLORS["card_bg"])
+        form_frame = tk.Frame(form_container, bg=COLORS["card_bg"])
         form_frame.pack(padx=40, pady=40)
 
         # 用户ID输入
         tk.Label(
             form_frame,
             text="👤 用户ID:",
-            font=ModernStyle.FONTS["subheading"],
-            bg=ModernStyle.COLORS["card_bg"],
-            fg=ModernStyle.COLORS["lighter"]
+            font=FONTS["subheading"],
+            bg=COLORS["card_bg"],
+            fg=COLORS["lighter"]
         ).pack(anchor=tk.W, pady=(0, 5))
 
         self.target_id_var = tk.StringVar()
         tk.Entry(
             form_frame,
             textvariable=self.target_id_var,
-            font=ModernStyle.FONTS["normal"],
-            bg=ModernStyle.COLORS["darker"],
-            fg=ModernStyle.COLORS["light"],
+            font=FONTS["normal"],
+            bg=COLORS["darker"],
+            fg=COLORS["light"],
             relief="flat",
             bd=2,
             width=40
@@ -3445,18 +3595,18 @@ class FriendManagerWindow(tk.Toplevel):
         tk.Label(
             form_frame,
             text="💬 附加消息 (可选):",
-            font=ModernStyle.FONTS["subheading"],
-            bg=ModernStyle.COLORS["card_bg"],
-            fg=ModernStyle.COLORS["lighter"]
+            font=FONTS["subheading"],
+            bg=COLORS["card_bg"],
+            fg=COLORS["lighter"]
         ).pack(anchor=tk.W, pady=(10, 5))
 
         self.message_var = tk.StringVar()
         tk.Entry(
             form_frame,
             textvariable=self.message_var,
-            font=ModernStyle.FONTS["normal"],
-            bg=ModernStyle.COLORS["darker"],
-            fg=ModernStyle.COLORS["light"],
+            font=FONTS["normal"],
+            bg=COLORS["darker"],
+            fg=COLORS["light"],
             relief="flat",
             bd=2,
             width=40
@@ -3466,11 +3616,11 @@ class FriendManagerWindow(tk.Toplevel):
         tk.Button(
             form_frame,
             text="📤 发送好友请求",
-            font=ModernStyle.FONTS["subheading"],
-            bg=ModernStyle.COLORS["primary"],
-            fg=ModernStyle.COLORS["light"],
-            activebackground=ModernStyle.COLORS["primary_dark"],
-            activeforeground=ModernStyle.COLORS["light"],
+            font=FONTS["subheading"],
+            bg=COLORS["primary"],
+            fg=COLORS["light"],
+            activebackground=COLORS["primary_dark"],
+            activeforeground=COLORS["light"],
             relief="flat",
             bd=0,
             padx=40,
@@ -3487,13 +3637,13 @@ class FriendManagerWindow(tk.Toplevel):
         received_label = tk.Label(
             self.requests_frame,
             text="📥 收到的好友请求",
-            font=ModernStyle.FONTS["subheading"],
-            bg=ModernStyle.COLORS["dark"],
-            fg=ModernStyle.COLORS["light"]
+            font=FONTS["subheading"],
+            bg=COLORS["dark"],
+            fg=COLORS["light"]
         )
         received_label.pack(pady=(20, 10))
 
-        received_frame = tk.Frame(self.requests_frame, bg=ModernStyle.COLORS["darker"])
+        received_frame = tk.Frame(self.requests_frame, bg=COLORS["darker"])
         received_frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=(0, 10))
 
         columns = ("from_user", "message", "time")
@@ -3517,17 +3667,17 @@ class FriendManagerWindow(tk.Toplevel):
         received_scroll.pack(side=tk.RIGHT, fill=tk.Y)
 
         # 收到请求的操作按钮
-        received_btn_frame = tk.Frame(self.requests_frame, bg=ModernStyle.COLORS["dark"])
+        received_btn_frame = tk.Frame(self.requests_frame, bg=COLORS["dark"])
         received_btn_frame.pack(fill=tk.X, padx=20, pady=5)
 
         tk.Button(
             received_btn_frame,
             text="✅ 接受请求",
-            font=ModernStyle.FONTS["small"],
-            bg=ModernStyle.COLORS["success"],
-            fg=ModernStyle.COLORS["light"],
-            activebackground=ModernStyle.COLORS["success_dark"],
-            activeforeground=ModernStyle.COLORS["light"],
+            font=FONTS["small"],
+            bg=COLORS["success"],
+            fg=COLORS["light"],
+            activebackground=COLORS["success_dark"],
+            activeforeground=COLORS["light"],
             relief="flat",
             bd=0,
             padx=15,
@@ -3539,11 +3689,11 @@ class FriendManagerWindow(tk.Toplevel):
         tk.Button(
             received_btn_frame,
             text="❌ 拒绝请求",
-            font=ModernStyle.FONTS["small"],
-            bg=ModernStyle.COLORS["danger"],
-            fg=ModernStyle.COLORS["light"],
-            activebackground=ModernStyle.COLORS["danger_dark"],
-            activeforeground=ModernStyle.COLORS["light"],
+            font=FONTS["small"],
+            bg=COLORS["danger"],
+            fg=COLORS["light"],
+            activebackground=COLORS["danger_dark"],
+            activeforeground=COLORS["light"],
             relief="flat",
             bd=0,
             padx=15,
@@ -3559,13 +3709,13 @@ class FriendManagerWindow(tk.Toplevel):
         sent_label = tk.Label(
             self.requests_frame,
             text="📤 已发送的好友请求",
-            font=ModernStyle.FONTS["subheading"],
-            bg=ModernStyle.COLORS["dark"],
-            fg=ModernStyle.COLORS["light"]
+            font=FONTS["subheading"],
+            bg=COLORS["dark"],
+            fg=COLORS["light"]
         )
         sent_label.pack(pady=(10, 10))
 
-        sent_frame = tk.Frame(self.requests_frame, bg=ModernStyle.COLORS["darker"])
+        sent_frame = tk.Frame(self.requests_frame, bg=COLORS["darker"])
         sent_frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=(0, 20))
 
         columns = ("to_user", "message", "status", "time")
@@ -3591,17 +3741,17 @@ class FriendManagerWindow(tk.Toplevel):
         sent_scroll.pack(side=tk.RIGHT, fill=tk.Y)
 
         # 刷新按钮
-        refresh_btn_frame = tk.Frame(self.requests_frame, bg=ModernStyle.COLORS["dark"])
+        refresh_btn_frame = tk.Frame(self.requests_frame, bg=COLORS["dark"])
         refresh_btn_frame.pack(fill=tk.X, padx=20, pady=(0, 10))
 
         tk.Button(
             refresh_btn_frame,
             text="🔄 刷新请求列表",
-            font=ModernStyle.FONTS["small"],
-            bg=ModernStyle.COLORS["primary"],
-            fg=ModernStyle.COLORS["light"],
-            activebackground=ModernStyle.COLORS["primary_dark"],
-            activeforeground=ModernStyle.COLORS["light"],
+            font=FONTS["small"],
+            bg=COLORS["primary"],
+            fg=COLORS["light"],
+            activebackground=COLORS["primary_dark"],
+            activeforeground=COLORS["light"],
             relief="flat",
             bd=0,
             padx=15,
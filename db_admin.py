@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+数据库管理公共逻辑
+clear_database.py / clear_databases.py 共用的清空实现
+"""
+import sqlite3
+from pathlib import Path
+from typing import Iterator, List, Tuple
+
+SERVER_DB = Path("data/server.db")
+CLIENT_DB = Path("client_data.db")
+
+SchemaRow = Tuple[str, str, str]
+
+
+def iter_schema(conn: sqlite3.Connection) -> Iterator[SchemaRow]:
+    """逐条产出用户表及其索引/触发器的 (type, name, sql)，跳过 SQLite 内部对象"""
+    return iter(
+        conn.execute(
+            "SELECT type, name, sql FROM sqlite_master "
+            "WHERE type IN ('table', 'index', 'trigger') AND name NOT LIKE 'sqlite_%' AND sql IS NOT NULL"
+        )
+    )
+
+
+def _reset_statements(schema: List[SchemaRow], has_sequence: bool) -> Iterator[str]:
+    # DROP + 按原 DDL 重建，避免逐行 DELETE 写入回滚日志；DROP 会连带删除索引/触发器，一并重建
+    tables = [row for row in schema if row[0] == "table"]
+    for _, name, _ in tables:
+        yield f'DROP TABLE "{name}";'
+    for _, _, sql in tables:
+        yield f"{sql};"
+    for obj_type, _, sql in schema:
+        if obj_type != "table":
+            yield f"{sql};"
+    # 重置自增ID
+    if has_sequence:
+        yield "DELETE FROM sqlite_sequence;"
+
+
+def clear_db(path: Path) -> List[str]:
+    """在一个事务中清空单个数据库的所有用户表，返回被清空的表名"""
+    conn = sqlite3.connect(path, isolation_level=None)
+    try:
+        schema = list(iter_schema(conn))
+        tables = [name for obj_type, name, _ in schema if obj_type == "table"]
+        if not tables:
+            return []
+        has_sequence = conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'sqlite_sequence'").fetchone() is not None
+
+        # 破坏性管理工具，无需日志落盘与 fsync
+        conn.execute("PRAGMA journal_mode=MEMORY")
+        conn.execute("PRAGMA synchronous=OFF")
+        conn.executescript(
+            "BEGIN IMMEDIATE;\n" + "\n".join(_reset_statements(schema, has_sequence)) + "\nCOMMIT;\nVACUUM;"
+        )
+        return tables
+    finally:
+        conn.close()
+
+
+__all__ = ["CLIENT_DB", "SERVER_DB", "clear_db", "iter_schema"]
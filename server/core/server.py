@@ -52,8 +52,7 @@ class SocketServer:
                 message: Dict[str, Any] = {}
                 try:
                     message = await framing.async_decode_msg(reader)
-                    schema = validator.load_schema(message.get("command", ""))
-                    validator.validate_msg(message, schema)
+                    validator.validate_msg(message)
                     ctx.touch()
                     response = await self.router.dispatch(message, ctx)
                     if response:
@@ -174,6 +174,10 @@ class FileService:
 
     async def handle_complete(self, message: Dict[str, Any], ctx) -> Dict[str, Any]:
         session = self._require_session(message, ctx)
+        checksum = (message.get("payload") or {}).get("checksum")
+        if checksum and ctx.user_id == session["sender_id"]:
+            # 发送端边发边算摘要，FILE_REQUEST 时还没有校验和，完成时补记
+            self.repository.update_file_session_checksum(session["session_id"], checksum)
         await self.notify_channel_complete(session["session_id"])
         return self._response(
             message,
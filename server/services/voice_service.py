@@ -92,7 +92,7 @@ class VoiceService:
         target_type = target.get("type")
         target_id = target.get("id")
 
-        logger.info(f"[VOICE] handle_call: caller={user_id}, target_type={target_type}, target_id={target_id}, call_type={call_type}")
+        logger.info("[VOICE] handle_call: caller=%s, target_type=%s, target_id=%s, call_type=%s", user_id, target_type, target_id, call_type)
 
         if not target_type or not target_id:
             return self._error_response(message, StatusCode.BAD_REQUEST, "Invalid target")
@@ -107,8 +107,8 @@ class VoiceService:
         self.active_calls[call_id] = call
         self.user_to_call[user_id] = call_id
 
-        logger.info(f"[VOICE] User {user_id} initiated call {call_id} to {target_type}:{target_id}")
-        logger.info(f"[VOICE] All online users in connection_manager: {self.connection_manager.get_all_users()}")
+        logger.info("[VOICE] User %s initiated call %s to %s:%s", user_id, call_id, target_type, target_id)
+        logger.info("[VOICE] All online users in connection_manager: %s", self.connection_manager.get_all_users())
 
         # Send acknowledgment to caller
         ack_response = {
@@ -127,7 +127,7 @@ class VoiceService:
         # Notify target(s) about incoming call
         if target_type == "user":
             # Direct call to a user
-            logger.info(f"[VOICE] Notifying user {target_id} about incoming call from {user_id}")
+            logger.info("[VOICE] Notifying user %s about incoming call from %s", target_id, user_id)
             await self._notify_user(ctx, target_id, "voice/event", {
                 "event_type": "incoming",
                 "call_id": call_id,
@@ -178,7 +178,7 @@ class VoiceService:
         call.add_participant(user_id)
         self.user_to_call[user_id] = call_id
 
-        logger.info(f"User {user_id} joined call {call_id}, total participants: {len(call.participants)}")
+        logger.info("User %s joined call %s, total participants: %s", user_id, call_id, len(call.participants))
 
         # Notify all participants
         # 如果是从ringing变为connected（第一人接听），发送connected事件
@@ -219,7 +219,7 @@ class VoiceService:
         if not call:
             return self._error_response(message, StatusCode.NOT_FOUND, "Call not found")
 
-        logger.info(f"User {user_id} rejected call {call_id}")
+        logger.info("User %s rejected call %s", user_id, call_id)
 
         # Notify caller about rejection
         await self._notify_user(ctx, call.initiator_id, "voice/event", {
@@ -261,9 +261,9 @@ class VoiceService:
         if user_id not in call.participants:
             return self._error_response(message, StatusCode.FORBIDDEN, "Not in this call")
 
-        logger.info(f"[VOICE] User {user_id} ended call {call_id}")
-        logger.info(f"[VOICE] Call participants before removal: {list(call.participants)}")
-        logger.info(f"[VOICE] Call type: {call.call_type}")
+        logger.info("[VOICE] User %s ended call %s", user_id, call_id)
+        logger.info("[VOICE] Call participants before removal: %s", list(call.participants))
+        logger.info("[VOICE] Call type: %s", call.call_type)
 
         # 保存所有参与者列表（包括即将退出的用户），用于发送ended事件
         all_participants = list(call.participants)
@@ -272,11 +272,11 @@ class VoiceService:
         call.remove_participant(user_id)
         self.user_to_call.pop(user_id, None)
 
-        logger.info(f"[VOICE] Remaining participants after removal: {list(call.participants)}")
+        logger.info("[VOICE] Remaining participants after removal: %s", list(call.participants))
 
         # If group call and still has participants, notify others
         if call.call_type == "group" and len(call.participants) > 0:
-            logger.info(f"[VOICE] Group call with remaining participants, notifying member_left")
+            logger.info("[VOICE] Group call with remaining participants, notifying member_left")
             for participant in call.participants:
                 await self._notify_user(ctx, participant, "voice/event", {
                     "event_type": "member_left",
@@ -287,7 +287,7 @@ class VoiceService:
         else:
             # Direct call or last participant left, end the call
             # 使用保存的all_participants列表，包括刚退出的用户
-            logger.info(f"[VOICE] Direct call or last participant, sending 'ended' to {len(all_participants)} participant(s)")
+            logger.info("[VOICE] Direct call or last participant, sending 'ended' to %s participant(s)", len(all_participants))
 
             # 计算通话时长
             duration = 0
@@ -307,12 +307,12 @@ class VoiceService:
             }
 
             for participant in all_participants:
-                logger.info(f"[VOICE] Sending 'ended' event to participant: {participant}")
+                logger.info("[VOICE] Sending 'ended' event to participant: %s", participant)
                 await self._notify_user(ctx, participant, "voice/event", call_end_payload)
 
             call.end()
             self._cleanup_call(call_id)
-            logger.info(f"[VOICE] Call {call_id} has been cleaned up")
+            logger.info("[VOICE] Call %s has been cleaned up", call_id)
 
         return {
             "id": message.get("id"),
@@ -339,7 +339,9 @@ class VoiceService:
         if not call or user_id not in call.participants:
             return None
 
-        # Forward audio data to all other participants
+        # Forward audio data to all other participants; tag the sender so group-call
+        # clients can keep one decoder/jitter queue per speaker and mix them.
+        payload = {**payload, "from_user": user_id}
         for participant in call.participants:
             if participant != user_id:
                 await self._notify_user(ctx, participant, "voice/data", payload)
@@ -360,17 +362,19 @@ class VoiceService:
 
         # Use connection_manager to send to user
         user_ctx = self.connection_manager.get_by_user(user_id)
-        logger.info(f"[VOICE] Trying to notify user {user_id} with command {command}, user_ctx found: {user_ctx is not None}")
+        # voice/data 每秒几十包（payload 还是整段音频），只在 DEBUG 下逐包记录；信令事件仍记 INFO
+        level = logging.DEBUG if command == MsgType.VOICE_DATA.value else logging.INFO
+        logger.log(level, "[VOICE] Trying to notify user %s with command %s, user_ctx found: %s", user_id, command, user_ctx is not None)
         if user_ctx and user_ctx.writer:
             try:
-                logger.info(f"[VOICE] Sending {command} event to user {user_id}: {payload}")
+                logger.log(level, "[VOICE] Sending %s event to user %s: %s", command, user_id, payload)
                 user_ctx.writer.write(encode_msg(event))
                 await user_ctx.writer.drain()
-                logger.info(f"[VOICE] Successfully sent {command} to user {user_id}")
+                logger.log(level, "[VOICE] Successfully sent %s to user %s", command, user_id)
             except Exception as e:
-                logger.error(f"[VOICE] Failed to send {command} to user {user_id}: {e}")
+                logger.error("[VOICE] Failed to send %s to user %s: %s", command, user_id, e)
         else:
-            logger.warning(f"[VOICE] User {user_id} not found or no writer available")
+            logger.warning("[VOICE] User %s not found or no writer available", user_id)
 
     def _get_room_members(self, room_id: str) -> list[str]:
         """Get members of a room."""
@@ -382,7 +386,7 @@ class VoiceService:
             members = self.room_service.repository.list_room_members(room_id)
             return members
         except Exception as e:
-            logger.error(f"Failed to get room members for {room_id}: {e}")
+            logger.error("Failed to get room members for %s: %s", room_id, e)
             return []
 
     def _cleanup_call(self, call_id: str) -> None:
@@ -391,7 +395,7 @@ class VoiceService:
         if call:
             for user_id in call.participants:
                 self.user_to_call.pop(user_id, None)
-            logger.info(f"Call {call_id} cleaned up")
+            logger.info("Call %s cleaned up", call_id)
 
     def _error_response(self, message: Dict[str, Any], status: StatusCode, error_msg: str) -> Dict[str, Any]:
         """Create error response."""
@@ -422,7 +426,7 @@ class VoiceService:
         if call_id:
             call = self.active_calls.get(call_id)
             if call:
-                logger.info(f"User {user_id} disconnected, ending call {call_id}")
+                logger.info("User %s disconnected, ending call %s", user_id, call_id)
                 await self.handle_end(
                     {
                         "id": uuid.uuid4().hex,
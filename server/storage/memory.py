@@ -123,6 +123,9 @@ class InMemoryRepository:
     def update_file_session_status(self, session_id: str, status: str) -> None:
         self.store.update_file_session_status(session_id, status)
 
+    def update_file_session_checksum(self, session_id: str, checksum: str) -> None:
+        self.store.update_file_session_checksum(session_id, checksum)
+
     def get_file_session(self, session_id: str) -> Optional[Dict[str, Any]]:
         return self.store.get_file_session(session_id)
 
@@ -376,6 +376,13 @@ class SQLiteStore:
         )
         self.conn.commit()
 
+    def update_file_session_checksum(self, session_id: str, checksum: str) -> None:
+        self.conn.execute(
+            "UPDATE files SET checksum = ?, updated_at = ? WHERE session_id = ?",
+            (checksum, int(time.time()), session_id),
+        )
+        self.conn.commit()
+
     def get_file_session(self, session_id: str) -> Optional[Dict[str, Any]]:
         row = self.conn.execute(
             """
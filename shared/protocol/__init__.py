@@ -6,7 +6,7 @@ and validation utilities for both client and server.
 from .commands import MsgType, commands_in_group, is_command, normalize_command
 from .constants import DEFAULT_VERSION, ENCODING, FRAME_DELIMITER
 from .errors import ErrorCode, ProtocolError, StatusCode
-from .framing import async_decode_msg, decode_msg, encode_msg, encode_chunk, decode_chunk
+from .framing import async_decode_msg, decode_msg, encode_msg, encode_msg_parts, encode_chunk, encode_chunk_header, decode_chunk
 from .messages import (
     AuthAckMsg,
     BaseMsg,
@@ -42,9 +42,11 @@ __all__ = [
     "ProtocolError",
     "StatusCode",
     "encode_msg",
+    "encode_msg_parts",
     "decode_msg",
     "async_decode_msg",
     "encode_chunk",
+    "encode_chunk_header",
     "decode_chunk",
     "BaseMsg",
     "LoginMsg",
@@ -137,9 +137,13 @@ COMMAND_GROUPS: Dict[str, str] = {
 }
 
 
+# Enum .value goes through a descriptor on every access; envelope builders use this plain dict instead.
+COMMAND_TEXT: Dict[MsgType, str] = {command: command.value for command in MsgType}
+
+
 def normalize_command(command: Union[str, MsgType]) -> str:
     """Convert enum/string into canonical command text."""
-    return command.value if isinstance(command, MsgType) else str(command)
+    return COMMAND_TEXT[command] if isinstance(command, MsgType) else str(command)
 
 
 def is_command(value: str) -> bool:
@@ -161,6 +165,7 @@ def commands_in_group(group: str) -> Iterable[str]:
 __all__ = [
     "MsgType",
     "COMMAND_GROUPS",
+    "COMMAND_TEXT",
     "normalize_command",
     "is_command",
     "commands_in_group",
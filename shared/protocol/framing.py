@@ -2,27 +2,56 @@ from __future__ import annotations
 
 import asyncio
 import json
+import struct
 from typing import Tuple
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 from .constants import ENCODING, FRAME_DELIMITER, MAX_PAYLOAD_SIZE
 from .errors import ProtocolError, StatusCode
 
+# 文件通道 TLV 块头：1 字节类型 + 4 字节小端长度
+CHUNK_HEADER = struct.Struct("<BI")
 
-def encode_msg(msg: dict) -> bytes:
-    """Encode message dict into bytes (JSON + delimiter)."""
-    try:
-        json_str = json.dumps(msg, ensure_ascii=False, separators=(",", ":"))
-    except (TypeError, ValueError) as exc:
-        raise ProtocolError(StatusCode.BAD_REQUEST, message=f"Encode failed: {exc}") from exc
 
-    data = json_str.encode(ENCODING)
+def encode_msg_parts(msg: dict) -> Tuple[bytes, bytes]:
+    """Encode message dict into (JSON bytes, delimiter) for gather-writes without concatenation."""
+    data = None
+    if ORJSON_AVAILABLE:
+        # orjson 在 C 里直接产出紧凑的 UTF-8 字节；它拒绝的输入（非 str 键等）交给 json 兜底
+        try:
+            data = orjson.dumps(msg)
+        except TypeError:
+            pass
+    if data is None:
+        try:
+            data = json.dumps(msg, ensure_ascii=False, separators=(",", ":")).encode(ENCODING)
+        except (TypeError, ValueError, UnicodeEncodeError) as exc:
+            raise ProtocolError(StatusCode.BAD_REQUEST, message=f"Encode failed: {exc}") from exc
+
     if len(data) > MAX_PAYLOAD_SIZE:
         raise ProtocolError(StatusCode.BAD_REQUEST, message="Payload too large for control channel")
-    return data + FRAME_DELIMITER
+    return data, FRAME_DELIMITER
+
+
+def encode_msg(msg: dict) -> bytes:
+    """Encode message dict into bytes (JSON + delimiter)."""
+    data, delimiter = encode_msg_parts(msg)
+    return data + delimiter
 
 
 def decode_msg(data: bytes) -> dict:
     """Decode bytes into dictionary, stripping delimiter."""
+    if ORJSON_AVAILABLE:
+        # orjson 直接解析 UTF-8 字节（尾部换行算空白）；它拒绝的输入（NaN 等）交给 json 兜底
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            pass
     try:
         json_str = data.rstrip(FRAME_DELIMITER).decode(ENCODING)
         return json.loads(json_str)
@@ -36,23 +65,28 @@ async def async_decode_msg(reader: asyncio.StreamReader) -> dict:
     return decode_msg(data)
 
 
+def encode_chunk_header(type_byte: int, length: int) -> bytes:
+    """Encode only the 5-byte TLV header, for payloads written separately (e.g. via sendfile)."""
+    if not (0 <= type_byte <= 255):
+        raise ProtocolError(StatusCode.BAD_REQUEST, message="Chunk type must be 0-255")
+    if not (0 <= length < 1 << 32):
+        raise ProtocolError(StatusCode.BAD_REQUEST, message="Chunk length out of range")
+    return CHUNK_HEADER.pack(type_byte, length)
+
+
 def encode_chunk(type_byte: int, payload: bytes) -> bytes:
     """
     Encode binary chunk for file transfer: 1 byte type + 4 bytes little-endian len + payload.
     """
-    if not (0 <= type_byte <= 255):
-        raise ProtocolError(StatusCode.BAD_REQUEST, message="Chunk type must be 0-255")
-    length = len(payload).to_bytes(4, "little")
-    return bytes([type_byte]) + length + payload
+    return encode_chunk_header(type_byte, len(payload)) + payload
 
 
 def decode_chunk(data: bytes) -> Tuple[int, bytes]:
     """Decode a TLV chunk."""
-    if len(data) < 5:
+    if len(data) < CHUNK_HEADER.size:
         raise ProtocolError(StatusCode.BAD_REQUEST, message="Incomplete chunk header")
-    type_byte = data[0]
-    length = int.from_bytes(data[1:5], "little")
-    payload = data[5 : 5 + length]
+    type_byte, length = CHUNK_HEADER.unpack_from(data)
+    payload = data[CHUNK_HEADER.size : CHUNK_HEADER.size + length]
     if len(payload) != length:
         raise ProtocolError(StatusCode.BAD_REQUEST, message="Chunk payload truncated")
     return type_byte, payload
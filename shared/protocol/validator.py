@@ -57,7 +57,9 @@ def _schema_path(command: str) -> Optional[Path]:
     path = SCHEMA_DIR / filename
     return path if path.exists() else None
 
-@lru_cache(maxsize=16)
+# Sized well above the command vocabulary (including lookups that resolve to None)
+# so every inbound frame hits the cache instead of re-reading the schema file.
+@lru_cache(maxsize=128)
 def load_schema(command: str) -> Optional[dict]:
     """Load JSON schema for command if present."""
     command_text = normalize_command(command)
@@ -68,6 +70,17 @@ def load_schema(command: str) -> Optional[dict]:
         return json.load(fp)
 
 
+@lru_cache(maxsize=128)
+def load_validator(command: str) -> Optional[Any]:
+    """Compiled validator for command's schema; the meta-schema check runs once here, not per message."""
+    schema = load_schema(command)
+    if not schema:
+        return None
+    validator_cls = jsonschema.validators.validator_for(schema)
+    validator_cls.check_schema(schema)
+    return validator_cls(schema)
+
+
 def validate_version(headers: Optional[Dict[str, Any]]) -> None:
     """Ensure headers declare supported protocol version."""
     version = (headers or {}).get("version", "0.0")
@@ -104,13 +117,19 @@ def validate_signature(msg: Dict[str, Any], key: str, field: str = "payload.sign
 def validate_msg(msg: Dict[str, Any], schema: Optional[dict] = None) -> None:
     """Run standard validations (version + json-schema)."""
     validate_version(msg.get("headers"))
-    if not schema:
-        schema = load_schema(msg.get("command", ""))
-    if schema:
-        try:
-            jsonschema.validate(instance=msg, schema=schema)
-        except jsonschema.ValidationError as exc:
-            raise ProtocolError(StatusCode.BAD_REQUEST, ErrorCode.PARAM_MISSING, f"Schema validation failed: {exc}") from exc
-
-
-__all__ = ["load_schema", "validate_msg", "validate_signature", "validate_version"]
+    command = msg.get("command", "")
+    if not schema or schema is load_schema(command):
+        compiled = load_validator(command)
+        if compiled is None:
+            return
+        error = jsonschema.exceptions.best_match(compiled.iter_errors(msg))
+        if error is not None:
+            raise ProtocolError(StatusCode.BAD_REQUEST, ErrorCode.PARAM_MISSING, f"Schema validation failed: {error}")
+        return
+    try:
+        jsonschema.validate(instance=msg, schema=schema)
+    except jsonschema.ValidationError as exc:
+        raise ProtocolError(StatusCode.BAD_REQUEST, ErrorCode.PARAM_MISSING, f"Schema validation failed: {exc}") from exc
+
+
+__all__ = ["load_schema", "load_validator", "validate_msg", "validate_signature", "validate_version"]
@@ -20,6 +20,8 @@ def utc_timestamp() -> int:
 
 def sha256_hex(data: str) -> str:
     """Convenience wrapper for hashing small secrets/passwords."""
+    # hashlib.sha256 由 OpenSSL 实现，CPU 支持时走 SHA-NI/ARMv8 SHA 指令；
+    # 服务端按十六进制串存储和比对口令摘要，因此保持 hexdigest 格式
     return hashlib.sha256(data.encode("utf-8")).hexdigest()
 
 
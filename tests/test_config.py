@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import os
+import pickle
+
+import pytest
+
+from client import config
+
+
+@pytest.fixture
+def env_dir(tmp_path, monkeypatch):
+    """Run load_config in tmp_path with no CLIENT_* variables and restore CLIENT_CONFIG afterwards."""
+    monkeypatch.chdir(tmp_path)
+    _reset_env(monkeypatch)
+    saved = dict(config.CLIENT_CONFIG)
+    yield tmp_path
+    config.CLIENT_CONFIG.clear()
+    config.CLIENT_CONFIG.update(saved)
+
+
+def _reset_env(monkeypatch):
+    # load_dotenv exports the file into os.environ; a fresh process would not have it.
+    monkeypatch.setattr(os, "environ", {k: v for k, v in os.environ.items() if not k.startswith("CLIENT_")})
+
+
+def _forbid_env_parsing(monkeypatch):
+    def fail(*args, **kwargs):
+        raise AssertionError(".env parsed despite a valid cache")
+
+    monkeypatch.setattr(config, "load_dotenv", fail)
+
+
+def test_cache_hit_skips_env_parsing(env_dir, monkeypatch):
+    (env_dir / ".env").write_text("CLIENT_SERVER_PORT=9000\n")
+    assert config.load_config()["server_port"] == 9000
+    assert (env_dir / ".env.cache").exists()
+
+    _reset_env(monkeypatch)
+    _forbid_env_parsing(monkeypatch)
+    config.CLIENT_CONFIG["server_port"] = 1
+    assert config.load_config()["server_port"] == 9000
+
+
+def test_cache_miss_when_env_file_changes(env_dir, monkeypatch):
+    env_file = env_dir / ".env"
+    env_file.write_text("CLIENT_SERVER_PORT=9000\n")
+    config.load_config()
+
+    _reset_env(monkeypatch)
+    env_file.write_text("CLIENT_SERVER_PORT=9001\n")
+    assert config.load_config()["server_port"] == 9001
+
+
+def test_cache_invalidated_when_defaults_change(env_dir, monkeypatch):
+    (env_dir / ".env").write_text("CLIENT_SERVER_PORT=9000\n")
+    config.load_config()
+
+    _reset_env(monkeypatch)
+    monkeypatch.setitem(config.DEFAULT_CONFIG, "file_chunk_size", 4096)
+    monkeypatch.setitem(config.DEFAULT_CONFIG, "new_option", "on")
+    loaded = config.load_config()
+    assert loaded["file_chunk_size"] == 4096
+    assert loaded["new_option"] == "on"
+
+
+def test_pickle_cache_is_never_loaded(env_dir, monkeypatch):
+    (env_dir / ".env").write_text("CLIENT_SERVER_PORT=9000\n")
+    key = config._cache_key(".env")
+    with open(".env.cache", "wb") as fp:
+        pickle.dump({"_key": key, "cfg": {"server_port": 1}}, fp)
+
+    assert config.load_config()["server_port"] == 9000
@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+import sqlite3
+
+from db_admin import clear_db
+
+
+def test_clear_db_empties_tables_and_keeps_schema(tmp_path):
+    path = tmp_path / "chat.db"
+    conn = sqlite3.connect(path)
+    conn.executescript(
+        """
+        CREATE TABLE users (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT);
+        CREATE TABLE audit (name TEXT);
+        CREATE INDEX idx_users_name ON users (name);
+        CREATE TRIGGER users_audit AFTER INSERT ON users BEGIN INSERT INTO audit VALUES (new.name); END;
+        INSERT INTO users (name) VALUES ('alice'), ('bob');
+        """
+    )
+    conn.commit()
+    conn.close()
+
+    assert sorted(clear_db(path)) == ["audit", "users"]
+
+    conn = sqlite3.connect(path)
+    try:
+        assert conn.execute("SELECT COUNT(*) FROM users").fetchone() == (0,)
+        assert conn.execute("SELECT COUNT(*) FROM audit").fetchone() == (0,)
+        names = {row[0] for row in conn.execute("SELECT name FROM sqlite_master")}
+        assert {"idx_users_name", "users_audit"} <= names
+        # 自增 ID 已重置，触发器仍然生效
+        conn.execute("INSERT INTO users (name) VALUES ('carol')")
+        assert conn.execute("SELECT id FROM users").fetchone() == (1,)
+        assert conn.execute("SELECT name FROM audit").fetchall() == [("carol",)]
+    finally:
+        conn.close()
+
+
+def test_clear_db_without_tables(tmp_path):
+    path = tmp_path / "empty.db"
+    sqlite3.connect(path).close()
+    assert clear_db(path) == []
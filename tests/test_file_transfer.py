@@ -0,0 +1,254 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import queue
+import time
+
+import pytest
+
+from client.features.file_transfer import ChunkReceiver, FileTransferManager, TransferSession, TransferState
+from shared.protocol import decode_chunk, encode_chunk
+
+
+class _StubNetwork:
+    config = {}
+    host = "127.0.0.1"
+
+    def __init__(self, stream=b""):
+        self.stream = stream
+        self.sent = []
+
+    def register_handlers(self, handlers):
+        pass
+
+    async def send(self, message):
+        self.sent.append(message)
+
+    async def open_file_transport(self, protocol_factory, host, port):
+        protocol = protocol_factory()
+        _feed(protocol, self.stream, 7)
+        if not protocol.finished.done():
+            protocol.connection_lost(None)
+        return _Transport(), protocol
+
+
+class _StubSession:
+    user_id = "bob"
+
+    def next_id(self):
+        return "m1"
+
+    def build_headers(self):
+        return {}
+
+
+class _Transport:
+    def write(self, data):
+        pass
+
+    def close(self):
+        pass
+
+
+class _Writer:
+    """Collects what the sender writes; drain() never blocks."""
+
+    transport = object()
+
+    def __init__(self):
+        self.data = bytearray()
+
+    def write(self, data):
+        self.data += data
+
+    def writelines(self, parts):
+        for part in parts:
+            self.data += part
+
+    async def drain(self):
+        pass
+
+
+def _manager(tmp_path, chunk_size=4, network=None):
+    network = network or _StubNetwork()
+    return FileTransferManager(network, _StubSession(), queue.Queue(), tmp_path / "downloads", chunk_size=chunk_size)
+
+
+def _feed(protocol, data, step):
+    """Deliver data the way a transport would, at most `step` bytes per receive."""
+    data = memoryview(data)
+    while data:
+        buf = protocol.get_buffer(-1)
+        size = min(step, len(buf), len(data))
+        buf[:size] = data[:size]
+        protocol.buffer_updated(size)
+        data = data[size:]
+
+
+def _session(path):
+    size = path.stat().st_size
+    return TransferSession("s1", TransferState.SENDING, path.name, size, "bob", path=path)
+
+
+def _split_chunks(data):
+    chunks = []
+    while data:
+        chunk_type, payload = decode_chunk(bytes(data))
+        chunks.append((chunk_type, payload))
+        data = data[5 + len(payload) :]
+    return chunks
+
+
+def _send(manager, path, sendfile):
+    async def run():
+        asyncio.get_running_loop().sendfile = sendfile
+        writer = _Writer()
+        with path.open("rb") as fp:
+            digest = await manager._send_chunks(writer, fp, path, _session(path))
+        return writer, digest
+
+    return asyncio.run(run())
+
+
+@pytest.mark.parametrize("error", [NotImplementedError, RuntimeError, asyncio.SendfileNotAvailableError])
+def test_send_chunks_falls_back_when_sendfile_unavailable(tmp_path, error):
+    path = tmp_path / "file.bin"
+    path.write_bytes(b"0123456789")
+
+    async def sendfile(*args, **kwargs):
+        raise error("sendfile unavailable")
+
+    writer, digest = _send(_manager(tmp_path), path, sendfile)
+
+    assert _split_chunks(writer.data) == [(0x01, b"0123"), (0x01, b"4567"), (0x01, b"89")]
+    assert digest == hashlib.sha256(b"0123456789").digest()
+
+
+def test_send_chunks_fails_when_sendfile_breaks_mid_stream(tmp_path):
+    path = tmp_path / "file.bin"
+    path.write_bytes(b"0123456789")
+    calls = []
+
+    async def sendfile(transport, fp, offset, count, fallback=True):
+        calls.append(offset)
+        if offset:
+            raise NotImplementedError
+        return count
+
+    with pytest.raises(NotImplementedError):
+        _send(_manager(tmp_path), path, sendfile)
+    assert calls == [0, 4]
+
+
+def test_copy_chunks_waits_for_inflight_read_on_error(tmp_path):
+    path = tmp_path / "file.bin"
+    path.write_bytes(b"0123456789")
+    reads = {"started": 0, "finished": 0}
+
+    class SlowFile:
+        def __init__(self, fp):
+            self._fp = fp
+
+        def seek(self, offset):
+            self._fp.seek(offset)
+
+        def tell(self):
+            return self._fp.tell()
+
+        def read(self, size):
+            reads["started"] += 1
+            time.sleep(0.05)
+            data = self._fp.read(size)
+            reads["finished"] += 1
+            return data
+
+    class FailingWriter(_Writer):
+        async def drain(self):
+            raise ConnectionResetError
+
+    async def run():
+        with path.open("rb") as fp:
+            await _manager(tmp_path)._copy_chunks(FailingWriter(), SlowFile(fp), 0, 10, False, _session(path))
+
+    with pytest.raises(ConnectionResetError):
+        asyncio.run(run())
+    assert reads["started"] == 2
+    assert reads["finished"] == reads["started"]
+
+
+class _Sink:
+    def __init__(self):
+        self.data = bytearray()
+
+    def write(self, view):
+        self.data += view
+
+
+def _receive(stream, step, buffer_size=16):
+    async def run():
+        sink, sha, progress = _Sink(), hashlib.sha256(), []
+        receiver = ChunkReceiver(sink, sha, progress.append, buffer_size)
+        _feed(receiver, stream, step)
+        trailer = await asyncio.wait_for(receiver.finished, 1)
+        return bytes(sink.data), sha.digest(), progress, trailer
+
+    return asyncio.run(run())
+
+
+@pytest.mark.parametrize("step", [1, 3, 5, 64])
+def test_chunk_receiver_reassembles_any_split(step):
+    data = bytes(range(40))
+    digest = hashlib.sha256(data).digest()
+    stream = encode_chunk(0x01, data[:25]) + encode_chunk(0x01, data[25:]) + encode_chunk(0x02, digest)
+
+    received, sha, progress, trailer = _receive(stream, step)
+
+    assert received == data
+    assert sha == digest
+    assert trailer == digest
+    assert progress == [25, 15]
+
+
+def test_chunk_receiver_reports_sender_failure():
+    with pytest.raises(RuntimeError, match="Sender reported failure"):
+        _receive(encode_chunk(0x01, b"abc") + encode_chunk(0x03, b"disk error"), 4)
+
+
+def test_chunk_receiver_fails_when_stream_ends_early():
+    async def run():
+        receiver = ChunkReceiver(_Sink(), hashlib.sha256(), lambda size: None, 16)
+        _feed(receiver, encode_chunk(0x01, b"abcdef")[:-2], 4)
+        receiver.connection_lost(None)
+        await receiver.finished
+
+    with pytest.raises(ConnectionError):
+        asyncio.run(run())
+
+
+def _receive_file(tmp_path, stream):
+    network = _StubNetwork(stream)
+    manager = _manager(tmp_path, network=network)
+    save_path = tmp_path / "downloads" / "file.bin"
+    ctx = TransferSession("s1", TransferState.RECEIVING, "file.bin", 6, "alice", path=save_path)
+    asyncio.run(manager._start_receiver_channel(ctx, "127.0.0.1", 9000))
+    return save_path, [message["command"] for message in network.sent]
+
+
+def test_receiver_keeps_verified_file(tmp_path):
+    data = b"abcdef"
+    stream = encode_chunk(0x01, data) + encode_chunk(0x02, hashlib.sha256(data).digest())
+
+    save_path, commands = _receive_file(tmp_path, stream)
+
+    assert save_path.read_bytes() == data
+    assert commands == ["file/complete"]
+
+
+def test_receiver_removes_file_on_checksum_mismatch(tmp_path):
+    stream = encode_chunk(0x01, b"abcdef") + encode_chunk(0x02, hashlib.sha256(b"other").digest())
+
+    save_path, commands = _receive_file(tmp_path, stream)
+
+    assert not save_path.exists()
+    assert commands == ["file/error"]
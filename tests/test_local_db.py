@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import sqlite3
+import threading
+
+import pytest
+
+from client.storage import LocalDatabase
+
+
+def _message(msg_id, conversation_id, timestamp):
+    return {"id": msg_id, "timestamp": timestamp, "payload": {"conversation_id": conversation_id, "text": msg_id}}
+
+
+def test_recent_by_conversation_newest_first(tmp_path):
+    db = LocalDatabase(str(tmp_path / "local.db"))
+    db.save_batch(
+        [
+            ("inbound", _message("a1", "alice", 1)),
+            ("outbound", _message("b1", "bob", 2)),
+            ("inbound", _message("a2", "alice", 3)),
+            ("outbound", _message("a3", "alice", 4)),
+        ]
+    )
+
+    records = db.recent_by_conversation("alice", limit=2)
+    assert [record["id"] for record in records] == ["a3", "a2"]
+    assert records[0]["direction"] == "outbound"
+    assert records[0]["message"]["payload"]["text"] == "a3"
+
+    plan = db.conn.execute(
+        "EXPLAIN QUERY PLAN SELECT id FROM messages WHERE conversation_id = ? ORDER BY created_at DESC LIMIT ?",
+        ("alice", 2),
+    ).fetchall()
+    details = " ".join(row["detail"] for row in plan)
+    assert "idx_msg_conv_time" in details
+    assert "TEMP B-TREE" not in details
+
+
+def test_message_ids_reads_id_column_only(tmp_path):
+    db = LocalDatabase(str(tmp_path / "local.db"))
+    db.save_batch([("inbound", _message("a1", "alice", 1)), ("outbound", _message("b1", "bob", 2))])
+    db.save_batch([("inbound", {"timestamp": 3, "payload": {"conversation_id": "alice"}})])
+    # 损坏的 payload 也不影响：只读 id 列
+    db.conn.execute("UPDATE messages SET payload = 'not json' WHERE id = 'b1'")
+    db.conn.commit()
+
+    assert db.message_ids() == {"a1", "b1"}
+
+
+def test_close_releases_reader_connections(tmp_path):
+    db = LocalDatabase(str(tmp_path / "local.db"))
+    db.save_batch([("inbound", _message("a1", "alice", 1))])
+    readers = [db._reader()]
+    worker = threading.Thread(target=lambda: readers.append(db._reader()))
+    worker.start()
+    worker.join()
+    assert readers[0] is not readers[1]
+
+    db.close()
+
+    for conn in [db.conn, *readers]:
+        with pytest.raises(sqlite3.ProgrammingError):
+            conn.execute("SELECT 1")
@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import asyncio
+
+from client.features import messaging
+from client.features.messaging import MessagingManager
+
+
+class _StubNetwork:
+    def register_handlers(self, handlers):
+        self.handlers = handlers
+
+
+class _RecordingStorage:
+    def __init__(self):
+        self.batches = []
+
+    def save_batch(self, batch):
+        self.batches.append([message["id"] for _, message in batch])
+
+
+def _event(msg_id):
+    return {"id": msg_id, "type": "event", "payload": {"conversation_id": "alice"}}
+
+
+def test_writer_commits_a_burst_in_one_batch():
+    storage = _RecordingStorage()
+
+    async def run():
+        manager = MessagingManager(_StubNetwork(), None, storage)
+        for index in range(5):
+            await manager._handle_event(_event(f"m{index}"))
+        await manager.close()
+        return [(await manager.next_message(1))["id"] for _ in range(5)]
+
+    delivered = asyncio.run(run())
+
+    assert storage.batches == [["m0", "m1", "m2", "m3", "m4"]]
+    assert delivered == ["m0", "m1", "m2", "m3", "m4"]
+
+
+def test_writer_splits_batches_at_size_limit(monkeypatch):
+    monkeypatch.setattr(messaging, "WRITE_BATCH_SIZE", 2)
+    storage = _RecordingStorage()
+
+    async def run():
+        manager = MessagingManager(_StubNetwork(), None, storage)
+        for index in range(5):
+            manager._persist("outbound", _event(f"m{index}"))
+        await manager.close()
+
+    asyncio.run(run())
+
+    assert storage.batches == [["m0", "m1"], ["m2", "m3"], ["m4"]]
+
+
+def test_writer_flushes_after_interval():
+    storage = _RecordingStorage()
+
+    async def run():
+        manager = MessagingManager(_StubNetwork(), None, storage)
+        manager._persist("inbound", _event("m0"))
+        await asyncio.sleep(messaging.WRITE_FLUSH_INTERVAL * 3)
+        flushed = list(storage.batches)
+        await manager.close()
+        return flushed
+
+    assert asyncio.run(run()) == [["m0"]]
@@ -1,4 +1,17 @@
-from shared.protocol import MsgType, encode_msg, decode_msg
+import pytest
+
+from shared.protocol import (
+    FRAME_DELIMITER,
+    MsgType,
+    ProtocolError,
+    decode_chunk,
+    decode_msg,
+    encode_chunk,
+    encode_chunk_header,
+    encode_msg,
+    encode_msg_parts,
+    validate_msg,
+)
 
 
 def test_encode_decode_roundtrip():
@@ -13,3 +26,31 @@ def test_encode_decode_roundtrip():
     encoded = encode_msg(msg)
     decoded = decode_msg(encoded)
     assert decoded == msg
+
+
+def test_encode_msg_parts_matches_encode_msg():
+    msg = {"id": "2", "type": "event", "command": MsgType.PRESENCE_HEARTBEAT.value, "payload": {"seq": "a"}}
+    body, delimiter = encode_msg_parts(msg)
+    assert delimiter == FRAME_DELIMITER
+    assert body + delimiter == encode_msg(msg)
+
+
+def test_encode_chunk_header_prefixes_payload():
+    payload = b"\x00file-bytes"
+    assert encode_chunk_header(0x01, len(payload)) + payload == encode_chunk(0x01, payload)
+    assert decode_chunk(encode_chunk(0x01, payload)) == (0x01, payload)
+
+
+def test_validate_msg_uses_command_schema():
+    msg = {
+        "id": "3",
+        "type": "request",
+        "timestamp": 1,
+        "command": MsgType.AUTH_LOGIN.value,
+        "headers": {"version": "1.0"},
+        "payload": {"username": "alice", "password": "secret"},
+    }
+    validate_msg(msg)
+    del msg["payload"]["password"]
+    with pytest.raises(ProtocolError):
+        validate_msg(msg)
@@ -52,3 +52,12 @@ def test_room_persistence_with_password(tmp_path):
 
     details = repo.get_room_details("room-1")
     assert details["members"] == ["alice"]
+
+
+def test_file_session_checksum_recorded_on_complete(tmp_path):
+    repo = _repo(tmp_path)
+    repo.create_file_session("s1", "file.bin", 6, None, "alice", "user", "bob")
+
+    repo.update_file_session_checksum("s1", "ab" * 32)
+
+    assert repo.get_file_session("s1")["checksum"] == "ab" * 32
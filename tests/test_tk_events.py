@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import asyncio
+import queue
+
+import pytest
+
+pytest.importorskip("tkinter")
+
+from client.ui.tk_chat import PRESENCE_BATCH_DELAY, ClientRuntime, coalesce_ui_events
+
+
+def _presence_event(user_id, state):
+    return {"command": "presence/event", "payload": {"user_id": user_id, "state": state}}
+
+
+def _members(*members):
+    return ("voice", {"type": "members_changed", "members": list(members)})
+
+
+def test_coalesce_keeps_unrelated_events_in_order():
+    events = [("message", {"id": "m1"}), ("status", "ready"), ("voice", {"type": "call_started"}), ("message", {"id": "m2"})]
+    assert coalesce_ui_events(events) == events
+
+
+def test_presence_events_reach_ui_as_one_batch_per_user():
+    runtime = object.__new__(ClientRuntime)
+    runtime.ui_queue = queue.Queue()
+    runtime._presence_pending = {}
+    runtime._presence_flush_handle = None
+
+    async def run():
+        runtime.loop = asyncio.get_running_loop()
+        await runtime._handle_presence_event(_presence_event("alice", "online"))
+        await runtime._handle_presence_event(_presence_event("bob", "online"))
+        await runtime._handle_presence_event(_presence_event("alice", "offline"))
+        await asyncio.sleep(PRESENCE_BATCH_DELAY * 3)
+
+    asyncio.run(run())
+
+    # _handle_presence_batch 的输入：用户 -> 最新状态
+    assert runtime.ui_queue.get_nowait() == ("presence_batch", {"alice": "offline", "bob": "online"})
+    assert runtime.ui_queue.empty()
+
+
+def test_coalesce_keeps_every_presence_batch():
+    events = [("presence_batch", {"alice": "online"}), ("message", {"id": "m1"}), ("presence_batch", {"alice": "offline"})]
+    assert coalesce_ui_events(events) == events
+
+
+def test_coalesce_keeps_last_members_changed():
+    events = [
+        _members("alice"),
+        ("voice", {"type": "call_started"}),
+        _members("alice", "bob"),
+        ("status", "ok"),
+        _members("alice", "bob", "carol"),
+    ]
+    assert coalesce_ui_events(events) == [
+        ("voice", {"type": "call_started"}),
+        ("status", "ok"),
+        _members("alice", "bob", "carol"),
+    ]